@@ -0,0 +1,5 @@
+"""Micro-benchmarks of the parsing and request-building hot paths. Run with `python -m benchmarks`.
+
+Payloads come from the recorded test cassettes, scaled up synthetically to realistic (large) sizes.
+Results are appended to a JSON history file and compared against the previous runs to catch regressions.
+"""
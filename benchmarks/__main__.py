@@ -0,0 +1,62 @@
+import platform
+import sys
+from argparse import ArgumentParser
+from datetime import datetime
+from datetime import timezone
+from fnmatch import fnmatch
+from pathlib import Path
+from timeit import Timer
+from typing import Callable
+
+from benchmarks import history
+from benchmarks.suite import BENCHMARKS
+
+
+DEFAULT_HISTORY_PATH = Path(__file__).resolve().parent / 'history.json'
+
+
+def measure(function: Callable[[], object], repeat: int) -> float:
+    """Best time of a single call, in seconds."""
+    timer = Timer(function)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat=repeat, number=number)) / number
+
+
+def main() -> int:
+    parser = ArgumentParser(
+        prog='python -m benchmarks', description='Runs the micro-benchmarks and compares them with the previous runs.')
+    parser.add_argument('patterns', nargs='*', default=['*'], help='benchmark name patterns, defaults to all')
+    parser.add_argument('--repeat', type=int, default=5, help='timing repetitions (best one counts)')
+    parser.add_argument('--history', type=Path, default=DEFAULT_HISTORY_PATH, help='results history file')
+    parser.add_argument('--window', type=int, default=5, help='number of recent runs forming the baseline')
+    parser.add_argument('--tolerance', type=float, default=0.2, help='allowed slowdown, as a fraction')
+    parser.add_argument('--label', help='run label, e.g. a commit or version')
+    parser.add_argument('--no-save', action='store_true', help='do not append results to the history')
+    args = parser.parse_args()
+
+    results = {}
+    for name, setup in BENCHMARKS.items():
+        if any(fnmatch(name, pattern) for pattern in args.patterns):
+            results[name] = seconds = measure(setup(), args.repeat)
+            print(f'{name:32} {seconds * 1e6:12.2f} us')
+
+    python = platform.python_implementation() + ' ' + platform.python_version()
+    runs = history.load(args.history)
+    found = history.regressions(
+        [run for run in runs if run.get('python') == python], results, window=args.window, tolerance=args.tolerance)
+    for regression in found:
+        print(f'REGRESSION {regression.name}: {regression.seconds * 1e6:.2f} us, '
+              f'{regression.ratio:.2f}x the baseline of {regression.baseline * 1e6:.2f} us', file=sys.stderr)
+
+    if not args.no_save:
+        runs.append({
+            'time': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'python': python,
+            'label': args.label,
+            'results': results})
+        history.save(args.history, runs)
+    return 1 if found else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
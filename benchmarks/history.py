@@ -0,0 +1,54 @@
+import json
+from pathlib import Path
+from statistics import median
+from typing import Dict
+from typing import List
+from typing import NamedTuple
+from typing import Union
+
+
+class Regression(NamedTuple):
+    name: str
+    seconds: float
+    baseline: float
+
+    @property
+    def ratio(self) -> float:
+        return self.seconds / self.baseline
+
+
+def load(path: Union[str, Path]) -> List[Dict]:
+    """Previous runs, oldest first."""
+    try:
+        with Path(path).open(encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return []
+
+
+def save(path: Union[str, Path], runs: List[Dict]):
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open('w', encoding='utf-8') as f:
+        json.dump(runs, f, indent=1, sort_keys=True)
+        f.write('\n')
+
+
+def regressions(runs: List[Dict], results: Dict[str, float], window: int = 5,
+                tolerance: float = 0.2) -> List[Regression]:
+    """Benchmarks slower than the median of the recent runs (on the same Python) by more than the tolerance.
+
+    Args:
+        runs (list of dict): Previous runs, oldest first.
+        results (dict): Benchmark name mapped to its time of a single call, in seconds.
+        window (int, optional): Number of recent runs the baseline is computed from. Defaults to 5.
+        tolerance (float, optional): Allowed slowdown, as a fraction of the baseline. Defaults to 20%.
+    """
+    found = []
+    for name, seconds in sorted(results.items()):
+        previous = [run['results'][name] for run in runs if name in run['results']][-window:]
+        if previous:
+            baseline = median(previous)
+            if seconds > baseline * (1 + tolerance):
+                found.append(Regression(name, seconds, baseline))
+    return found
@@ -0,0 +1,167 @@
+"""Load driver running the real client against the fake API server. Run with `python -m benchmarks.load`.
+
+Every worker thread runs its own client (account), repeatedly picking an operation from the scenario mix.
+Reports throughput along with the latency percentiles of every operation.
+"""
+import random
+from argparse import ArgumentParser
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from datetime import timedelta
+from time import perf_counter
+from typing import Callable
+from typing import Dict
+from typing import List
+from typing import NamedTuple
+
+from luxmed import LuxMed
+from luxmed.errors import LuxMedError
+from luxmed.resilience import RetryPolicy
+
+from benchmarks.server import FakeLuxMedData
+from benchmarks.server import FakeLuxMedServer
+
+
+class OperationStats(NamedTuple):
+    count: int
+    errors: int
+    p50: float
+    p95: float
+    p99: float
+    max: float
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of already sorted values."""
+    if not sorted_values:
+        return 0.
+    return sorted_values[min(len(sorted_values) - 1, max(0, int(round(fraction * len(sorted_values))) - 1))]
+
+
+def find(luxmed: LuxMed, rnd: random.Random):
+    list(luxmed.visits.find(
+        city_id=rnd.randint(1, 10), service_id=4500 + rnd.randrange(200), language_id=10, payer_id=10101,
+        from_date=date.today(), to_date=date.today() + timedelta(days=7)))
+
+
+def filters(luxmed: LuxMed, rnd: random.Random):
+    luxmed.filters_cache.clear()
+    city_id = rnd.randint(1, 10)
+    luxmed.clinics(city_id)
+    luxmed.doctors(city_id, 4500 + rnd.randrange(200))
+
+
+def reserve(luxmed: LuxMed, rnd: random.Random):
+    term = next(luxmed.visits.find(
+        city_id=rnd.randint(1, 10), service_id=4500 + rnd.randrange(200), language_id=10, payer_id=10101,
+        compact=True))
+    luxmed.visits.reserve(payer_data=term.payer_details[0], **term.reservation_args())
+
+
+def examination_results(luxmed: LuxMed, rnd: random.Random):
+    for result in luxmed.examination.results():
+        result.details()
+        break
+
+
+def history(luxmed: LuxMed, rnd: random.Random):
+    list(luxmed.visits.iter_history(date.today() - timedelta(days=5 * 365), window_days=365))
+
+
+OPERATIONS: Dict[str, Callable[[LuxMed, random.Random], None]] = {
+    'find': find,
+    'filters': filters,
+    'reserve': reserve,
+    'examination_results': examination_results,
+    'history': history}
+DEFAULT_MIX = {'find': 60, 'filters': 20, 'reserve': 5, 'examination_results': 10, 'history': 5}
+
+
+def run(base_url: str, workers: int = 8, operations: int = 1000, mix: Dict[str, int] = None,
+        seed: int = 0, **client_kwargs) -> Dict:
+    """Runs given number of operations against the API at given base URL.
+
+    Args:
+        base_url (str): API origin, e.g. `FakeLuxMedServer.base_url`.
+        workers (int, optional): Number of concurrent clients. Defaults to 8.
+        operations (int, optional): Total number of operations. Defaults to 1000.
+        mix (dict, optional): Operation name mapped to its weight. Defaults to a search heavy mix.
+        seed (int, optional): Operations choice seed. Defaults to 0.
+        **client_kwargs: Remaining `LuxMed` client options.
+
+    Returns:
+        Elapsed seconds, throughput (operations per second) and `OperationStats` of every operation.
+    """
+    mix = mix or DEFAULT_MIX
+    names = list(mix)
+    weights = [mix[name] for name in names]
+
+    def worker(index: int):
+        rnd = random.Random(seed * 1000 + index)
+        luxmed = LuxMed(user_name=f'user{index}', password='password', base_url=base_url, **client_kwargs)
+        latencies = defaultdict(list)
+        errors = defaultdict(int)
+        for _ in range(operations // workers + (index < operations % workers)):
+            name = rnd.choices(names, weights)[0]
+            started = perf_counter()
+            try:
+                OPERATIONS[name](luxmed, rnd)
+            except LuxMedError:
+                errors[name] += 1
+            latencies[name].append(perf_counter() - started)
+        return latencies, errors
+
+    started = perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        results = list(executor.map(worker, range(workers)))
+    elapsed = perf_counter() - started
+
+    latencies = defaultdict(list)
+    errors = defaultdict(int)
+    for worker_latencies, worker_errors in results:
+        for name, values in worker_latencies.items():
+            latencies[name] += values
+        for name, count in worker_errors.items():
+            errors[name] += count
+
+    stats = {}
+    for name, values in sorted(latencies.items()):
+        values.sort()
+        stats[name] = OperationStats(
+            len(values), errors[name], percentile(values, 0.5), percentile(values, 0.95), percentile(values, 0.99),
+            values[-1])
+    return {'elapsed': elapsed, 'throughput': sum(len(values) for values in latencies.values()) / elapsed,
+            'operations': stats}
+
+
+def main():
+    parser = ArgumentParser(prog='python -m benchmarks.load', description='Load tests the client.')
+    parser.add_argument('--url', help='API origin, defaults to a fake server started in-process')
+    parser.add_argument('--workers', type=int, default=8)
+    parser.add_argument('--operations', type=int, default=1000)
+    parser.add_argument('--terms-per-day', type=int, default=100)
+    parser.add_argument('--latency', type=float, default=0.005, help='fake server latency, in seconds')
+    parser.add_argument('--jitter', type=float, default=0.005, help='fake server latency jitter, in seconds')
+    parser.add_argument('--error-rate', type=float, default=0, help='fake server failed requests fraction')
+    parser.add_argument('--no-retry', action='store_true', help='disable client retries')
+    args = parser.parse_args()
+
+    client_kwargs = {'retry': None} if args.no_retry else {'retry': RetryPolicy(backoff=0.01)}
+    if args.url:
+        result = run(args.url, args.workers, args.operations, **client_kwargs)
+    else:
+        data = FakeLuxMedData(terms_per_day=args.terms_per_day)
+        with FakeLuxMedServer(data=data, latency=args.latency, jitter=args.jitter,
+                              error_rate=args.error_rate) as server:
+            result = run(server.base_url, args.workers, args.operations, **client_kwargs)
+
+    print(f'{args.operations} operations in {result["elapsed"]:.2f}s, {result["throughput"]:.1f} op/s')
+    print(f'{"operation":20} {"count":>7} {"errors":>7} {"p50 ms":>9} {"p95 ms":>9} {"p99 ms":>9} {"max ms":>9}')
+    for name, stats in result['operations'].items():
+        print(f'{name:20} {stats.count:7} {stats.errors:7} ' + ' '.join(
+            f'{seconds * 1000:9.2f}' for seconds in (stats.p50, stats.p95, stats.p99, stats.max)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,53 @@
+import json
+from copy import deepcopy
+from pathlib import Path
+from typing import Dict
+
+import yaml
+
+
+CASSETTES_PATH = Path(__file__).resolve().parent.parent / 'tests' / 'cassettes'
+
+
+def cassette_body(name: str, index: int = 0) -> str:
+    """Response body of given (recorded) interaction."""
+    with (CASSETTES_PATH / name).open(encoding='utf-8') as f:
+        cassette = yaml.safe_load(f)
+    return cassette['interactions'][index]['response']['body']['string']
+
+
+def scaled_terms(count: int) -> Dict:
+    """Available appointments search response with (at least) given number of terms."""
+    data = json.loads(cassette_body('warsaw_internist_visits.yaml'))
+    template = [
+        term for group in data['AgregateAvailableVisitTerms'] for term in group['AvailableVisitsTermPresentation']]
+    terms = []
+    while len(terms) < count:
+        for term in template:
+            term = deepcopy(term)
+            term['ScheduleId'] += len(terms)
+            terms.append(term)
+    data['AgregateAvailableVisitTerms'] = [{'AvailableVisitsTermPresentation': terms[:count]}]
+    return data
+
+
+def scaled_examination_results(count: int) -> Dict:
+    """Examination results response with given number of results."""
+    data = json.loads(cassette_body('examination_results.yaml'))
+    template = data['MedicalExaminationsResults']
+    results = []
+    for index in range(count):
+        result = deepcopy(template[index % len(template)])
+        result['MedicalExaminationId'] = str(10100 + index)
+        results.append(result)
+    data['MedicalExaminationsResults'] = results
+    return data
+
+
+def scaled_id_names(count: int) -> Dict:
+    """Reservation filter response with given number of items in every category."""
+    data = json.loads(cassette_body('city_clinics_services.yaml'))
+    for key, items in data.items():
+        if isinstance(items, list) and items and 'Id' in items[0]:
+            data[key] = [dict(items[index % len(items)], Id=index) for index in range(count)]
+    return data
@@ -0,0 +1,369 @@
+"""Local stand-in for the LUX MED API, serving synthetic data. Run with `python -m benchmarks.server`.
+
+Implements the endpoints from `luxmed.urls` well enough for the client to work against it
+(point the client at it with the `base_url` transport option), with configurable data scale,
+latency and error rate. Not a faithful API emulation: requests are barely validated.
+"""
+import hashlib
+import json
+import random
+import re
+from argparse import ArgumentParser
+from datetime import date
+from datetime import datetime
+from datetime import timedelta
+from http.server import BaseHTTPRequestHandler
+from http.server import HTTPServer
+from socketserver import ThreadingMixIn
+from threading import Lock
+from threading import Thread
+from time import sleep
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import Tuple
+from urllib.parse import parse_qs
+from urllib.parse import urlsplit
+from uuid import uuid4
+
+from luxmed import urls
+
+
+API_PATH = urlsplit(urls.BASE_API_URL).path
+DOCUMENT_SIZE = 64 * 1024
+
+
+def _path(url: str) -> str:
+    return urlsplit(url).path
+
+
+class FakeLuxMedData:
+    """Synthetic, deterministic (seeded) API data."""
+
+    def __init__(self, cities: int = 10, clinics: int = 20, services: int = 200, doctors: int = 50,
+                 terms_per_day: int = 100, history_per_year: int = 20, examination_results: int = 100,
+                 seed: int = 0):
+        """Args:
+            cities (int, optional): Number of cities. Defaults to 10.
+            clinics (int, optional): Number of clinics in every city. Defaults to 20.
+            services (int, optional): Number of services. Defaults to 200.
+            doctors (int, optional): Number of doctors in every clinic. Defaults to 50.
+            terms_per_day (int, optional): Number of available appointments per day (for any search).
+                Defaults to 100.
+            history_per_year (int, optional): Number of historic appointments per year. Defaults to 20.
+            examination_results (int, optional): Number of examination results per year. Defaults to 100.
+            seed (int, optional): Random data seed. Defaults to 0.
+        """
+        self.cities = [{'Id': index + 1, 'Name': f'City {index + 1}'} for index in range(cities)]
+        self.clinics = {
+            city['Id']: [{'Id': city['Id'] * 1000 + index, 'Name': f'Clinic {city["Id"]}-{index}'}
+                         for index in range(clinics)]
+            for city in self.cities}
+        self.services = [
+            {'Id': 4500 + index, 'Name': f'Service {index}', 'NameIncludeReferralType': None}
+            for index in range(services)]
+        self.doctors = doctors
+        self.languages = [{'Id': 10, 'Name': 'polish'}, {'Id': 11, 'Name': 'english'}]
+        self.payers = [{'Id': 10101, 'IsFeeForService': False, 'Name': 'Acme Corporation'}]
+        self.terms_per_day = terms_per_day
+        self.history_per_year = history_per_year
+        self.examination_results = examination_results
+        self.seed = seed
+
+    def _random(self, *key) -> random.Random:
+        return random.Random(repr((self.seed,) + key))  # str seeds are stable between processes
+
+    def reservation_filter(self, city_id: int = None, clinic_id: int = None, service_id: int = None) -> Dict:
+        clinics = self.clinics.get(city_id, [])
+        if clinic_id is not None:
+            clinics = [clinic for clinic in clinics if clinic['Id'] == clinic_id]
+        doctors = []
+        if service_id is not None:
+            doctors = [
+                {'Id': clinic['Id'] * 100 + index, 'Name': f'Doctor {clinic["Id"] * 100 + index}'}
+                for clinic in clinics for index in range(self.doctors)]
+        return {
+            'Cities': self.cities, 'Clinics': clinics, 'Services': self.services if city_id else [],
+            'Doctors': doctors, 'Languages': self.languages, 'Payers': self.payers if service_id else []}
+
+    def available_terms(self, city_id: int, service_id: int, from_date: date, to_date: date,
+                        clinic_id: int = None, doctor_id: int = None) -> Dict:
+        clinics = self.clinics.get(city_id, [])
+        if clinic_id is not None:
+            clinics = [clinic for clinic in clinics if clinic['Id'] == clinic_id]
+        groups = []
+        day = from_date
+        while day <= to_date and clinics:
+            rnd = self._random(city_id, service_id, day.toordinal())
+            terms = []
+            for index in range(self.terms_per_day):
+                clinic = rnd.choice(clinics)
+                doctor = doctor_id or clinic['Id'] * 100 + rnd.randrange(self.doctors)
+                start = datetime(day.year, day.month, day.day, 7) + timedelta(minutes=15 * rnd.randrange(52))
+                terms.append({
+                    'ServiceId': service_id,
+                    'Clinic': clinic,
+                    'Doctor': {'Id': doctor, 'Name': f'Doctor {doctor}'},
+                    'VisitDate': {
+                        'StartDateTime': start.isoformat() + '+02:00',
+                        'EndDateTime': (start + timedelta(minutes=15)).isoformat() + '+02:00'},
+                    'RoomId': 300 + index % 50,
+                    'ScheduleId': day.toordinal() * 10000 + index,
+                    'IsAdditional': False,
+                    'ReferralRequiredByService': False,
+                    'TimeOfDay': 1,
+                    'PayerDetailsList': [{'PayerId': 10101, 'PayerName': 'Acme Corporation', 'ServaId': service_id}]})
+            terms.sort(key=lambda term: term['VisitDate']['StartDateTime'])
+            groups.append({'AvailableVisitsTermPresentation': terms, 'VisitDate': day.isoformat()})
+            day += timedelta(days=1)
+        return {'AgregateAvailableVisitTerms': groups, 'AgregateAvailableAdditionalVisitTerms': []}
+
+    def _spread(self, count_per_year: int, from_date: date, to_date: date, *key) -> List[date]:
+        days = (to_date - from_date).days + 1
+        rnd = self._random(from_date.toordinal(), to_date.toordinal(), *key)
+        return sorted(from_date + timedelta(days=rnd.randrange(days))
+                      for _ in range(max(1, count_per_year * days // 365)))
+
+    def history(self, from_date: date, to_date: date) -> List[Dict]:
+        return [
+            {'Id': day.toordinal() * 100 + index, 'ServiceName': f'Service {index}',
+             'VisitDate': {'StartDateTime': f'{day.isoformat()}T08:00:00+02:00'}}
+            for index, day in enumerate(self._spread(self.history_per_year, from_date, to_date, 'history'))]
+
+    def examination_results_list(self, from_date: date, to_date: date) -> Dict:
+        results = []
+        for index, day in enumerate(self._spread(self.examination_results, from_date, to_date, 'results')):
+            id_ = str(day.toordinal() * 1000 + index)
+            href = f'{API_PATH}/medical-examinations-results/internal/{id_}'
+            results.append({
+                'MedicalExaminationId': id_,
+                'ExaminationsNames': [f'Examination {index % 30}'],
+                'Date': {'DateTime': f'{day.isoformat()}T12:00:00+0000'},
+                'AvailabilityInfo': {'IsAvailable': True, 'UnavailableMessage': ''},
+                'IsInternalResult': True,
+                'DownloadLinks': [{
+                    'FileName': f'medical_examination_{id_}.pdf', 'Rel': 'examination-result-document',
+                    'Href': href + '/document', 'Method': 'GET'}],
+                'Links': [{'Rel': 'examination-result-details', 'Href': href, 'Method': 'GET'}]})
+        return {'MedicalExaminationsResults': results}
+
+    @staticmethod
+    def examination_details(id_: str) -> Dict:
+        return {'MedicalExaminationId': id_, 'Examinations': [{'Name': 'Result', 'Value': '1.0', 'Unit': 'g/l'}]}
+
+    @staticmethod
+    def document(id_: str) -> bytes:
+        header = f'%PDF-1.4 examination {id_} '.encode()
+        return header + b'\0' * (DOCUMENT_SIZE - len(header) - 5) + b'%%EOF'
+
+
+def _date(params: Dict[str, List[str]], name: str, default: date) -> date:
+    value = params.get(f'filter.{name}')
+    return date(*map(int, value[0][:10].split('-'))) if value else default
+
+
+def _int(params: Dict[str, List[str]], name: str) -> Optional[int]:
+    value = params.get(f'filter.{name}')
+    return int(value[0]) if value else None
+
+
+class FakeLuxMedHandler(BaseHTTPRequestHandler):
+    server: 'FakeLuxMedServer'
+    protocol_version = 'HTTP/1.1'  # keep-alive, like the real API
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status: int, body: bytes = b'', content_type: str = None, headers: Dict[str, str] = None):
+        self.send_response(status)
+        if content_type:
+            self.send_header('Content-Type', content_type)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        if self.command != 'HEAD':
+            truncate_after = self.server.truncate_after
+            if truncate_after is not None and len(body) > truncate_after:
+                body = body[:truncate_after]
+                self.close_connection = True  # dropped mid-body
+            self.wfile.write(body)
+
+    def _json(self, data, status: int = 200):
+        body = json.dumps(data).encode()
+        if self.server.etags and self.command == 'GET' and status == 200:
+            etag = '"' + hashlib.sha1(body).hexdigest()[:16] + '"'
+            if self.headers.get('If-None-Match') == etag:
+                return self._send(304, headers={'ETag': etag})
+            return self._send(status, body, 'application/json; charset=utf-8', {'ETag': etag})
+        self._send(status, body, 'application/json; charset=utf-8')
+
+    def _error(self, status: int, code: int, message: str):
+        self._json({'Errors': [{'ErrorCode': code, 'Message': message, 'AdditionalData': {}}]}, status)
+
+    def _body(self) -> bytes:
+        return self.rfile.read(int(self.headers.get('Content-Length', 0)))
+
+    def _handle(self):
+        server = self.server
+        body = self._body()
+        url = urlsplit(self.path)
+        path = url.path
+        params = parse_qs(url.query)
+        server.delay()
+        if server.fails():
+            return self._send(503, headers={'Retry-After': '0'})
+
+        if path == _path(urls.TOKEN_URL) and self.command == 'POST':
+            form = parse_qs(body.decode())
+            if form.get('grant_type') == ['password'] and form.get('password') == ['bad']:
+                return self._error(400, 2, 'Invalid login or password.')
+            if form.get('grant_type') == ['refresh_token'] and form.get('refresh_token') == ['revoked']:
+                return self._json({'error': 'invalid_grant'}, 400)  # OAuth style, without the API errors
+            return self._json({
+                'access_token': uuid4().hex, 'token_type': 'bearer', 'expires_in': server.token_lifetime,
+                'refresh_token': uuid4().hex})
+        if self.command != 'HEAD' and not self.headers.get('Authorization'):
+            return self._json({'Message': 'Authorization has been denied for this request.'}, 401)
+
+        data = server.data
+        today = date.today()
+        if self.command == 'HEAD':
+            return self._send(200)
+        if path == _path(urls.USER_URL):
+            return self._json({'UserName': 'user', 'FirstName': 'John', 'LastName': 'Doe'})
+        if path == _path(urls.USER_PERMISSIONS_URL):
+            return self._json({'Visits': {'HistoricVisitsModule': {'HasPermission': True}}, 'Role': 2})
+        if path == _path(urls.VISIT_TERMS_RESERVATION_URL):
+            return self._json(data.reservation_filter(
+                _int(params, 'CityId'), _int(params, 'ClinicId'), _int(params, 'ServiceId')))
+        if path == _path(urls.VISIT_TERMS_URL):
+            from_date = _date(params, 'FromDate', today)
+            return self._json(data.available_terms(
+                _int(params, 'CityId'), _int(params, 'ServiceId'), from_date,
+                _date(params, 'ToDate', from_date + timedelta(days=7)), _int(params, 'ClinicId'),
+                _int(params, 'DoctorId')))
+        if path == _path(urls.VISIT_RESERVE_TEMPORARY_URL) and self.command == 'POST':
+            return self._json({'Id': server.next_id(), 'InformationMessages': [], 'HasReferralRequired': False}, 201)
+        if path == _path(urls.VISIT_TERMS_VALUATION_URL) and self.command == 'POST':
+            return self._json({'VisitTermVariants': [{'ValuationDetail': {'ValuationType': 1, 'Price': 0.0}}]})
+        if path == _path(urls.VISIT_RESERVE_URL):
+            if self.command == 'POST':
+                return self._json({'ReservedVisitsLimitInfo': {'CanReserve': True}}, 201)
+            return self._json([])
+        if path.startswith(_path(urls.RESERVED_VISITS_URL) + '/') and self.command == 'DELETE':
+            return self._send(200)
+        if path == _path(urls.HISTORY_VISITS_URL):
+            from_date = _date(params, 'FromDate', today - timedelta(days=365))
+            return self._json(data.history(from_date, _date(params, 'ToDate', today)))
+        if path == _path(urls.EXAMINATION_RESULTS_URL):
+            from_date = _date(params, 'FromDate', today - timedelta(days=365))
+            return self._json(data.examination_results_list(from_date, _date(params, 'ToDate', today)))
+        match = re.fullmatch(re.escape(_path(urls.EXAMINATION_RESULTS_URL)) + r'/internal/(\d+)(/document)?', path)
+        if match:
+            if not match.group(2):
+                return self._json(data.examination_details(match.group(1)))
+            return self._document(data.document(match.group(1)))
+        return self._error(404, 0, 'Not found.')
+
+    def _document(self, document: bytes):
+        byte_range = re.fullmatch(r'bytes=(\d+)-', self.headers.get('Range', ''))
+        if byte_range:
+            offset = int(byte_range.group(1))
+            if offset >= len(document):
+                return self._send(416, headers={'Content-Range': f'bytes */{len(document)}'})
+            return self._send(206, document[offset:], 'application/pdf', {
+                'Content-Range': f'bytes {offset}-{len(document) - 1}/{len(document)}'})
+        self._send(200, document, 'application/pdf', {'Accept-Ranges': 'bytes'})
+
+    do_GET = do_POST = do_DELETE = do_HEAD = _handle
+
+
+class FakeLuxMedServer(ThreadingMixIn, HTTPServer):
+    """Threaded fake API server. Can be used as a context manager, serving in a background thread."""
+    daemon_threads = True
+
+    def __init__(self, address: Tuple[str, int] = ('127.0.0.1', 0), data: FakeLuxMedData = None,
+                 latency: float = 0, jitter: float = 0, error_rate: float = 0, token_lifetime: int = 599,
+                 etags: bool = False, truncate_after: int = None):
+        """Args:
+            address (tuple, optional): Host and port to listen on. Defaults to a free local port.
+            data (FakeLuxMedData, optional): Served data. Defaults to the default scale.
+            latency (float, optional): Minimum response delay, in seconds. Defaults to none.
+            jitter (float, optional): Maximum random delay added to the latency, in seconds. Defaults to none.
+            error_rate (float, optional): Fraction of requests failed with 503. Defaults to none.
+            token_lifetime (int, optional): Access token lifetime, in seconds. Defaults to 599 (like the API).
+            etags (bool, optional): Send ETags with JSON responses and answer matching conditional requests
+                with 304. Defaults to false.
+            truncate_after (int, optional): Drop the connection after sending this many bytes of the longer
+                response bodies. Defaults to sending them whole.
+        """
+        super().__init__(address, FakeLuxMedHandler)
+        self.data = data or FakeLuxMedData()
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.token_lifetime = token_lifetime
+        self.etags = etags
+        self.truncate_after = truncate_after
+        self._random = random.Random()
+        self._id = 0
+        self._lock = Lock()
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        """Origin to be used as the transport `base_url`."""
+        host, port = self.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def delay(self):
+        seconds = self.latency + (self._random.uniform(0, self.jitter) if self.jitter else 0)
+        if seconds:
+            sleep(seconds)
+
+    def fails(self) -> bool:
+        return self.error_rate > 0 and self._random.random() < self.error_rate
+
+    def next_id(self) -> int:
+        with self._lock:
+            self._id += 1
+            return self._id
+
+    def __enter__(self):
+        self._thread = Thread(target=self.serve_forever, name='fake-luxmed', daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.shutdown()
+        self.server_close()
+        self._thread.join()
+
+
+def main():
+    parser = ArgumentParser(prog='python -m benchmarks.server', description='Runs the fake LUX MED API server.')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--terms-per-day', type=int, default=100)
+    parser.add_argument('--examination-results', type=int, default=100, help='per year')
+    parser.add_argument('--latency', type=float, default=0, help='seconds')
+    parser.add_argument('--jitter', type=float, default=0, help='seconds')
+    parser.add_argument('--error-rate', type=float, default=0, help='fraction of failed requests')
+    parser.add_argument('--etags', action='store_true', help='support conditional requests')
+    args = parser.parse_args()
+    server = FakeLuxMedServer(
+        (args.host, args.port),
+        FakeLuxMedData(terms_per_day=args.terms_per_day, examination_results=args.examination_results),
+        latency=args.latency, jitter=args.jitter, error_rate=args.error_rate, etags=args.etags)
+    print(f'Serving on {server.base_url}')
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,135 @@
+import json
+from datetime import date
+from datetime import time
+from typing import Callable
+from typing import Dict
+
+from requests import Response
+
+from luxmed.decoding import resolve_decoder
+from luxmed.decoding import stdlib_loads
+from luxmed.errors import LuxMedError
+from luxmed.index import VisitIndex
+from luxmed.transformers import filter_args
+from luxmed.transformers import full_filter_name
+from luxmed.transformers import map_id_name
+from luxmed.visits import LuxMedVisits
+from luxmed.visits import available_terms
+from luxmed.visits import find_filters
+
+from benchmarks.payloads import cassette_body
+from benchmarks.payloads import scaled_examination_results
+from benchmarks.payloads import scaled_id_names
+from benchmarks.payloads import scaled_terms
+from benchmarks.server import FakeLuxMedData
+
+
+TERMS = 5000
+EXAMINATION_RESULTS = 500
+ID_NAMES = 1000
+
+# benchmark name mapped to its setup, returning the measured (argumentless) callable
+BENCHMARKS: Dict[str, Callable[[], Callable[[], object]]] = {}
+
+
+def benchmark(name: str):
+    """Registers decorated setup under given benchmark name."""
+    def register(setup: Callable[[], Callable[[], object]]) -> Callable[[], Callable[[], object]]:
+        BENCHMARKS[name] = setup
+        return setup
+    return register
+
+
+class FakeTransport:
+    """Returns already decoded response data, so that only the client side processing is measured."""
+
+    def __init__(self, data):
+        self.data = data
+
+    def get(self, url, params=None, **kwargs):
+        if params is not None:
+            list(params)
+        return self.data
+
+
+@benchmark('full_filter_name')
+def bench_full_filter_name():
+    return lambda: full_filter_name('referral_required_by_service')
+
+
+@benchmark('filter_args')
+def bench_filter_args():
+    return lambda: list(find_filters(
+        city_id=1, service_id=4502, language_id=10, payer_id=123, from_date=date(2019, 8, 22)))
+
+
+@benchmark('filter_args_defaults')
+def bench_filter_args_defaults():
+    return lambda: list(filter_args(from_date=None, city_id=1))
+
+
+@benchmark('map_id_name')
+def bench_map_id_name():
+    data = scaled_id_names(ID_NAMES)['Services']
+    return lambda: map_id_name(data)
+
+
+@benchmark('find_terms')
+def bench_find_terms():
+    visits = LuxMedVisits(FakeTransport(scaled_terms(TERMS)))
+    return lambda: list(visits.find(city_id=1, service_id=4502, language_id=10, payer_id=123))
+
+
+@benchmark('find_terms_compact')
+def bench_find_terms_compact():
+    visits = LuxMedVisits(FakeTransport(scaled_terms(TERMS)))
+    return lambda: list(visits.find(city_id=1, service_id=4502, language_id=10, payer_id=123, compact=True))
+
+
+@benchmark('common_reservation_data')
+def bench_common_reservation_data():
+    return lambda: dict(LuxMedVisits._common_reservation_data(
+        clinic_id=1, doctor_id=10200, room_id=303, service_id=4502, start_date_time='2019-08-22T09:00:00+02:00'))
+
+
+@benchmark('error_from_response')
+def bench_error_from_response():
+    response = Response()
+    response.status_code = 400
+    response.headers['Content-Type'] = 'application/json; charset=utf-8'
+    response._content = cassette_body('unauthenticated.yaml').encode()
+    return lambda: LuxMedError.from_response(response)
+
+
+@benchmark('decode_terms')
+def bench_decode_terms():
+    body = json.dumps(scaled_terms(TERMS)).encode()
+    return lambda: stdlib_loads(body)
+
+
+@benchmark('decode_terms_auto')
+def bench_decode_terms_auto():
+    body = json.dumps(scaled_terms(TERMS)).encode()
+    loads = resolve_decoder('auto')
+    return lambda: loads(body)
+
+
+@benchmark('decode_examination_results')
+def bench_decode_examination_results():
+    body = json.dumps(scaled_examination_results(EXAMINATION_RESULTS)).encode()
+    return lambda: stdlib_loads(body)
+
+
+@benchmark('decode_examination_results_auto')
+def bench_decode_examination_results_auto():
+    body = json.dumps(scaled_examination_results(EXAMINATION_RESULTS)).encode()
+    loads = resolve_decoder('auto')
+    return lambda: loads(body)
+
+
+@benchmark('index_earliest')
+def bench_index_earliest():
+    data = FakeLuxMedData(terms_per_day=TERMS // 30)
+    index = VisitIndex(available_terms(data.available_terms(1, 4500, date(2024, 3, 1), date(2024, 3, 30))))
+    clinic_ids = [clinic['Id'] for clinic in data.clinics[1][:2]]
+    return lambda: index.earliest(after=date(2024, 3, 10), from_time=time(16), weekdays=range(5), clinic_ids=clinic_ids)
@@ -1 +1,21 @@
-from .luxmed import LuxMed
+from importlib import import_module
+
+
+__all__ = ['LuxMed', 'LuxMedPool']
+# public names mapped to their modules, imported on first access (keeps `import luxmed` cheap)
+_LAZY = {
+    'LuxMed': 'luxmed.luxmed',
+    'LuxMedPool': 'luxmed.pool'}
+
+
+def __getattr__(name: str):
+    try:
+        module = _LAZY[name]
+    except KeyError:
+        raise AttributeError(f'module {__name__!r} has no attribute {name!r}') from None
+    value = globals()[name] = getattr(import_module(module), name)
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY))
@@ -0,0 +1,320 @@
+"""Native asyncio counterpart of the client. Requires the optional `aiohttp` dependency."""
+from asyncio import Lock
+from asyncio import TimeoutError
+from datetime import date
+from typing import AsyncIterator
+from typing import Dict
+from typing import Iterable
+from typing import List
+from typing import Tuple
+from typing import Union
+from uuid import uuid4
+
+from aiohttp import ClientConnectionError
+from aiohttp import ClientSession
+from aiohttp import TCPConnector
+
+from luxmed.decoding import JSONDecoder
+from luxmed.decoding import resolve_decoder
+from luxmed.errors import LuxMedConnectionError
+from luxmed.errors import LuxMedError
+from luxmed.errors import LuxMedTimeoutError
+from luxmed.mapping import LuxMedReadOnlyMapping
+from luxmed.transformers import filter_args
+from luxmed.transformers import map_id_name
+from luxmed.transport import client_headers
+from luxmed.urls import BASE_URL
+from luxmed.urls import EXAMINATION_RESULTS_URL
+from luxmed.urls import HISTORY_VISITS_URL
+from luxmed.urls import RESERVED_VISITS_URL
+from luxmed.urls import TOKEN_URL
+from luxmed.urls import USER_PERMISSIONS_URL
+from luxmed.urls import USER_URL
+from luxmed.urls import VISIT_RESERVE_TEMPORARY_URL
+from luxmed.urls import VISIT_RESERVE_URL
+from luxmed.urls import VISIT_TERMS_RESERVATION_URL
+from luxmed.urls import VISIT_TERMS_URL
+from luxmed.urls import VISIT_TERMS_VALUATION_URL
+from luxmed.utils import find_link_rel
+from luxmed.utils import year_ago
+from luxmed.visits import VisitHours
+from luxmed.visits import available_terms
+from luxmed.visits import final_reservation_data
+from luxmed.visits import find_filters
+from luxmed.visits import reservation_data
+
+
+def _query(params: Iterable[Tuple[str, Union[int, str]]]) -> List[Tuple[str, str]]:
+    # unlike requests, aiohttp accepts neither generators nor arbitrary (e.g. date) values
+    return [(name, str(value)) for name, value in params]
+
+
+class AsyncLuxMedTransport:
+    """Responsible for asynchronous communication with the API."""
+
+    TOKEN_HEADER_NAME = 'Authorization'
+
+    def __init__(self, user_name: str, password: str,
+                 app_uuid: str = None, client_uuid: str = None, lang_code: str = 'en', limit: int = 100,
+                 json_decoder: Union[str, JSONDecoder] = 'auto'):
+        """Args:
+            user_name (str): Your LUX MED login.
+            password (str): Your LUX MED password.
+            app_uuid (str, optional): Application UUID. Defaults to random UUID.
+            client_uuid (str, optional): Client UUID. Defaults to random UUID.
+            lang_code (str, optional): Two letter (ISO 639-1) language code. Defaults to en.
+            limit (int, optional): Maximum number of simultaneous connections. Defaults to 100.
+            json_decoder (str or callable, optional): JSON decoder name or function, see `luxmed.decoding`.
+                Defaults to the fastest one available.
+        """
+        self.user_name = user_name
+        self.password = password
+        self.app_uuid = app_uuid or str(uuid4())
+        self.client_uuid = client_uuid or str(uuid4())
+        self.lang_code = lang_code
+        self.limit = limit
+        self._loads = resolve_decoder(json_decoder)
+
+        self._headers = client_headers(self.app_uuid, self.lang_code)
+        # connection handling is up to aiohttp
+        del self._headers['Connection']
+        self._session = None
+        self._auth_lock = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    def _get_session(self) -> ClientSession:
+        # session (and lock) must be created within a running event loop
+        if self._session is None or self._session.closed:
+            self._session = ClientSession(headers=self._headers, connector=TCPConnector(limit=self.limit))
+        return self._session
+
+    async def _request(self, method: str, url: str, params: Iterable = None, **kwargs):
+        if params is not None:
+            kwargs['params'] = _query(params)
+        try:
+            async with self._get_session().request(method, url, **kwargs) as response:
+                body = await response.read()
+                status = response.status
+                content_type = response.headers.get('Content-Type')
+        except TimeoutError as error:
+            raise LuxMedTimeoutError('Request timed out') from error
+        except ClientConnectionError as error:
+            raise LuxMedConnectionError('Connection failed') from error
+
+        if status >= 400:
+            try:
+                data = self._loads(body)
+            except ValueError as error:  # malformed JSON or not UTF-8
+                raise LuxMedError('JSON data missing') from error
+            raise LuxMedError.from_data(data, status)
+        if content_type is None:  # no content
+            return
+        if 'application/json' in content_type:
+            return self._loads(body)
+        return body
+
+    async def authenticate(self):
+        """Authenticates session with the credentials given during initialization."""
+        token = await self._request('POST', TOKEN_URL, data={
+            'client_id': self.client_uuid,
+            'grant_type': 'password',
+            'username': self.user_name,
+            'password': self.password})
+        self._headers[self.TOKEN_HEADER_NAME] = token['token_type'] + ' ' + token['access_token']
+        self._get_session().headers[self.TOKEN_HEADER_NAME] = self._headers[self.TOKEN_HEADER_NAME]
+
+    async def close(self):
+        """Closes all open connections."""
+        if self._session is not None:
+            await self._session.close()
+
+    async def request(self, method: str, url: str, **kwargs) -> Union[Dict, List, bytes, None]:
+        """Sends request via given HTTP method to a URL with all the required headers set.
+        Concurrent requests wait for a single authentication.
+
+        Args:
+            method: The HTTP method.
+            url: Requested URL.
+            **kwargs: Remaining request parameters forwarded to the underlying `aiohttp.ClientSession.request`.
+
+        Returns:
+            Parsed JSON or None when not available.
+        """
+        if self.TOKEN_HEADER_NAME not in self._headers:
+            if self._auth_lock is None:
+                self._auth_lock = Lock()
+            async with self._auth_lock:
+                if self.TOKEN_HEADER_NAME not in self._headers:
+                    await self.authenticate()
+        return await self._request(method, url, **kwargs)
+
+    async def delete(self, url, **kwargs):
+        return await self.request('DELETE', url, **kwargs)
+
+    async def get(self, url, **kwargs):
+        return await self.request('GET', url, **kwargs)
+
+    async def post(self, url, **kwargs):
+        return await self.request('POST', url, **kwargs)
+
+
+class AsyncLuxMedExaminationResult(LuxMedReadOnlyMapping):
+    async def details(self) -> Dict:
+        """Examination result details."""
+        return await self._transport.get(BASE_URL + find_link_rel(
+            self.data['Links'], 'examination-result-details')['Href'])
+
+    async def document(self) -> bytes:
+        """Examination result details in PDF."""
+        return await self._transport.get(BASE_URL + find_link_rel(
+            self.data['DownloadLinks'], 'examination-result-document')['Href'])
+
+
+class AsyncLuxMedExamination:
+    def __init__(self, transport: AsyncLuxMedTransport):
+        self._transport = transport
+
+    async def results(self, from_date: date = None,
+                      to_date: date = None) -> AsyncIterator[AsyncLuxMedExaminationResult]:
+        """Yields examination results between the given dates. See `LuxMedExamination.results`."""
+        if not from_date:
+            from_date = year_ago()
+        if not to_date:
+            to_date = date.today()
+
+        for result in (await self._transport.get(
+                    EXAMINATION_RESULTS_URL,
+                    params=filter_args(from_date=from_date, to_date=to_date)
+                ))['MedicalExaminationsResults']:
+            yield AsyncLuxMedExaminationResult(result, self._transport)
+
+
+class AsyncLuxMedVisits:
+    """Doctor appointments. See `LuxMedVisits` for the methods description."""
+
+    def __init__(self, transport: AsyncLuxMedTransport):
+        self._transport = transport
+        self._headers = {'Api-Version': '2.0'}
+
+    async def cancel(self, reservation_id: int):
+        await self._transport.delete('{}/{}'.format(RESERVED_VISITS_URL, reservation_id))
+
+    async def evaluate(self, *args, payer_details: List[Dict], **kwargs) -> Dict:
+        return await self._transport.post(
+            VISIT_TERMS_VALUATION_URL, json=reservation_data(*args, payer_details=payer_details, **kwargs))
+
+    async def find(self, city_id: int, service_id: int, language_id: int, payer_id: int,
+                   clinic_id: int = None, doctor_id: int = None,
+                   from_date: date = None, to_date: date = None,
+                   hours: VisitHours = VisitHours.ALL) -> AsyncIterator[Dict]:
+        available = await self._transport.get(VISIT_TERMS_URL, params=find_filters(
+            city_id=city_id, service_id=service_id, language_id=language_id, payer_id=payer_id,
+            clinic_id=clinic_id, doctor_id=doctor_id,
+            from_date=from_date, to_date=to_date, hours=hours), headers=self._headers)
+        for visit in available_terms(available):
+            yield visit
+
+    async def history(self, from_date: date = None, to_date: date = None) -> List[Dict]:
+        if not from_date:
+            from_date = year_ago()
+        if not to_date:
+            to_date = date.today()
+        return await self._transport.get(HISTORY_VISITS_URL, params=filter_args(
+            from_date=from_date, to_date=to_date))
+
+    async def reserve_temporarily(self, *args, payer_details: List[Dict], **kwargs) -> Dict:
+        return await self._transport.post(
+            VISIT_RESERVE_TEMPORARY_URL, json=reservation_data(*args, payer_details=payer_details, **kwargs))
+
+    async def reserve(self, *args, payer_data: Dict, **kwargs) -> Dict:
+        temp_reservation = await self.reserve_temporarily(*args, payer_details=[payer_data], **kwargs)
+        await self.evaluate(*args, payer_details=[payer_data], **kwargs)  # follow the app, as the sync client does
+
+        return await self._transport.post(VISIT_RESERVE_URL, json=final_reservation_data(
+            *args, payer_data=payer_data, temporary_reservation_id=temp_reservation['Id'], **kwargs))
+
+    async def reserved(self) -> List[Dict]:
+        return await self._transport.get(RESERVED_VISITS_URL, headers=self._headers)
+
+
+class AsyncLuxMed:
+    """LUX MED Group patient portal (unofficial) asyncio API client.
+    Mirrors `LuxMed`, with all the methods being coroutines (or asynchronous generators).
+    """
+
+    def __init__(self, user_name: str, password: str, app_uuid: str = None, client_uuid: str = None,
+                 lang_code: str = 'en', limit: int = 100, json_decoder: Union[str, JSONDecoder] = 'auto'):
+        """Args:
+            user_name (str): Your LUX MED login.
+            password (str): Your LUX MED password.
+            app_uuid (str, optional): Application UUID. Defaults to random UUID.
+            client_uuid (str, optional): Client UUID. Defaults to random UUID.
+            lang_code (str, optional): Two letter (ISO 639-1) language code. Defaults to en.
+            limit (int, optional): Maximum number of simultaneous connections. Defaults to 100.
+            json_decoder (str or callable, optional): JSON decoder name or function, see `luxmed.decoding`.
+                Defaults to the fastest one available.
+        """
+        self._transport = AsyncLuxMedTransport(
+            user_name=user_name, password=password,
+            app_uuid=app_uuid, client_uuid=client_uuid, lang_code=lang_code, limit=limit,
+            json_decoder=json_decoder)
+        self.examination = AsyncLuxMedExamination(self._transport)
+        self.visits = AsyncLuxMedVisits(self._transport)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def _visit_filters(self, **kwargs) -> Dict:
+        return await self._transport.get(VISIT_TERMS_RESERVATION_URL, params=filter_args(**kwargs))
+
+    async def _mapped_visit_filters(self, category: str, **kwargs) -> Dict[int, str]:
+        return map_id_name((await self._visit_filters(**kwargs))[category])
+
+    async def close(self):
+        """Closes all open connections."""
+        await self._transport.close()
+
+    async def cities(self, from_date: date = None) -> Dict[int, str]:
+        """Cities the service is available in."""
+        return await self._mapped_visit_filters('Cities', from_date=from_date)
+
+    async def clinics(self, city_id: int, from_date: date = None) -> Dict[int, str]:
+        """Clinics available in the given city."""
+        return await self._mapped_visit_filters('Clinics', city_id=city_id, from_date=from_date)
+
+    async def doctors(self, city_id: int, service_id: int, clinic_id: int = None,
+                      from_date: date = None) -> Dict[int, str]:
+        """Doctors available in the given city and providing specified service."""
+        return await self._mapped_visit_filters(
+            'Doctors', city_id=city_id, clinic_id=clinic_id, from_date=from_date, service_id=service_id)
+
+    async def languages(self, from_date: date = None) -> Dict[int, str]:
+        """Languages the service is accessible in."""
+        return await self._mapped_visit_filters('Languages', from_date=from_date)
+
+    async def payers(self, city_id: int, service_id: int, clinic_id: int = None,
+                     from_date: date = None) -> List[Dict]:
+        """Payers available for the given city and service."""
+        return (await self._visit_filters(
+            city_id=city_id, clinic_id=clinic_id, from_date=from_date, service_id=service_id))['Payers']
+
+    async def services(self, city_id: int, clinic_id: int = None, from_date: date = None) -> Dict[int, str]:
+        """Services available in the given city."""
+        return await self._mapped_visit_filters(
+            'Services', city_id=city_id, clinic_id=clinic_id, from_date=from_date)
+
+    async def user(self) -> Dict:
+        """User profile."""
+        return await self._transport.get(USER_URL)
+
+    async def user_permissions(self) -> Dict:
+        """User module permissions/restrictions."""
+        return await self._transport.get(USER_PERMISSIONS_URL)
@@ -0,0 +1,122 @@
+from collections import OrderedDict
+from threading import Event
+from threading import Lock
+from time import monotonic
+from typing import Any
+from typing import Callable
+from typing import Dict
+from typing import Hashable
+
+
+class _Flight:
+    """Value being loaded by one of the callers, awaited by the others."""
+
+    def __init__(self):
+        self.done = Event()
+        self.value = None
+        self.error = None
+
+
+class TTLCache:
+    """Thread-safe, least recently used cache with expiring entries.
+    Concurrent loads of the same missing key are coalesced into a single load.
+    """
+
+    def __init__(self, ttl: float = 300, max_size: int = 128, timer: Callable[[], float] = monotonic):
+        """Args:
+            ttl (float, optional): Entry time to live, in seconds. Defaults to 5 minutes.
+            max_size (int, optional): Maximum number of entries. Least recently used are evicted first.
+                Defaults to 128.
+            timer (callable, optional): Current time source, in seconds. Defaults to monotonic clock.
+        """
+        self.ttl = ttl
+        self.max_size = max_size
+        self._timer = timer
+        self._entries: 'OrderedDict[Hashable, tuple]' = OrderedDict()
+        self._flights: Dict[Hashable, _Flight] = {}
+        self._lock = Lock()
+
+    def __getstate__(self):
+        # loads in flight belong to the threads of this process
+        state = self.__dict__.copy()
+        del state['_flights'], state['_lock']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._flights = {}
+        self._lock = Lock()
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:
+            return self._lookup(key) is not None
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _lookup(self, key: Hashable):
+        try:
+            expires_at, value = self._entries[key]
+        except KeyError:
+            return
+        if expires_at <= self._timer():
+            del self._entries[key]
+            return
+        self._entries.move_to_end(key)
+        return value,
+
+    def _store(self, key: Hashable, value: Any):
+        self._entries[key] = self._timer() + self.ttl, value
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        """Removes all entries."""
+        with self._lock:
+            self._entries.clear()
+
+    def invalidate(self, key: Hashable):
+        """Removes given entry, if present."""
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def get(self, key: Hashable, load: Callable[[], Any]) -> Any:
+        """Returns cached value, loading it when missing or expired.
+
+        Args:
+            key (hashable): Entry key.
+            load (callable): Returns a fresh value. Called by at most one caller at a time for the given key,
+                the remaining ones wait for its result (or exception).
+
+        Returns:
+            Cached or freshly loaded value.
+        """
+        with self._lock:
+            found = self._lookup(key)
+            if found is not None:
+                return found[0]
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+
+        try:
+            flight.value = load()
+        except BaseException as error:
+            flight.error = error
+            raise
+        else:
+            with self._lock:
+                self._store(key, flight.value)
+            return flight.value
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
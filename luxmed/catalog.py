@@ -0,0 +1,187 @@
+import gzip
+import json
+import os
+from pathlib import Path
+from time import time
+from typing import Dict
+from typing import Iterable
+from typing import List
+from typing import Set
+from typing import Tuple
+from typing import Union
+
+from luxmed.luxmed import LuxMed
+
+
+CATEGORIES = ('cities', 'clinics', 'services', 'doctors')
+
+
+def _int_keys(data: Dict) -> Dict[int, object]:
+    # JSON object keys are always strings
+    return {int(key): value for key, value in data.items()}
+
+
+class LuxMedCatalog:
+    """Local snapshot of the city -> clinics -> services -> doctors graph.
+
+    Lookups are served from memory. Snapshot is stored in a compact (gzipped JSON) file and refreshed
+    incrementally: only stale, new or changed subtrees are crawled again.
+    """
+
+    VERSION = 1
+
+    def __init__(self, luxmed: LuxMed = None, path: Union[str, Path] = None):
+        """Args:
+            luxmed (LuxMed, optional): Client used for refreshing. Not needed for lookups only.
+            path (str or Path, optional): Snapshot file. Loaded when it exists.
+        """
+        self.luxmed = luxmed
+        self.path = Path(path) if path is not None else None
+        self.names: Dict[str, Dict[int, str]] = {category: {} for category in CATEGORIES}
+        # city ID -> (checked at, clinic ID -> (crawled at, service ID -> doctor IDs))
+        self.graph: Dict[int, List] = {}
+        self._ids: Dict[str, Dict[str, int]] = {}
+        if self.path is not None and self.path.exists():
+            self.load()
+
+    def _index(self):
+        self._ids = {
+            category: {name.casefold(): id_ for id_, name in names.items()}
+            for category, names in self.names.items()}
+
+    def load(self, path: Union[str, Path] = None):
+        """Replaces current snapshot with the one stored in a file.
+
+        Args:
+            path (str or Path, optional): Snapshot file. Defaults to the one given during initialization.
+        """
+        with gzip.open(str(path or self.path), 'rt', encoding='utf-8') as f:
+            data = json.load(f)
+        if data.get('version') != self.VERSION:
+            raise ValueError('Unsupported catalog version.')
+        self.names = {category: _int_keys(data['names'][category]) for category in CATEGORIES}
+        self.graph = {
+            city_id: [city_updated, {
+                int(clinic_id): [clinic_updated, {
+                    int(service_id): doctor_ids for service_id, doctor_ids in services.items()}]
+                for clinic_id, (clinic_updated, services) in clinics.items()}]
+            for city_id, (city_updated, clinics) in _int_keys(data['graph']).items()}
+        self._index()
+
+    def save(self, path: Union[str, Path] = None):
+        """Stores current snapshot in a file.
+
+        Args:
+            path (str or Path, optional): Snapshot file. Defaults to the one given during initialization.
+        """
+        path = Path(path or self.path)
+        temporary_path = path.with_name(path.name + '.tmp')
+        with gzip.open(str(temporary_path), 'wt', encoding='utf-8') as f:
+            json.dump(dict(version=self.VERSION, names=self.names, graph=self.graph), f, separators=(',', ':'))
+        os.replace(str(temporary_path), str(path))
+
+    def _crawl_clinic(self, city_id: int, clinic_id: int, service_ids: Iterable[int]) -> Dict[int, List[int]]:
+        services = {}
+        for service_id in service_ids:
+            doctors = self.luxmed.doctors(city_id=city_id, service_id=service_id, clinic_id=clinic_id)
+            self.names['doctors'].update(doctors)
+            services[service_id] = sorted(doctors)
+        return services
+
+    def _refresh_city(self, city_id: int, now: float, doctors_max_age: float = None) -> Set[Tuple[int, int]]:
+        refreshed = set()
+        clinics = self.luxmed.clinics(city_id=city_id)
+        self.names['clinics'].update(clinics)
+        _, known_clinics = self.graph.get(city_id, [None, {}])
+        updated_clinics = {}
+        for clinic_id in sorted(clinics):
+            services = self.luxmed.services(city_id=city_id, clinic_id=clinic_id)
+            self.names['services'].update(services)
+            known = known_clinics.get(clinic_id)
+            if known is not None and set(known[1]) == set(services) \
+                    and (doctors_max_age is None or now - known[0] < doctors_max_age):
+                updated_clinics[clinic_id] = known
+                continue
+            updated_clinics[clinic_id] = [now, self._crawl_clinic(city_id, clinic_id, sorted(services))]
+            refreshed.add((city_id, clinic_id))
+        self.graph[city_id] = [now, updated_clinics]
+        return refreshed
+
+    def refresh(self, city_ids: Iterable[int] = None, max_age: float = None, doctors_max_age: float = None,
+                save: bool = True) -> Set[Tuple[int, int]]:
+        """Crawls the API for changes.
+
+        Clinics and their services are checked for every city not checked within the max age.
+        Doctors are fetched again only for the clinics that are new, whose services changed
+        or which were crawled before the doctors max age.
+
+        Args:
+            city_ids (iterable of int, optional): Refresh only those cities. Defaults to all of them.
+            max_age (float, optional): Skip cities checked within this many seconds. Defaults to checking all of them.
+            doctors_max_age (float, optional): Crawl doctors of unchanged clinics again after this many seconds.
+                Defaults to never.
+            save (bool, optional): Store the snapshot afterwards (when the path is known). Defaults to true.
+
+        Returns:
+            City and clinic ID pairs whose subtrees were crawled.
+        """
+        if self.luxmed is None:
+            raise ValueError('Client is required for refreshing.')
+        now = time()
+        cities = self.luxmed.cities()
+        self.names['cities'].update(cities)
+        if city_ids is None:
+            city_ids = cities
+            for city_id in set(self.graph) - set(cities):
+                del self.graph[city_id]
+
+        refreshed = set()
+        for city_id in city_ids:
+            known = self.graph.get(city_id)
+            if known is not None and max_age is not None and now - known[0] < max_age:
+                continue
+            refreshed |= self._refresh_city(city_id, now=now, doctors_max_age=doctors_max_age)
+        self._index()
+        if save and self.path is not None:
+            self.save()
+        return refreshed
+
+    def cities(self) -> Dict[int, str]:
+        """Cities present in the snapshot."""
+        names = self.names['cities']
+        return {city_id: names[city_id] for city_id in self.graph}
+
+    def clinics(self, city_id: int) -> Dict[int, str]:
+        """Clinics available in the given city."""
+        names = self.names['clinics']
+        return {clinic_id: names[clinic_id] for clinic_id in self.graph[city_id][1]}
+
+    def services(self, city_id: int, clinic_id: int = None) -> Dict[int, str]:
+        """Services available in the given city (and clinic)."""
+        names = self.names['services']
+        clinics = self.graph[city_id][1]
+        clinic_ids = clinics if clinic_id is None else (clinic_id,)
+        return {
+            service_id: names[service_id]
+            for clinic_id_ in clinic_ids for service_id in clinics[clinic_id_][1]}
+
+    def doctors(self, city_id: int, service_id: int, clinic_id: int = None) -> Dict[int, str]:
+        """Doctors available in the given city (and clinic) and providing specified service."""
+        names = self.names['doctors']
+        clinics = self.graph[city_id][1]
+        clinic_ids = clinics if clinic_id is None else (clinic_id,)
+        return {
+            doctor_id: names[doctor_id]
+            for clinic_id_ in clinic_ids for doctor_id in clinics[clinic_id_][1].get(service_id, ())}
+
+    def find(self, category: str, name: str) -> int:
+        """Returns ID of the given (case insensitive) name.
+
+        Args:
+            category (str): One of: cities, clinics, services or doctors.
+            name (str): Exact name.
+
+        Raises:
+            KeyError: When name is not known.
+        """
+        return self._ids[category][name.casefold()]
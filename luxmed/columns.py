@@ -0,0 +1,68 @@
+"""Columnar (NumPy) export of the available appointments. Requires the optional `numpy` dependency."""
+from typing import Dict
+from typing import Iterable
+from typing import List
+from typing import Mapping
+
+import numpy as np
+
+
+CATEGORICAL = ('clinic_name', 'doctor_name')
+
+
+def _categorize(values: List[str]):
+    categories = {}
+    codes = [categories.setdefault(value, len(categories)) for value in values]
+    return np.array(codes, dtype=np.int32), np.array(list(categories), dtype=object)
+
+
+def _utc_offset(date_time: str) -> int:
+    # '2019-08-22T07:15:00+02:00' -> 120
+    offset = date_time[19:].replace(':', '')
+    if not offset or offset == 'Z':
+        return 0
+    minutes = int(offset[1:3]) * 60 + int(offset[3:5])
+    return -minutes if offset[0] == '-' else minutes
+
+
+def visits_to_arrays(visits: Iterable[Mapping]) -> Dict[str, np.ndarray]:
+    """Converts available appointments into columns (arrays of equal length), in a single pass.
+
+    Start and end times are local (clinic) times, with the UTC offset (in minutes) given separately.
+    Names are categorical: `<column>` holds integer codes into the `<column>_categories` array.
+
+    Args:
+        visits (iterable of mappings): Available appointments, as yielded by the `LuxMedVisits.find`.
+
+    Returns:
+        Column name mapped to its values.
+    """
+    columns = {name: [] for name in (
+        'start', 'end', 'utc_offset', 'service_id', 'clinic_id', 'doctor_id', 'room_id', 'schedule_id',
+        'is_additional', 'clinic_name', 'doctor_name')}
+    for visit in visits:
+        visit_date = visit['VisitDate']
+        clinic = visit['Clinic']
+        doctor = visit['Doctor']
+        columns['start'].append(visit_date['StartDateTime'][:19])
+        columns['end'].append(visit_date['EndDateTime'][:19])
+        columns['utc_offset'].append(_utc_offset(visit_date['StartDateTime']))
+        columns['service_id'].append(visit['ServiceId'])
+        columns['clinic_id'].append(clinic['Id'])
+        columns['doctor_id'].append(doctor['Id'])
+        columns['room_id'].append(visit['RoomId'])
+        columns['schedule_id'].append(visit['ScheduleId'])
+        columns['is_additional'].append(visit.get('IsAdditional', False))
+        columns['clinic_name'].append(clinic['Name'])
+        columns['doctor_name'].append(doctor['Name'])
+
+    arrays = {
+        'start': np.array(columns['start'], dtype='datetime64[s]'),
+        'end': np.array(columns['end'], dtype='datetime64[s]'),
+        'utc_offset': np.array(columns['utc_offset'], dtype=np.int16),
+        'is_additional': np.array(columns['is_additional'], dtype=bool)}
+    for name in ('service_id', 'clinic_id', 'doctor_id', 'room_id', 'schedule_id'):
+        arrays[name] = np.array(columns[name], dtype=np.int64)
+    for name in CATEGORICAL:
+        arrays[name], arrays[name + '_categories'] = _categorize(columns[name])
+    return arrays
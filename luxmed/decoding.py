@@ -0,0 +1,52 @@
+"""Pluggable JSON decoding of the raw (UTF-8) response bodies."""
+import json
+from typing import Any
+from typing import Callable
+from typing import Union
+
+
+JSONDecoder = Callable[[bytes], Any]
+
+
+def stdlib_loads(content: bytes) -> Any:
+    """Decodes with the standard library, skipping the encoding detection (API always responds with UTF-8)."""
+    return json.loads(content.decode('utf-8'))
+
+
+def _orjson_loads() -> JSONDecoder:
+    import orjson  # optional dependency
+    return orjson.loads
+
+
+DECODERS = {
+    'json': lambda: stdlib_loads,
+    'orjson': _orjson_loads}
+
+
+def resolve_decoder(decoder: Union[str, JSONDecoder] = 'auto') -> JSONDecoder:
+    """Resolves JSON decoder setting.
+
+    Every decoder has to accept raw bytes and raise ValueError (e.g. JSONDecodeError) on malformed data.
+
+    Args:
+        decoder (str or callable, optional): Decoder name (`json`, `orjson` or `auto`, the fastest available one)
+            or a decoding function. Defaults to auto.
+
+    Returns:
+        Decoding function.
+
+    Raises:
+        ImportError: When named decoder is not installed.
+        ValueError: When decoder name is unknown.
+    """
+    if callable(decoder):
+        return decoder
+    if decoder == 'auto':
+        try:
+            return _orjson_loads()
+        except ImportError:
+            return stdlib_loads
+    try:
+        return DECODERS[decoder]()
+    except KeyError:
+        raise ValueError(f'Unknown JSON decoder: {decoder}.') from None
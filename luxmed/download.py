@@ -0,0 +1,77 @@
+import os
+from pathlib import Path
+from typing import BinaryIO
+from typing import Union
+
+from requests import codes
+
+from luxmed.transport import LuxMedTransport
+
+
+PART_SUFFIX = '.part'
+
+
+def safe_file_name(name: str, default: str) -> str:
+    """Strips directory components of a (server supplied) file name, so that it stays within the target directory.
+    Returns the default when nothing usable is left."""
+    name = name.replace('\\', '/').rsplit('/', 1)[-1] if name else ''
+    return name if name not in ('', '.', '..') else default
+
+
+def download(transport: LuxMedTransport, url: str, target: Union[str, Path, BinaryIO], resume: bool = True,
+             chunk_size: int = 64 * 1024) -> int:
+    """Streams response body straight into a file, chunk by chunk.
+
+    When downloading into a path, data goes into a temporary `.part` file first, renamed once complete.
+    Interrupted download is continued from where it stopped (when the server supports byte ranges),
+    while already existing (complete) file is not downloaded again. Partial file found complete by the server
+    (e.g. interrupted right before the rename) is only renamed.
+
+    Args:
+        transport (LuxMedTransport): Used for the download.
+        url (str): Downloaded URL.
+        target (str, Path or binary file): Destination path or an already open file.
+        resume (bool, optional): Continue partial download, if any. Defaults to true.
+        chunk_size (int, optional): Maximum chunk size, in bytes. Defaults to 64 KiB.
+
+    Returns:
+        Number of bytes downloaded (0 when file already exists).
+    """
+    # byte ranges have to refer to the actual content, not to its compressed form
+    headers = {'Accept-Encoding': 'identity'}
+    if not isinstance(target, (str, Path)):
+        with transport.open('GET', url, headers=headers) as response:
+            return _copy(transport, response, target, chunk_size)
+
+    path = Path(target)
+    if path.exists():
+        return 0
+    part_path = path.with_name(path.name + PART_SUFFIX)
+    offset = part_path.stat().st_size if resume and part_path.exists() else 0
+    if offset:
+        with transport.open('GET', url, accept=(codes.requested_range_not_satisfiable,),
+                            headers=dict(headers, Range=f'bytes={offset}-')) as response:
+            if response.status_code != codes.requested_range_not_satisfiable:
+                return _finish(transport, response, part_path, path, chunk_size)
+            # range starting at the end of the content means the partial file is complete already
+            if response.headers.get('Content-Range') == f'bytes */{offset}':
+                os.replace(str(part_path), str(path))
+                return 0
+    with transport.open('GET', url, headers=headers) as response:  # partial file unusable, start over
+        return _finish(transport, response, part_path, path, chunk_size)
+
+
+def _finish(transport: LuxMedTransport, response, part_path: Path, path: Path, chunk_size: int) -> int:
+    mode = 'ab' if response.status_code == codes.partial_content else 'wb'
+    with part_path.open(mode) as f:
+        written = _copy(transport, response, f, chunk_size)
+    os.replace(str(part_path), str(path))
+    return written
+
+
+def _copy(transport: LuxMedTransport, response, file: BinaryIO, chunk_size: int) -> int:
+    written = 0
+    for chunk in transport.iter_body(response, chunk_size):
+        file.write(chunk)
+        written += len(chunk)
+    return written
@@ -1,6 +1,11 @@
-from json.decoder import JSONDecodeError
+from typing import TYPE_CHECKING
+from typing import Dict
 
-from requests import Response
+from luxmed.decoding import JSONDecoder
+from luxmed.decoding import stdlib_loads
+
+if TYPE_CHECKING:
+    from requests import Response
 
 
 class LuxMedError(Exception):
@@ -19,28 +24,44 @@ class LuxMedError(Exception):
             full_message += f' (code {code})'
         super().__init__(full_message)
 
+    def __reduce__(self):
+        # keeps the code when pickled (e.g. passed back from a worker process)
+        return type(self), (self.message, self.code)
+
     @classmethod
-    def from_response(cls, response: Response):
+    def from_response(cls, response: 'Response', loads: JSONDecoder = stdlib_loads):
         """Returns first matched error based on the code present in the response.
         When no error matches, this class is returned.
 
         Args:
             response (Response): Raw JSON API response.
+            loads (callable, optional): Decodes the raw response body. Defaults to the standard library one.
 
         Returns:
-            LuxMedError: When nothing else matches.
+            LuxMedError: When nothing else matches, including responses without any errors listed.
             LuxMedAuthenticationError: When invalid credentials are being used for the API call.
-
-        Raises:
-            IndexError/KeyError: When response does not contain any errors.
         """
         try:
-            errors = response.json()['Errors']
-        except JSONDecodeError as error:
+            data = loads(response.content)
+        except ValueError as error:  # malformed JSON or not UTF-8
             raise cls('JSON data missing') from error
+        return cls.from_data(data, response.status_code)
 
-        code = errors[0]['ErrorCode']
-        message = errors[0]['Message']
+    @classmethod
+    def from_data(cls, data: Dict, status: int = None):
+        """Returns first matched error based on the code present in the already decoded response data.
+        When data does not contain any errors (e.g. unauthorized or OAuth error response), this class is returned,
+        with the HTTP status in its message.
+
+        Args:
+            data (dict): Decoded JSON API response.
+            status (int, optional): HTTP status of the response.
+        """
+        try:
+            code = data['Errors'][0]['ErrorCode']
+            message = data['Errors'][0]['Message']
+        except (IndexError, KeyError, TypeError):
+            return cls(_fallback_message(data, status))
         for class_ in cls.__subclasses__():
             if code in class_.CODES:
                 return class_(message, code=code)
@@ -60,3 +81,18 @@ class LuxMedTimeoutError(LuxMedError):
 class LuxMedAuthenticationError(LuxMedError):
     """Invalid credentials."""
     CODES = {2, }
+
+
+class LuxMedCircuitOpenError(LuxMedError):
+    """Request not sent, as the API keeps failing (see `CircuitBreaker`)."""
+    pass
+
+
+def _fallback_message(data, status: int = None) -> str:
+    message = None
+    if isinstance(data, dict):
+        message = data.get('Message') or data.get('error_description') or data.get('error')
+    message = str(message).rstrip('.') if message else 'Request failed'
+    if status:
+        message += f' (HTTP {status})'
+    return message
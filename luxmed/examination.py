@@ -1,8 +1,19 @@
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import as_completed
 from datetime import date
+from pathlib import Path
+from typing import BinaryIO
 from typing import Dict
 from typing import Iterator
+from typing import Optional
+from typing import Tuple
+from typing import Union
 
+from luxmed.download import download
+from luxmed.download import safe_file_name
+from luxmed.errors import LuxMedError
 from luxmed.mapping import LuxMedReadOnlyMapping
+from luxmed.models import ExaminationResult
 from luxmed.transformers import filter_args
 from luxmed.transport import LuxMedTransport
 from luxmed.urls import BASE_URL
@@ -12,27 +23,54 @@ from luxmed.utils import year_ago
 
 
 class LuxMedExaminationResult(LuxMedReadOnlyMapping):
+    __slots__ = ()
+
     def details(self) -> Dict:
         """Examination result details."""
         return self._transport.get(BASE_URL + find_link_rel(
             self.data['Links'], 'examination-result-details')['Href'])
 
+    @property
+    def document_link(self) -> Optional[Dict]:
+        """Examination result PDF download link, if there is any document."""
+        return find_link_rel(self.data.get('DownloadLinks', []), 'examination-result-document')
+
+    @property
+    def file_name(self) -> str:
+        """Examination result PDF file name."""
+        return safe_file_name(self.document_link.get('FileName'), f'{self.data["MedicalExaminationId"]}.pdf')
+
     def document(self) -> bytes:
         """Examination result details in PDF."""
-        return self._transport.get(BASE_URL + find_link_rel(
-            self.data['DownloadLinks'], 'examination-result-document')['Href'])
+        return self._transport.get(BASE_URL + self.document_link['Href'])
+
+    def download(self, target: Union[str, Path, BinaryIO], resume: bool = True) -> int:
+        """Streams examination result PDF into a file, without holding it in memory.
+        See `luxmed.download.download` for details.
+
+        Args:
+            target (str, Path or binary file): Destination path or an already open file.
+            resume (bool, optional): Continue partial download, if any. Defaults to true.
+
+        Returns:
+            Number of bytes downloaded (0 when file already exists).
+        """
+        return download(self._transport, BASE_URL + self.document_link['Href'], target, resume=resume)
 
 
 class LuxMedExamination:
     def __init__(self, transport: LuxMedTransport):
         self._transport = transport
 
-    def results(self, from_date: date = None, to_date: date = None) -> Iterator[LuxMedExaminationResult]:
+    def results(self, from_date: date = None, to_date: date = None,
+                compact: bool = False) -> Iterator[Union[LuxMedExaminationResult, ExaminationResult]]:
         """Yields examination results between the given dates.
 
         Args:
             from_date (date, optional): Show results starting with this date. Defaults to year ago.
             to_date (date, optional): Show results until this date. Defaults to today.
+            compact (bool, optional): Yield compact `ExaminationResult` models instead of the full results.
+                Defaults to false.
         """
         if not from_date:
             from_date = year_ago()
@@ -43,4 +81,43 @@ class LuxMedExamination:
                     EXAMINATION_RESULTS_URL,
                     params=filter_args(from_date=from_date, to_date=to_date)
                 )['MedicalExaminationsResults']:
-            yield LuxMedExaminationResult(result, self._transport)
+            if compact:
+                yield ExaminationResult.from_dict(result, self._transport)
+            else:
+                yield LuxMedExaminationResult(result, self._transport)
+
+    def download_all(self, directory: Union[str, Path], from_date: date = None, to_date: date = None,
+                     max_workers: int = 4, resume: bool = True) \
+            -> Iterator[Tuple[LuxMedExaminationResult, Union[Path, LuxMedError]]]:
+        """Downloads PDFs of all the examination results between the given dates into a directory,
+        several at a time. Already downloaded files are skipped, interrupted ones are resumed.
+        Failed download does not abort the remaining ones, its error is yielded instead.
+
+        Args:
+            directory (str or Path): Destination directory. Created when missing.
+            from_date (date, optional): Download results starting with this date. Defaults to year ago.
+            to_date (date, optional): Download results until this date. Defaults to today.
+            max_workers (int, optional): Maximum number of concurrent downloads. Defaults to 4.
+            resume (bool, optional): Continue partial downloads. Defaults to true.
+
+        Yields:
+            Examination result along with its file path or an error it failed with, as downloads complete.
+        """
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+
+        def download_(result: LuxMedExaminationResult) -> Union[Path, LuxMedError]:
+            path = directory / result.file_name
+            try:
+                result.download(path, resume=resume)
+            except LuxMedError as error:
+                return error
+            return path
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {
+                executor.submit(download_, result): result
+                for result in self.results(from_date=from_date, to_date=to_date)
+                if result.document_link is not None}
+            for future in as_completed(futures):
+                yield futures[future], future.result()
@@ -0,0 +1,227 @@
+"""Many accounts and queries spread over a pool of processes, for workloads a single process (GIL) cannot handle."""
+import multiprocessing
+import os
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import as_completed
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import Any
+from typing import Callable
+from typing import Dict
+from typing import Iterable
+from typing import Iterator
+from typing import List
+from typing import Optional
+from typing import Set
+from typing import Tuple
+from typing import Union
+from zlib import crc32
+
+from luxmed.luxmed import LuxMed
+from luxmed.responses import DiskResponseCacheBackend
+from luxmed.responses import ResponseCache
+from luxmed.throttling import SharedTokenBucket
+from luxmed.tokens import FileTokenCache
+from luxmed.visits import VisitQuery
+
+
+# worker process state, set up by the pool initializer
+_budget: Optional[SharedTokenBucket] = None
+_clients: Dict[str, LuxMed] = {}
+
+
+def _init_worker(budget: Optional[SharedTokenBucket]):
+    global _budget
+    _budget = budget
+
+
+def _run(function: Callable[[LuxMed, Any], Any], user_name: str, luxmed: Optional[LuxMed],
+         arguments: List) -> List[Union[Any, Exception]]:
+    """Runs a batch of jobs of a single account. Client is handed off (pickled) along with the first batch only."""
+    if luxmed is not None:
+        if _budget is not None:
+            luxmed._transport.rate_limits.insert(0, _budget)
+        _clients[user_name] = luxmed
+    luxmed = _clients[user_name]
+    results = []
+    for argument in arguments:
+        try:
+            results.append(function(luxmed, argument))
+        except Exception as error:
+            results.append(error)
+    return results
+
+
+def _evict(user_name: str):
+    _clients.pop(user_name, None)
+
+
+def find_visits(luxmed: LuxMed, query: VisitQuery) -> List[Dict]:
+    """Available appointments of the query. Job function of `LuxMedFleet.find`."""
+    return list(luxmed.visits.find(**query._asdict()))
+
+
+class LuxMedFleet:
+    """Runs jobs of many accounts on a pool of processes, sharing a single request budget.
+
+    Accounts are sharded between the processes (each one is always served by the same process), so that clients
+    keep their sessions and caches warm. Clients are created here and handed off to their processes on first use.
+    Access tokens and read-mostly responses (e.g. visit filters catalog) are shared through the state directory.
+    """
+
+    def __init__(self, processes: int = None, rate: float = None, burst: float = None,
+                 state_directory: Union[str, Path] = None, batch_size: int = 16,
+                 context: multiprocessing.context.BaseContext = None):
+        """Args:
+            processes (int, optional): Number of worker processes. Defaults to the number of CPUs.
+            rate (float, optional): Requests per second of all the processes together. Defaults to unlimited.
+            burst (float, optional): Maximum number of requests sent at once. Defaults to the rate (one second),
+                but no less than a single request.
+            state_directory (str or Path, optional): Directory of the access tokens and responses shared between
+                the processes (and fleet restarts). Created when missing. Defaults to sharing nothing.
+            batch_size (int, optional): Maximum number of jobs of an account sent to its process at once.
+                Defaults to 16.
+            context (multiprocessing context, optional): Context the processes are started with.
+                Defaults to the default one.
+        """
+        self._context = context or multiprocessing.get_context()
+        self.processes = processes or os.cpu_count() or 1
+        self.batch_size = batch_size
+        self.budget = SharedTokenBucket(rate, burst, context=self._context) if rate else None
+        self.state_directory = Path(state_directory).expanduser() if state_directory is not None else None
+        if self.state_directory is not None:
+            self.state_directory.mkdir(parents=True, exist_ok=True)
+        self._accounts: 'OrderedDict[str, LuxMed]' = OrderedDict()
+        self._handed_off: Set[str] = set()
+        # a single process executor per shard, as a pool does not tell which of its processes runs the job
+        self._shards = [self._executor() for _ in range(self.processes)]
+
+    def _executor(self) -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(
+            max_workers=1, mp_context=self._context, initializer=_init_worker, initargs=(self.budget,))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __len__(self) -> int:
+        return len(self._accounts)
+
+    def __contains__(self, user_name: str) -> bool:
+        return user_name in self._accounts
+
+    def add(self, user_name: str, password: str, **kwargs):
+        """Registers an account. Replaces previously registered one with the same user name.
+
+        Args:
+            user_name (str): LUX MED login.
+            password (str): LUX MED password.
+            **kwargs: Remaining client options forwarded to the `LuxMed`. Must be picklable.
+        """
+        if self.state_directory is not None:
+            kwargs.setdefault('token_cache', FileTokenCache(self.state_directory / 'tokens.json'))
+            kwargs.setdefault('response_cache', ResponseCache(DiskResponseCacheBackend(
+                self.state_directory / 'responses')))
+        self._accounts[user_name] = LuxMed(user_name, password, **kwargs)
+        self._handed_off.discard(user_name)
+
+    def remove(self, user_name: str):
+        """Unregisters given account, evicting its client from the serving process.
+
+        Raises:
+            KeyError: When account is not registered.
+        """
+        del self._accounts[user_name]
+        if user_name in self._handed_off:
+            self._handed_off.discard(user_name)
+            self._shards[self.shard(user_name)].submit(_evict, user_name)
+
+    def shard(self, user_name: str) -> int:
+        """Index of the process serving given account."""
+        return crc32(user_name.encode()) % self.processes
+
+    def map(self, function: Callable[[LuxMed, Any], Any],
+            jobs: Iterable[Tuple[str, Any]]) -> Iterator[Tuple[str, Any, Union[Any, Exception]]]:
+        """Runs the function for every job, in the process serving job's account.
+        Results are yielded as soon as their batch completes. Failed job does not abort the remaining ones,
+        its error is yielded instead. So is the error of every job of a batch that could not be run at all
+        (e.g. its process died), while the broken process is replaced with a new one.
+
+        Args:
+            function (callable): Called with account's client and job argument. Must be picklable
+                (e.g. defined at the module level).
+            jobs (iterable of tuples): Account user name along with the argument.
+
+        Yields:
+            Account user name, argument and function result or error it failed with.
+
+        Raises:
+            KeyError: When job account is not registered.
+        """
+        batches: Dict[str, List] = OrderedDict()
+        for user_name, argument in jobs:
+            if user_name not in self._accounts:
+                raise KeyError(user_name)
+            batches.setdefault(user_name, []).append(argument)
+
+        futures = {}
+        for user_name, arguments in batches.items():
+            index = self.shard(user_name)
+            executor = self._shards[index]
+            for start in range(0, len(arguments), self.batch_size):
+                luxmed = None
+                if user_name not in self._handed_off:
+                    luxmed = self._accounts[user_name]
+                    self._handed_off.add(user_name)
+                batch = arguments[start:start + self.batch_size]
+                futures[executor.submit(_run, function, user_name, luxmed, batch)] = \
+                    user_name, batch, luxmed, index, executor
+        try:
+            for future in as_completed(futures):
+                user_name, batch, luxmed, index, executor = futures[future]
+                try:
+                    results = future.result()
+                except BrokenProcessPool as error:
+                    self._replace(index, executor)
+                    results = [error] * len(batch)
+                except Exception as error:  # e.g. unpicklable argument or result
+                    if luxmed is not None:
+                        self._handed_off.discard(user_name)  # might have never reached its process
+                    results = [error] * len(batch)
+                for argument, result in zip(batch, results):
+                    yield user_name, argument, result
+        finally:
+            for future, (user_name, _, luxmed, _, _) in futures.items():
+                if future.cancel() and luxmed is not None:
+                    self._handed_off.discard(user_name)  # never reached its process
+
+    def _replace(self, index: int, broken: ProcessPoolExecutor):
+        """Replaces broken shard process (unless already replaced), its clients are handed off again."""
+        if self._shards[index] is not broken:
+            return
+        broken.shutdown(wait=False)
+        self._shards[index] = self._executor()
+        self._handed_off.difference_update([name for name in self._handed_off if self.shard(name) == index])
+
+    def find(self, queries: Iterable[Tuple[str, Union[VisitQuery, Dict]]]
+             ) -> Iterator[Tuple[str, VisitQuery, Union[List[Dict], Exception]]]:
+        """Find available doctor appointments for many accounts and queries at once.
+
+        Args:
+            queries (iterable of tuples): Account user name along with the search query (or `find` keyword
+                arguments).
+
+        Yields:
+            Account user name, query and its available appointments or error it failed with.
+        """
+        return self.map(find_visits, (
+            (user_name, query if isinstance(query, VisitQuery) else VisitQuery(**query))
+            for user_name, query in queries))
+
+    def close(self):
+        """Stops the worker processes."""
+        for executor in self._shards:
+            executor.shutdown()
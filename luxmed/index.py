@@ -0,0 +1,253 @@
+"""In-memory index of the available appointments, answering time range and attribute queries without full scans."""
+from bisect import bisect_left
+from bisect import insort
+from datetime import date
+from datetime import datetime
+from datetime import time
+from datetime import timedelta
+from heapq import merge
+from itertools import islice
+from typing import Callable
+from typing import Collection
+from typing import Dict
+from typing import Iterable
+from typing import Iterator
+from typing import List
+from typing import Mapping
+from typing import Optional
+from typing import Set
+from typing import Tuple
+from typing import Union
+
+from luxmed.visits import term_start
+
+
+# local start date time (sortable), schedule ID and start date time as returned by the API
+IndexKey = Tuple[str, int, str]
+
+ATTRIBUTES: Dict[str, Callable[[Mapping], Iterable[int]]] = {
+    'doctor': lambda visit: (visit['Doctor']['Id'],),
+    'clinic': lambda visit: (visit['Clinic']['Id'],),
+    'service': lambda visit: (visit['ServiceId'],),
+    'payer': lambda visit: {payer['PayerId'] for payer in visit.get('PayerDetailsList') or ()}}
+
+
+def index_key(visit: Mapping) -> IndexKey:
+    """Orders available appointments chronologically, by their local (clinic) start time."""
+    start = term_start(visit)
+    return start[:19], visit['ScheduleId'], start
+
+
+def _bound(moment: Union[date, datetime, str]) -> str:
+    if isinstance(moment, datetime):
+        return moment.strftime('%Y-%m-%dT%H:%M:%S')  # local time, UTC offset (if any) is ignored
+    if isinstance(moment, date):
+        return moment.isoformat()
+    return moment
+
+
+def _day(start: str) -> date:
+    return date(int(start[:4]), int(start[5:7]), int(start[8:10]))
+
+
+class _TimeFilter:
+    """Tells whether the start time matches, and if not, the earliest one that might."""
+
+    def __init__(self, from_time: Optional[time], to_time: Optional[time], weekdays: Optional[Collection[int]]):
+        self.from_time = from_time.strftime('%H:%M:%S') if from_time is not None else '00:00:00'
+        self.to_time = to_time.strftime('%H:%M:%S') if to_time is not None else None
+        self.weekdays = frozenset(weekdays) if weekdays is not None else None
+        if self.weekdays is not None and not self.weekdays:
+            raise ValueError('At least one weekday is required.')
+        if self.weekdays is not None and not self.weekdays <= set(range(7)):
+            raise ValueError('Weekdays must be within 0 (Monday) to 6 (Sunday).')
+
+    def next_start(self, start: str) -> Optional[str]:
+        """None when given start matches, otherwise the next matching start lower bound."""
+        clock = start[11:19]
+        day = _day(start)
+        if self.weekdays is None or day.weekday() in self.weekdays:
+            if clock < self.from_time:
+                return f'{day.isoformat()}T{self.from_time}'
+            if self.to_time is None or clock < self.to_time:
+                return
+        day += timedelta(days=1)
+        while self.weekdays is not None and day.weekday() not in self.weekdays:
+            day += timedelta(days=1)
+        return f'{day.isoformat()}T{self.from_time}'
+
+
+def _scan(keys: List[IndexKey], low: Optional[str], high: Optional[str],
+          time_filter: Optional[_TimeFilter]) -> Iterator[IndexKey]:
+    """Yields sorted keys within the range and time filter, skipping the non-matching ones with binary search."""
+    i = bisect_left(keys, (low,)) if low is not None else 0
+    while i < len(keys):
+        key = keys[i]
+        if high is not None and key[0] >= high:
+            return
+        next_start = time_filter.next_start(key[0]) if time_filter is not None else None
+        if next_start is None:
+            yield key
+            i += 1
+        else:
+            i = bisect_left(keys, (next_start,), i + 1)
+
+
+class VisitIndex:
+    """Available appointments (as yielded by the `LuxMedVisits.find`) indexed by the start time,
+    doctor, clinic, service and payer.
+
+    Every index is a sorted list of keys, so that the appointments are searched (and yielded) chronologically,
+    with a binary search skipping over the ones outside the requested time range, time of day and weekdays.
+    Start times are local (clinic) times. Same appointment added again replaces the previous one.
+    """
+
+    def __init__(self, visits: Iterable[Mapping] = ()):
+        """Args:
+            visits (iterable of mappings, optional): Initial available appointments.
+        """
+        self._visits: Dict[Tuple[int, str], Tuple[IndexKey, Mapping]] = {}
+        self._starts: List[IndexKey] = []
+        self._attributes: Dict[str, Dict[int, List[IndexKey]]] = {name: {} for name in ATTRIBUTES}
+        self.update(visits)
+
+    def __len__(self) -> int:
+        return len(self._starts)
+
+    def __contains__(self, visit: Mapping) -> bool:
+        return (visit['ScheduleId'], term_start(visit)) in self._visits
+
+    def __iter__(self) -> Iterator[Mapping]:
+        """Chronologically ordered appointments."""
+        return (self._visits[key[1:]][1] for key in self._starts)
+
+    def add(self, visit: Mapping) -> bool:
+        """Adds (or replaces) available appointment.
+
+        Returns:
+            Whether the appointment is a new one.
+        """
+        is_new = not self.discard(visit)
+        key = index_key(visit)
+        self._visits[key[1:]] = key, visit
+        insort(self._starts, key)
+        for name, values in ATTRIBUTES.items():
+            index = self._attributes[name]
+            for value in values(visit):
+                insort(index.setdefault(value, []), key)
+        return is_new
+
+    def update(self, visits: Iterable[Mapping]) -> int:
+        """Adds (or replaces) many available appointments.
+
+        Returns:
+            Number of the new appointments.
+        """
+        return sum(self.add(visit) for visit in visits)
+
+    def discard(self, visit: Mapping) -> bool:
+        """Removes available appointment (e.g. reserved or no longer available), if present.
+
+        Returns:
+            Whether the appointment was present.
+        """
+        return self._discard((visit['ScheduleId'], term_start(visit)))
+
+    def _discard(self, term: Tuple[int, str]) -> bool:
+        try:
+            key, indexed = self._visits.pop(term)
+        except KeyError:
+            return False
+        self._remove_key(self._starts, key)
+        for name, values in ATTRIBUTES.items():
+            index = self._attributes[name]
+            for value in values(indexed):
+                keys = index[value]
+                self._remove_key(keys, key)
+                if not keys:
+                    del index[value]
+        return True
+
+    def remove(self, visit: Mapping):
+        """Removes available appointment.
+
+        Raises:
+            KeyError: When appointment is not present.
+        """
+        if not self.discard(visit):
+            raise KeyError((visit['ScheduleId'], term_start(visit)))
+
+    def remove_before(self, moment: Union[date, datetime, str]) -> int:
+        """Removes appointments starting before given (local) time, e.g. the past ones.
+
+        Returns:
+            Number of the removed appointments.
+        """
+        end = bisect_left(self._starts, (_bound(moment),))
+        for key in self._starts[:end]:
+            self._discard(key[1:])
+        return end
+
+    @staticmethod
+    def _remove_key(keys: List[IndexKey], key: IndexKey):
+        del keys[bisect_left(keys, key)]
+
+    def find(self, after: Union[date, datetime, str] = None, before: Union[date, datetime, str] = None,
+             from_time: time = None, to_time: time = None, weekdays: Collection[int] = None,
+             doctor_ids: Collection[int] = None, clinic_ids: Collection[int] = None,
+             service_ids: Collection[int] = None, payer_ids: Collection[int] = None) -> Iterator[Mapping]:
+        """Yields matching appointments chronologically.
+
+        Results are produced lazily, so taking the first few of them (e.g. the earliest one) costs a few binary
+        searches, rather than a scan over all the appointments. Index must not be modified while iterating.
+
+        Args:
+            after (date, datetime or str, optional): Starting at or after this (local) time.
+            before (date, datetime or str, optional): Starting before this (local) time.
+            from_time (time, optional): Starting at or after this time of the day.
+            to_time (time, optional): Starting before this time of the day.
+            weekdays (collection of int, optional): Starting on these days of the week (Monday is 0).
+            doctor_ids (collection of int, optional): Provided by one of these doctors.
+            clinic_ids (collection of int, optional): Taking place in one of these clinics.
+            service_ids (collection of int, optional): Providing one of these services.
+            payer_ids (collection of int, optional): Paid by one of these payers.
+
+        Yields:
+            Available appointments.
+        """
+        low = _bound(after) if after is not None else None
+        high = _bound(before) if before is not None else None
+        time_filter = _TimeFilter(from_time, to_time, weekdays) \
+            if from_time is not None or to_time is not None or weekdays is not None else None
+
+        filters: Dict[str, Set[int]] = {}
+        for name, ids in (('doctor', doctor_ids), ('clinic', clinic_ids), ('service', service_ids),
+                          ('payer', payer_ids)):
+            if ids is not None:
+                filters[name] = set(ids)
+
+        if filters:
+            # the most selective attribute drives the scan, the remaining ones are checked per appointment
+            driver = min(filters, key=lambda name: sum(
+                len(self._attributes[name].get(id_, ())) for id_ in filters[name]))
+            lists = [self._attributes[driver][id_] for id_ in filters.pop(driver) if id_ in self._attributes[driver]]
+            keys = merge(*(_scan(keys, low, high, time_filter) for keys in lists))
+        else:
+            keys = _scan(self._starts, low, high, time_filter)
+
+        previous = None
+        for key in keys:
+            if key == previous:  # e.g. the same appointment paid by many of the payers
+                continue
+            previous = key
+            visit = self._visits[key[1:]][1]
+            if all(filters[name].intersection(ATTRIBUTES[name](visit)) for name in filters):
+                yield visit
+
+    def earliest(self, **kwargs) -> Optional[Mapping]:
+        """The earliest matching appointment, if any. See `find` for the arguments description."""
+        return next(self.find(**kwargs), None)
+
+    def first(self, count: int, **kwargs) -> List[Mapping]:
+        """Given number of the earliest matching appointments. See `find` for the arguments description."""
+        return list(islice(self.find(**kwargs), count))
@@ -2,6 +2,7 @@ from datetime import date
 from typing import Dict
 from typing import List
 
+from luxmed.cache import TTLCache
 from luxmed.examination import LuxMedExamination
 from luxmed.transformers import filter_args
 from luxmed.transformers import map_id_name
@@ -16,22 +17,29 @@ class LuxMed:
     """LUX MED Group patient portal (unofficial) API client."""
 
     def __init__(self, user_name: str, password: str, app_uuid: str = None, client_uuid: str = None,
-                 lang_code: str = 'en'):
+                 lang_code: str = 'en', cache_ttl: float = 300, cache_size: int = 128, **kwargs):
         """Args:
             user_name (str): Your LUX MED login.
             password (str): Your LUX MED password.
             app_uuid (str, optional): Application UUID. Defaults to random UUID.
             client_uuid (str, optional): Client UUID. Defaults to random UUID.
             lang_code (str, optional): Two letter (ISO 639-1) language code. Defaults to en.
+            cache_ttl (float, optional): How long (in seconds) to reuse fetched visit filters
+                (cities, clinics, doctors, etc.). Defaults to 5 minutes.
+            cache_size (int, optional): Maximum number of distinct visit filter queries to keep. Defaults to 128.
+            **kwargs: Remaining transport options forwarded to the underlying `LuxMedTransport`.
         """
         self._transport = LuxMedTransport(
             user_name=user_name, password=password,
-            app_uuid=app_uuid, client_uuid=client_uuid, lang_code=lang_code)
+            app_uuid=app_uuid, client_uuid=client_uuid, lang_code=lang_code, **kwargs)
         self.examination = LuxMedExamination(self._transport)
         self.visits = LuxMedVisits(self._transport)
+        self.filters_cache = TTLCache(ttl=cache_ttl, max_size=cache_size)
 
     def _visit_filters(self, **kwargs) -> Dict:
-        return self._transport.get(VISIT_TERMS_RESERVATION_URL, params=filter_args(**kwargs))
+        # all the categories come in a single response, so e.g. clinics and services of a city share an entry
+        params = tuple(sorted((name, str(value)) for name, value in filter_args(**kwargs)))
+        return self.filters_cache.get(params, lambda: self._transport.get(VISIT_TERMS_RESERVATION_URL, params=params))
 
     def _mapped_visit_filters(self, category: str, **kwargs) -> Dict[int, str]:
         return map_id_name(self._visit_filters(**kwargs)[category])
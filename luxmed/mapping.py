@@ -7,6 +7,8 @@ from luxmed.transport import LuxMedTransport
 
 
 class LuxMedReadOnlyMapping(Mapping):
+    __slots__ = ('data', '_transport')
+
     def __init__(self, data: Dict, transport: LuxMedTransport):
         self.data = data
         self._transport = transport
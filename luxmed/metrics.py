@@ -0,0 +1,191 @@
+"""Per-endpoint metrics of the API calls.
+
+Endpoints are identified by the names of the matching `luxmed.urls` constants (e.g. `VISIT_TERMS_URL`),
+not by the raw URLs, keeping the number of series bounded.
+"""
+from bisect import bisect_left
+from functools import lru_cache
+from threading import Lock
+from typing import Dict
+from typing import List
+from typing import Tuple
+
+from luxmed import urls
+from luxmed.errors import LuxMedError
+
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1., 2.5, 5., 10.)
+UNKNOWN_ENDPOINT = 'UNKNOWN'
+
+# longest first, so that the most specific URL matches; first defined wins among the equal ones
+_ENDPOINTS: List[Tuple[str, str]] = sorted(
+    {value: name for name, value in reversed(list(vars(urls).items())) if name.endswith('_URL')}.items(),
+    key=lambda item: len(item[0]), reverse=True)
+
+
+@lru_cache(maxsize=1024)
+def endpoint_name(url: str) -> str:
+    """Name of the `luxmed.urls` constant being the longest prefix of given URL."""
+    url = url.split('?', 1)[0]
+    for prefix, name in _ENDPOINTS:
+        if url.startswith(prefix):
+            return name
+    return UNKNOWN_ENDPOINT
+
+
+class MetricsSink:
+    """Receives the API call metrics. Subclass it to forward them elsewhere (e.g. StatsD).
+    Methods are called on the requesting threads, so they have to be cheap and thread-safe.
+    """
+
+    def request(self, endpoint: str, method: str, status: int, seconds: float, request_bytes: int,
+                response_bytes: int):
+        """Completed request (any status).
+
+        Args:
+            endpoint (str): URL constant name.
+            method (str): HTTP method.
+            status (int): Response status code.
+            seconds (float): Time until the response (or its headers, for the streamed ones) arrived.
+            request_bytes (int): Request body size.
+            response_bytes (int): Response body size (as transferred, when known).
+        """
+
+    def error(self, endpoint: str, method: str, error: LuxMedError):
+        """Request failed with an error (including the network ones)."""
+
+    def auth(self, grant_type: str):
+        """Access token obtained, with either `password` or `refresh_token` grant."""
+
+
+class _EndpointMetrics:
+    __slots__ = ('statuses', 'buckets', 'seconds', 'count', 'request_bytes', 'response_bytes')
+
+    def __init__(self):
+        self.statuses: Dict[int, int] = {}
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.seconds = 0.
+        self.count = 0
+        self.request_bytes = 0
+        self.response_bytes = 0
+
+
+class MetricsRegistry(MetricsSink):
+    """Thread-safe, in-process metrics registry, exportable in the Prometheus text format."""
+
+    def __init__(self, prefix: str = 'luxmed'):
+        """Args:
+            prefix (str, optional): Exported metric names prefix. Defaults to luxmed.
+        """
+        self.prefix = prefix
+        self._endpoints: Dict[Tuple[str, str], _EndpointMetrics] = {}
+        self._errors: Dict[Tuple[str, str, str, str], int] = {}
+        self._auth: Dict[str, int] = {}
+        self._lock = Lock()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state['_lock']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = Lock()
+
+    def request(self, endpoint: str, method: str, status: int, seconds: float, request_bytes: int,
+                response_bytes: int):
+        bucket = bisect_left(LATENCY_BUCKETS, seconds)
+        with self._lock:
+            metrics = self._endpoints.get((endpoint, method))
+            if metrics is None:
+                metrics = self._endpoints[endpoint, method] = _EndpointMetrics()
+            metrics.statuses[status] = metrics.statuses.get(status, 0) + 1
+            metrics.buckets[bucket] += 1
+            metrics.seconds += seconds
+            metrics.count += 1
+            metrics.request_bytes += request_bytes
+            metrics.response_bytes += response_bytes
+
+    def error(self, endpoint: str, method: str, error: LuxMedError):
+        key = (endpoint, method, type(error).__name__, '' if error.code is None else str(error.code))
+        with self._lock:
+            self._errors[key] = self._errors.get(key, 0) + 1
+
+    def auth(self, grant_type: str):
+        with self._lock:
+            self._auth[grant_type] = self._auth.get(grant_type, 0) + 1
+
+    def requests(self, endpoint: str, method: str = 'GET') -> int:
+        """Number of requests sent to given endpoint."""
+        with self._lock:
+            metrics = self._endpoints.get((endpoint, method))
+            return metrics.count if metrics else 0
+
+    def errors(self, endpoint: str = None) -> Dict[Tuple[str, str, str, str], int]:
+        """Error counts by endpoint, method, error class name and code."""
+        with self._lock:
+            return {key: count for key, count in self._errors.items() if endpoint is None or key[0] == endpoint}
+
+    def auths(self) -> Dict[str, int]:
+        """Access token grant counts by grant type."""
+        with self._lock:
+            return dict(self._auth)
+
+    def clear(self):
+        with self._lock:
+            self._endpoints.clear()
+            self._errors.clear()
+            self._auth.clear()
+
+    def to_prometheus(self) -> str:
+        """Exports all the metrics in the Prometheus text exposition format."""
+        prefix = self.prefix
+        with self._lock:
+            endpoints = sorted(self._endpoints.items())
+            errors = sorted(self._errors.items())
+            auth = sorted(self._auth.items())
+            lines = [
+                f'# HELP {prefix}_requests_total API requests by endpoint, method and status.',
+                f'# TYPE {prefix}_requests_total counter']
+            for (endpoint, method), metrics in endpoints:
+                for status, count in sorted(metrics.statuses.items()):
+                    lines.append(
+                        f'{prefix}_requests_total{{endpoint="{endpoint}",method="{method}",status="{status}"}} '
+                        f'{count}')
+
+            lines += [
+                f'# HELP {prefix}_request_duration_seconds API request latency.',
+                f'# TYPE {prefix}_request_duration_seconds histogram']
+            for (endpoint, method), metrics in endpoints:
+                labels = f'endpoint="{endpoint}",method="{method}"'
+                cumulative = 0
+                for bound, count in zip(LATENCY_BUCKETS + (float('inf'),), metrics.buckets):
+                    cumulative += count
+                    le = '+Inf' if bound == float('inf') else repr(bound)
+                    lines.append(f'{prefix}_request_duration_seconds_bucket{{{labels},le="{le}"}} {cumulative}')
+                lines.append(f'{prefix}_request_duration_seconds_sum{{{labels}}} {metrics.seconds!r}')
+                lines.append(f'{prefix}_request_duration_seconds_count{{{labels}}} {metrics.count}')
+
+            for direction in ('request', 'response'):
+                lines += [
+                    f'# HELP {prefix}_{direction}_bytes_total API {direction} body bytes.',
+                    f'# TYPE {prefix}_{direction}_bytes_total counter']
+                for (endpoint, method), metrics in endpoints:
+                    lines.append(
+                        f'{prefix}_{direction}_bytes_total{{endpoint="{endpoint}",method="{method}"}} '
+                        f'{getattr(metrics, direction + "_bytes")}')
+
+        lines += [
+            f'# HELP {prefix}_errors_total API errors by endpoint, method, error and its code.',
+            f'# TYPE {prefix}_errors_total counter']
+        for (endpoint, method, error, code), count in errors:
+            lines.append(
+                f'{prefix}_errors_total{{endpoint="{endpoint}",method="{method}",error="{error}",code="{code}"}} '
+                f'{count}')
+
+        lines += [
+            f'# HELP {prefix}_auth_total Access tokens obtained by grant type.',
+            f'# TYPE {prefix}_auth_total counter']
+        for grant_type, count in auth:
+            lines.append(f'{prefix}_auth_total{{grant_type="{grant_type}"}} {count}')
+        return '\n'.join(lines) + '\n'
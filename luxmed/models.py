@@ -0,0 +1,218 @@
+"""Compact, read-only models of the API data.
+
+Only the commonly used fields are decoded and kept (dates are parsed lazily, on first access).
+For backward compatibility models still behave like (read-only) mappings of the original API keys,
+restricted to the decoded fields.
+"""
+from collections.abc import Mapping
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+from typing import BinaryIO
+from typing import Dict
+from typing import Iterator
+from typing import List
+from typing import NamedTuple
+from typing import Tuple
+from typing import Union
+
+from luxmed.download import download
+from luxmed.download import safe_file_name
+from luxmed.urls import BASE_URL
+from luxmed.utils import find_link_rel
+
+
+DATE_TIME_FORMAT = '%Y-%m-%dT%H:%M:%S%z'
+
+
+def parse_date_time(value: str) -> datetime:
+    """Parses API (ISO-8601) date time."""
+    return datetime.strptime(value, DATE_TIME_FORMAT)
+
+
+class Clinic(NamedTuple):
+    id: int
+    name: str
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'Clinic':
+        return cls(data['Id'], data['Name'])
+
+
+class Doctor(NamedTuple):
+    id: int
+    name: str
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'Doctor':
+        return cls(data['Id'], data['Name'])
+
+
+class LuxMedModel(Mapping):
+    """Common base for the models. Subclasses define the mapping keys in `KEYS`."""
+    __slots__ = ()
+    KEYS: Tuple[str, ...] = ()
+
+    def _item(self, key: str) -> Any:
+        raise NotImplementedError
+
+    def __getitem__(self, key: str) -> Any:
+        if key not in self.KEYS:
+            raise KeyError(key)
+        return self._item(key)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.KEYS)
+
+    def __len__(self) -> int:
+        return len(self.KEYS)
+
+    def __repr__(self) -> str:
+        fields = ', '.join(f'{name}={getattr(self, name)!r}' for name in self.__slots__ if not name.startswith('_'))
+        return f'{type(self).__name__}({fields})'
+
+
+class VisitTerm(LuxMedModel):
+    """Available appointment (term)."""
+    __slots__ = ('service_id', 'clinic', 'doctor', 'room_id', 'schedule_id', 'start_date_time',
+                 'end_date_time', 'is_additional', 'referral_required_by_service', 'time_of_day',
+                 'payer_details', '_start', '_end')
+    KEYS = ('ServiceId', 'Clinic', 'Doctor', 'VisitDate', 'RoomId', 'ScheduleId', 'IsAdditional',
+            'ReferralRequiredByService', 'TimeOfDay', 'PayerDetailsList')
+
+    def __init__(self, service_id: int, clinic: Clinic, doctor: Doctor, room_id: int, schedule_id: int,
+                 start_date_time: str, end_date_time: str, is_additional: bool = False,
+                 referral_required_by_service: bool = False, time_of_day: int = None,
+                 payer_details: List[Dict] = None):
+        self.service_id = service_id
+        self.clinic = clinic
+        self.doctor = doctor
+        self.room_id = room_id
+        self.schedule_id = schedule_id
+        self.start_date_time = start_date_time  # as returned by the API, see `start` for the parsed one
+        self.end_date_time = end_date_time
+        self.is_additional = is_additional
+        self.referral_required_by_service = referral_required_by_service
+        self.time_of_day = time_of_day
+        self.payer_details = payer_details or []
+        self._start = self._end = None
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'VisitTerm':
+        """Args:
+            data (dict): Available appointment, as yielded by the `LuxMedVisits.find`.
+        """
+        return cls(
+            service_id=data['ServiceId'],
+            clinic=Clinic.from_dict(data['Clinic']),
+            doctor=Doctor.from_dict(data['Doctor']),
+            room_id=data['RoomId'],
+            schedule_id=data['ScheduleId'],
+            start_date_time=data['VisitDate']['StartDateTime'],
+            end_date_time=data['VisitDate']['EndDateTime'],
+            is_additional=data.get('IsAdditional', False),
+            referral_required_by_service=data.get('ReferralRequiredByService', False),
+            time_of_day=data.get('TimeOfDay'),
+            payer_details=data.get('PayerDetailsList'))
+
+    @property
+    def start(self) -> datetime:
+        if self._start is None:
+            self._start = parse_date_time(self.start_date_time)
+        return self._start
+
+    @property
+    def end(self) -> datetime:
+        if self._end is None:
+            self._end = parse_date_time(self.end_date_time)
+        return self._end
+
+    def _item(self, key: str) -> Any:
+        if key == 'Clinic':
+            return {'Id': self.clinic.id, 'Name': self.clinic.name}
+        if key == 'Doctor':
+            return {'Id': self.doctor.id, 'Name': self.doctor.name}
+        if key == 'VisitDate':
+            return {'StartDateTime': self.start_date_time, 'EndDateTime': self.end_date_time}
+        if key == 'PayerDetailsList':
+            return self.payer_details
+        return getattr(self, _VISIT_TERM_ATTRIBUTES[key])
+
+    def reservation_args(self) -> Dict:
+        """Keyword arguments for reserving this appointment, e.g. with the `LuxMedVisits.reserve`
+        (payer data excluded)."""
+        return dict(
+            clinic_id=self.clinic.id, doctor_id=self.doctor.id, room_id=self.room_id, service_id=self.service_id,
+            start_date_time=self.start_date_time, is_additional=self.is_additional,
+            referral_required_by_service=self.referral_required_by_service)
+
+
+_VISIT_TERM_ATTRIBUTES = {
+    'ServiceId': 'service_id',
+    'RoomId': 'room_id',
+    'ScheduleId': 'schedule_id',
+    'IsAdditional': 'is_additional',
+    'ReferralRequiredByService': 'referral_required_by_service',
+    'TimeOfDay': 'time_of_day'}
+
+
+class ExaminationResult(LuxMedModel):
+    """Compact examination result. See `LuxMedExaminationResult` for the full one."""
+    __slots__ = ('id', 'names', 'date_time', 'is_available', 'details_href', 'document_href', 'file_name',
+                 '_date', '_transport')
+    KEYS = ('MedicalExaminationId', 'ExaminationsNames', 'Date')
+
+    def __init__(self, id: str, names: Tuple[str, ...], date_time: str, is_available: bool = True,
+                 details_href: str = None, document_href: str = None, file_name: str = None, transport=None):
+        self.id = id
+        self.names = names
+        self.date_time = date_time  # as returned by the API, see `date` for the parsed one
+        self.is_available = is_available
+        self.details_href = details_href
+        self.document_href = document_href
+        self.file_name = safe_file_name(file_name, f'{id}.pdf')
+        self._date = None
+        self._transport = transport
+
+    @classmethod
+    def from_dict(cls, data: Dict, transport=None) -> 'ExaminationResult':
+        """Args:
+            data (dict): Examination result, as returned by the API.
+            transport (LuxMedTransport, optional): Needed for fetching details and document.
+        """
+        details = find_link_rel(data.get('Links', []), 'examination-result-details')
+        document = find_link_rel(data.get('DownloadLinks', []), 'examination-result-document')
+        return cls(
+            id=data['MedicalExaminationId'],
+            names=tuple(data.get('ExaminationsNames', ())),
+            date_time=data['Date']['DateTime'],
+            is_available=data.get('AvailabilityInfo', {}).get('IsAvailable', True),
+            details_href=details and details['Href'],
+            document_href=document and document['Href'],
+            file_name=document and document.get('FileName'),
+            transport=transport)
+
+    @property
+    def date(self) -> datetime:
+        if self._date is None:
+            self._date = parse_date_time(self.date_time)
+        return self._date
+
+    def _item(self, key: str) -> Any:
+        if key == 'MedicalExaminationId':
+            return self.id
+        if key == 'ExaminationsNames':
+            return list(self.names)
+        return {'DateTime': self.date_time}
+
+    def details(self) -> Dict:
+        """Examination result details."""
+        return self._transport.get(BASE_URL + self.details_href)
+
+    def document(self) -> bytes:
+        """Examination result details in PDF."""
+        return self._transport.get(BASE_URL + self.document_href)
+
+    def download(self, target: Union[str, Path, BinaryIO], resume: bool = True) -> int:
+        """Streams examination result PDF into a file. See `luxmed.download.download`."""
+        return download(self._transport, BASE_URL + self.document_href, target, resume=resume)
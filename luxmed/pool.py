@@ -0,0 +1,80 @@
+from collections.abc import Mapping
+from threading import Lock
+from typing import Dict
+from typing import Iterator
+from typing import Tuple
+
+from requests.adapters import HTTPAdapter
+
+from luxmed.luxmed import LuxMed
+
+
+class LuxMedPool(Mapping):
+    """Many accounts (clients) sharing a single connection pool.
+
+    Every account keeps its own session (headers, authorization), while connections to the API host are reused
+    between all of them. Clients are created on first access, by account user name.
+    """
+
+    def __init__(self, max_connections: int = 10, block: bool = False, max_retries: int = 0):
+        """Args:
+            max_connections (int, optional): Maximum number of connections kept open to the API host. Defaults to 10.
+            block (bool, optional): Whether to wait for a free connection, when all of them are in use,
+                instead of opening (and dropping afterwards) an extra one. Defaults to false.
+            max_retries (int, optional): Maximum number of connection retries. Defaults to 0.
+        """
+        # all the accounts talk to the very same host, so a single host pool is enough
+        self._adapter = HTTPAdapter(
+            pool_connections=1, pool_maxsize=max_connections, pool_block=block, max_retries=max_retries)
+        self._accounts: Dict[str, Tuple[str, Dict]] = {}
+        self._clients: Dict[str, LuxMed] = {}
+        self._lock = Lock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __getitem__(self, user_name: str) -> LuxMed:
+        try:
+            return self._clients[user_name]
+        except KeyError:
+            pass
+        with self._lock:
+            if user_name not in self._clients:
+                password, kwargs = self._accounts[user_name]
+                self._clients[user_name] = LuxMed(user_name, password, adapter=self._adapter, **kwargs)
+            return self._clients[user_name]
+
+    def __len__(self) -> int:
+        return len(self._accounts)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._accounts)
+
+    def add(self, user_name: str, password: str, **kwargs):
+        """Registers an account. Replaces previously registered one with the same user name.
+
+        Args:
+            user_name (str): LUX MED login.
+            password (str): LUX MED password.
+            **kwargs: Remaining client options forwarded to the `LuxMed`.
+        """
+        with self._lock:
+            self._accounts[user_name] = password, kwargs
+            self._clients.pop(user_name, None)
+
+    def remove(self, user_name: str):
+        """Unregisters given account.
+
+        Raises:
+            KeyError: When account is not registered.
+        """
+        with self._lock:
+            del self._accounts[user_name]
+            self._clients.pop(user_name, None)
+
+    def close(self):
+        """Closes all pooled connections."""
+        self._adapter.close()
@@ -0,0 +1,159 @@
+from datetime import datetime
+from datetime import timezone
+from email.utils import parsedate_to_datetime
+from random import uniform
+from threading import Lock
+from time import monotonic
+from time import sleep
+from typing import Callable
+from typing import Collection
+from typing import Optional
+
+from requests import Response
+from requests import codes
+
+from luxmed.errors import LuxMedCircuitOpenError
+from luxmed.urls import TOKEN_URL
+
+
+def retry_after(response: Response) -> Optional[float]:
+    """Seconds to wait before retrying, as requested by the server (`Retry-After` header), if at all."""
+    value = response.headers.get('Retry-After')
+    if not value:
+        return None
+    try:
+        return max(0., float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0., (parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        return None
+
+
+class RetryPolicy:
+    """Decides which requests are retried and how long to wait before each retry.
+
+    Only idempotent requests are retried: repeating non-idempotent one (e.g. reservation) after it possibly
+    reached the server could have it processed twice. Waiting time grows exponentially, with full jitter,
+    unless the server asks for a specific one with the `Retry-After` header.
+    """
+
+    def __init__(self, max_retries: int = 3, backoff: float = 0.5, max_backoff: float = 30,
+                 statuses: Collection[int] = (codes.too_many_requests, codes.internal_server_error,
+                                              codes.bad_gateway, codes.service_unavailable, codes.gateway_timeout),
+                 methods: Collection[str] = ('GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE'),
+                 urls: Collection[str] = (TOKEN_URL,), sleeper: Callable[[float], None] = sleep):
+        """Args:
+            max_retries (int, optional): Maximum number of retries per request. Defaults to 3.
+            backoff (float, optional): Base waiting time, in seconds, doubled with every retry. Defaults to 0.5.
+            max_backoff (float, optional): Maximum waiting time, in seconds. Requests asked to wait longer
+                (with `Retry-After`) are not retried. Defaults to 30.
+            statuses (collection of int, optional): Response statuses worth a retry.
+                Defaults to 429 and the temporary server errors.
+            methods (collection of str, optional): Idempotent HTTP methods. Defaults to those defined by RFC 7231
+                (POST and PATCH excluded).
+            urls (collection of str, optional): URLs safe to retry regardless of the method.
+                Defaults to the token endpoint only (authentication has no side effects).
+            sleeper (callable, optional): Waits given number of seconds. Defaults to `time.sleep`.
+        """
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.statuses = frozenset(statuses)
+        self.methods = frozenset(method.upper() for method in methods)
+        self.urls = frozenset(urls)
+        self._sleeper = sleeper
+
+    def is_idempotent(self, method: str, url: str) -> bool:
+        return method.upper() in self.methods or url in self.urls
+
+    def delay(self, attempt: int, response: Response = None) -> Optional[float]:
+        """Seconds to wait before given retry (counted from 0), or None when it should not be retried."""
+        if attempt >= self.max_retries:
+            return None
+        if response is not None:
+            requested = retry_after(response)
+            if requested is not None:
+                return requested if requested <= self.max_backoff else None
+        return uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
+
+    def sleep(self, seconds: float):
+        self._sleeper(seconds)
+
+
+class CircuitBreaker:
+    """Fails fast while the API keeps failing, instead of piling up requests bound to fail anyway.
+
+    Breaker opens after given number of consecutive failures. Once the reset timeout passes,
+    a single trial request is let through: its success closes the breaker, while failure opens it again.
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half-open'
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30, timer: Callable[[], float] = monotonic):
+        """Args:
+            failure_threshold (int, optional): Consecutive failures opening the breaker. Defaults to 5.
+            reset_timeout (float, optional): Seconds the breaker stays open for. Defaults to 30.
+            timer (callable, optional): Current time source, in seconds. Defaults to monotonic clock.
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._timer = timer
+        self._failures = 0
+        self._opened_at = None
+        self._trial = False
+        self._lock = Lock()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state['_lock']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._state()
+
+    def _state(self) -> str:
+        if self._opened_at is None:
+            return self.CLOSED
+        if self._timer() - self._opened_at >= self.reset_timeout:
+            return self.HALF_OPEN
+        return self.OPEN
+
+    def before_request(self):
+        """Raises:
+            LuxMedCircuitOpenError: When request should not be sent.
+        """
+        with self._lock:
+            state = self._state()
+            if state == self.CLOSED:
+                return
+            if state == self.HALF_OPEN and not self._trial:
+                self._trial = True
+                return
+            retry_in = max(0., self._opened_at + self.reset_timeout - self._timer())
+        raise LuxMedCircuitOpenError(f'API is failing, requests suspended for {retry_in:.0f}s')
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._trial or self._failures >= self.failure_threshold:
+                self._opened_at = self._timer()
+            self._trial = False
+
+
+DEFAULT_RETRY = RetryPolicy()
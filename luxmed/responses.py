@@ -0,0 +1,231 @@
+"""Conditional (ETag / Last-Modified) cache of the read-mostly API responses."""
+import hashlib
+import json
+import os
+from collections import OrderedDict
+from pathlib import Path
+from tempfile import NamedTemporaryFile
+from threading import Lock
+from time import time
+from typing import Callable
+from typing import Collection
+from typing import Dict
+from typing import NamedTuple
+from typing import Optional
+from typing import Tuple
+from typing import Union
+from urllib.parse import urlencode
+
+from luxmed.urls import EXAMINATION_RESULTS_URL
+from luxmed.urls import HISTORY_VISITS_URL
+from luxmed.urls import USER_PERMISSIONS_URL
+from luxmed.urls import USER_URL
+from luxmed.urls import VISIT_TERMS_RESERVATION_URL
+
+
+CACHED_URLS = (USER_URL, USER_PERMISSIONS_URL, VISIT_TERMS_RESERVATION_URL, HISTORY_VISITS_URL)
+CACHED_URL_PREFIXES = (f'{EXAMINATION_RESULTS_URL}/internal/',)  # examination result details and documents
+
+
+class CachedResponse(NamedTuple):
+    content: bytes
+    content_type: Optional[str]
+    etag: Optional[str]
+    last_modified: Optional[str]
+    stored_at: float  # UNIX time
+
+    @property
+    def validators(self) -> Dict[str, str]:
+        """Conditional request headers revalidating this response."""
+        headers = {}
+        if self.etag:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified:
+            headers['If-Modified-Since'] = self.last_modified
+        return headers
+
+
+class ResponseCacheBackend:
+    """Common base for the response cache storages."""
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        raise NotImplementedError
+
+    def set(self, key: str, response: CachedResponse):
+        raise NotImplementedError
+
+    def delete(self, key: str):
+        raise NotImplementedError
+
+    def clear(self):
+        raise NotImplementedError
+
+
+class MemoryResponseCacheBackend(ResponseCacheBackend):
+    """Process wide storage, keeping recently used responses only."""
+
+    def __init__(self, max_size: int = 256):
+        """Args:
+            max_size (int, optional): Maximum number of responses kept. Defaults to 256.
+        """
+        self.max_size = max_size
+        self._responses: 'OrderedDict[str, CachedResponse]' = OrderedDict()
+        self._lock = Lock()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state['_lock']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = Lock()
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        with self._lock:
+            response = self._responses.get(key)
+            if response is not None:
+                self._responses.move_to_end(key)
+            return response
+
+    def set(self, key: str, response: CachedResponse):
+        with self._lock:
+            self._responses[key] = response
+            self._responses.move_to_end(key)
+            while len(self._responses) > self.max_size:
+                self._responses.popitem(last=False)
+
+    def delete(self, key: str):
+        with self._lock:
+            self._responses.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._responses.clear()
+
+
+class DiskResponseCacheBackend(ResponseCacheBackend):
+    """Keeps responses in a directory (a file per response, readable by the owner only)."""
+
+    def __init__(self, directory: Union[str, Path]):
+        """Args:
+            directory (str or Path): Cache directory. Created when missing.
+        """
+        self.directory = Path(directory).expanduser()
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, key: str) -> Path:
+        return self.directory / hashlib.sha256(key.encode()).hexdigest()
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        try:
+            with self._path(key).open('rb') as f:
+                header = json.loads(f.readline())
+                return CachedResponse(f.read(), *header)
+        except (FileNotFoundError, ValueError, TypeError):
+            return
+
+    def set(self, key: str, response: CachedResponse):
+        # write to a temporary file first, so that concurrent readers never see partial content
+        with NamedTemporaryFile('wb', dir=str(self.directory), delete=False) as f:
+            f.write(json.dumps(list(response[1:])).encode() + b'\n')
+            f.write(response.content)
+        os.chmod(f.name, 0o600)
+        os.replace(f.name, str(self._path(key)))
+
+    def delete(self, key: str):
+        try:
+            self._path(key).unlink()
+        except FileNotFoundError:
+            pass
+
+    def clear(self):
+        for path in self.directory.iterdir():
+            if len(path.name) == 64:
+                path.unlink()
+
+
+class ResponseCache:
+    """Caches GET responses of the read-mostly endpoints, per account, URL and parameters.
+
+    Responses carrying validators (ETag or Last-Modified) are revalidated with a conditional request every time
+    they are needed, so that unchanged body is not transferred again. Responses without validators are reused
+    for a limited time instead.
+    """
+
+    def __init__(self, backend: ResponseCacheBackend = None, ttl: float = 300, urls: Collection[str] = CACHED_URLS,
+                 url_prefixes: Collection[str] = CACHED_URL_PREFIXES, timer: Callable[[], float] = time):
+        """Args:
+            backend (ResponseCacheBackend, optional): Responses storage. Defaults to the memory one.
+            ttl (float, optional): How long (in seconds) to reuse responses lacking validators. Defaults to 5 minutes.
+            urls (collection of str, optional): Cached URLs. Defaults to the user profile, permissions,
+                reservation filters and visit history.
+            url_prefixes (collection of str, optional): Cached URL prefixes. Defaults to the examination result
+                details and documents.
+            timer (callable, optional): Current UNIX time source. Defaults to `time.time`.
+        """
+        self.backend = backend if backend is not None else MemoryResponseCacheBackend()
+        self.ttl = ttl
+        self.urls = frozenset(urls)
+        self.url_prefixes = tuple(url_prefixes)
+        self._timer = timer
+        self._stats = {'hits': 0, 'revalidated': 0, 'misses': 0}
+        self._lock = Lock()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state['_lock']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = Lock()
+
+    def cacheable(self, method: str, url: str) -> bool:
+        return method.upper() == 'GET' and (url in self.urls or url.startswith(self.url_prefixes))
+
+    @staticmethod
+    def key(account: str, lang_code: str, url: str, params=None) -> str:
+        """Cache key of the request. Params must not be an iterator, as they are consumed."""
+        if params:
+            url += '?' + (params if isinstance(params, str) else urlencode(params))
+        return f'{account}\0{lang_code}\0{url}'
+
+    def _count(self, stat: str):
+        with self._lock:
+            self._stats[stat] += 1
+
+    def lookup(self, key: str) -> Tuple[Optional[CachedResponse], bool]:
+        """Cached response, if any, along with whether it can be used without asking the server (counted as a hit).
+        Responses with validators are never fresh, they have to be revalidated."""
+        response = self.backend.get(key)
+        if response is None or response.etag or response.last_modified:
+            return response, False
+        if self._timer() - response.stored_at >= self.ttl:
+            return None, False
+        self._count('hits')
+        return response, True
+
+    def revalidated(self, key: str, response: CachedResponse) -> CachedResponse:
+        """Marks cached response as confirmed (not modified) by the server."""
+        self._count('revalidated')
+        response = response._replace(stored_at=self._timer())
+        self.backend.set(key, response)
+        return response
+
+    def store(self, key: str, content: bytes, headers) -> CachedResponse:
+        """Stores fetched (full) response. Counts a miss."""
+        self._count('misses')
+        response = CachedResponse(
+            content, headers.get('Content-Type'), headers.get('ETag'), headers.get('Last-Modified'), self._timer())
+        self.backend.set(key, response)
+        return response
+
+    def stats(self) -> Dict[str, int]:
+        """Numbers of responses served from the cache (`hits`), confirmed by the server (`revalidated`)
+        and fetched in full (`misses`)."""
+        with self._lock:
+            return dict(self._stats)
+
+    def clear(self):
+        self.backend.clear()
@@ -0,0 +1,142 @@
+import json
+import sqlite3
+from datetime import date
+from datetime import timedelta
+from pathlib import Path
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import Union
+
+from luxmed.examination import LuxMedExamination
+from luxmed.utils import year_ago
+
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS examination_results (
+    account TEXT NOT NULL,
+    id TEXT NOT NULL,
+    date TEXT NOT NULL,
+    name TEXT,
+    data TEXT NOT NULL,
+    details TEXT,
+    PRIMARY KEY (account, id));
+CREATE INDEX IF NOT EXISTS examination_results_date ON examination_results (account, date);
+CREATE INDEX IF NOT EXISTS examination_results_name ON examination_results (account, name, date);
+CREATE TABLE IF NOT EXISTS examination_sync (
+    account TEXT PRIMARY KEY,
+    synced_until TEXT NOT NULL);
+'''
+
+
+class LuxMedExaminationStore:
+    """Local (SQLite) copy of the examination results, synchronized incrementally.
+
+    Every account keeps a high-water mark (the date it was synchronized until), so that subsequent
+    synchronizations fetch only the results published since then.
+    """
+
+    def __init__(self, path: Union[str, Path] = ':memory:'):
+        """Args:
+            path (str or Path, optional): Database file. Defaults to an in-memory database.
+        """
+        self._connection = sqlite3.connect(str(path))
+        self._connection.executescript(SCHEMA)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        self._connection.close()
+
+    def synced_until(self, account: str) -> Optional[date]:
+        """Date the account has been synchronized until, if ever."""
+        row = self._connection.execute(
+            'SELECT synced_until FROM examination_sync WHERE account = ?', (account,)).fetchone()
+        return row and date(*map(int, row[0].split('-')))
+
+    def sync(self, examination: LuxMedExamination, account: str = None, since: date = None, to_date: date = None,
+             overlap_days: int = 7, details: bool = True) -> int:
+        """Fetches examination results published since the last synchronization.
+
+        Args:
+            examination (LuxMedExamination): Used for fetching.
+            account (str, optional): Account name the results belong to. Defaults to the examination user name.
+            since (date, optional): Start date for the very first synchronization. Defaults to a year ago.
+            to_date (date, optional): Synchronize until this date. Defaults to today.
+            overlap_days (int, optional): Fetch that many days before the high-water mark again,
+                catching results published late. Defaults to a week.
+            details (bool, optional): Fetch details of the new results as well. Defaults to true.
+
+        Returns:
+            Number of new results.
+        """
+        if account is None:
+            account = examination._transport.user_name
+        if to_date is None:
+            to_date = date.today()
+        synced_until = self.synced_until(account)
+        if synced_until is None:
+            from_date = since or year_ago(to_date)
+        else:
+            from_date = synced_until - timedelta(days=overlap_days)
+
+        new = 0
+        with self._connection:
+            for result in examination.results(from_date=from_date, to_date=to_date):
+                data = result.data
+                known = self._connection.execute(
+                    'SELECT details IS NOT NULL FROM examination_results WHERE account = ? AND id = ?',
+                    (account, data['MedicalExaminationId'])).fetchone()
+                if known is None:
+                    new += 1
+                    # placeholder row, filled below (upserts are not available in older SQLite versions)
+                    self._connection.execute(
+                        "INSERT INTO examination_results (account, id, date, data) VALUES (?, ?, '', '')",
+                        (account, data['MedicalExaminationId']))
+                if details and not (known and known[0]):
+                    self._connection.execute(
+                        'UPDATE examination_results SET details = ? WHERE account = ? AND id = ?',
+                        (json.dumps(result.details()), account, data['MedicalExaminationId']))
+                self._connection.execute(
+                    'UPDATE examination_results SET date = ?, name = ?, data = ? WHERE account = ? AND id = ?',
+                    (data['Date']['DateTime'][:10], (data.get('ExaminationsNames') or [None])[0], json.dumps(data),
+                     account, data['MedicalExaminationId']))
+            self._connection.execute(
+                'INSERT OR REPLACE INTO examination_sync (account, synced_until) VALUES (?, ?)',
+                (account, to_date.isoformat()))
+        return new
+
+    def results(self, account: str, from_date: date = None, to_date: date = None,
+                name: str = None) -> List[Dict]:
+        """Stored examination results, newest first.
+
+        Args:
+            account (str): Account name the results belong to.
+            from_date (date, optional): Results starting with this date.
+            to_date (date, optional): Results until this date.
+            name (str, optional): Results of this examination (first of the examination names).
+        """
+        query = 'SELECT data FROM examination_results WHERE account = ?'
+        args = [account]
+        if from_date is not None:
+            query += ' AND date >= ?'
+            args.append(from_date.isoformat())
+        if to_date is not None:
+            query += ' AND date <= ?'
+            args.append(to_date.isoformat())
+        if name is not None:
+            query += ' AND name = ?'
+            args.append(name)
+        query += ' ORDER BY date DESC, id'
+        return [json.loads(data) for data, in self._connection.execute(query, args)]
+
+    def details(self, account: str, examination_id: str) -> Optional[Dict]:
+        """Stored examination result details, if fetched."""
+        row = self._connection.execute(
+            'SELECT details FROM examination_results WHERE account = ? AND id = ?',
+            (account, examination_id)).fetchone()
+        return row and row[0] and json.loads(row[0])
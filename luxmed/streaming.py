@@ -0,0 +1,75 @@
+from codecs import getincrementaldecoder
+from json import JSONDecodeError
+from json import JSONDecoder
+from typing import Any
+from typing import Iterable
+from typing import Iterator
+
+
+_decoder = JSONDecoder()
+WHITESPACE = ' \t\n\r'
+
+
+def iter_array_items(chunks: Iterable[bytes], key: str, encoding: str = 'utf-8') -> Iterator[Any]:
+    """Incrementally decodes items of all the JSON arrays stored under given key (at any depth),
+    as soon as they arrive. Remaining document content is skipped without being decoded.
+
+    Only a single item (plus a chunk) is kept in memory at a time, regardless of the document size.
+
+    Args:
+        chunks (iterable of bytes): Raw JSON document parts, e.g. `Response.iter_content`.
+        key (str): Name of the key holding arrays of interest.
+        encoding (str, optional): Document encoding. Defaults to UTF-8.
+
+    Yields:
+        Decoded array items, in the document order.
+
+    Raises:
+        JSONDecodeError: When an item is malformed or the document ends in the middle of it.
+    """
+    needle = f'"{key}"'
+    text_decoder = getincrementaldecoder(encoding)()
+    buffer = ''
+    in_array = False
+    for chunk in chunks:
+        buffer += text_decoder.decode(chunk)
+        position = 0
+        while True:
+            if not in_array:
+                found = buffer.find(needle, position)
+                if found == -1:
+                    # keep just enough to match a needle split between chunks
+                    position = max(position, len(buffer) - len(needle) + 1)
+                    break
+                start = found + len(needle)
+                while start < len(buffer) and buffer[start] in WHITESPACE + ':':
+                    start += 1
+                if start == len(buffer):  # array start not received yet
+                    position = found
+                    break
+                position = start
+                if buffer[start] == '[':
+                    in_array = True
+                    position += 1
+                continue
+
+            while position < len(buffer) and buffer[position] in WHITESPACE + ',':
+                position += 1
+            if position == len(buffer):
+                break
+            if buffer[position] == ']':
+                in_array = False
+                position += 1
+                continue
+            try:
+                item, position = _decoder.raw_decode(buffer, position)
+            except JSONDecodeError:
+                break  # most likely incomplete, wait for more
+            yield item
+        buffer = buffer[position:]
+
+    buffer += text_decoder.decode(b'', final=True)
+    if in_array and buffer.strip():
+        # decode whatever is left to surface the actual error
+        _decoder.raw_decode(buffer.lstrip(WHITESPACE + ','))
+        raise JSONDecodeError('Unterminated array', buffer, 0)
@@ -0,0 +1,135 @@
+import multiprocessing
+from threading import Lock
+from time import monotonic
+from time import sleep
+from typing import Callable
+
+
+class TokenBucket:
+    """Thread-safe token bucket rate limiter.
+
+    Bucket refills at a constant rate, up to its capacity, allowing short bursts while keeping the average rate.
+    """
+
+    def __init__(self, rate: float, capacity: float = None, timer: Callable[[], float] = monotonic,
+                 sleeper: Callable[[float], None] = sleep):
+        """Args:
+            rate (float): Tokens added per second.
+            capacity (float, optional): Maximum number of tokens (burst size), at least one. Defaults to the rate
+                (one second), but no less than a single token.
+            timer (callable, optional): Current time source, in seconds. Defaults to monotonic clock.
+            sleeper (callable, optional): Waits given number of seconds. Defaults to `time.sleep`.
+        """
+        if rate <= 0:
+            raise ValueError('Rate must be positive.')
+        if capacity is not None and capacity < 1:
+            raise ValueError('Capacity must hold at least a single token.')
+        self.rate = rate
+        self.capacity = capacity or max(1., rate)
+        self._timer = timer
+        self._sleeper = sleeper
+        self._tokens = self.capacity
+        self._updated = timer()
+        self._lock = Lock()
+
+    def __getstate__(self):
+        # unpickled copy limits on its own (e.g. in another process), see `SharedTokenBucket` for a shared one
+        state = self.__dict__.copy()
+        del state['_lock']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = Lock()
+
+    def _refill(self):
+        now = self._timer()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def delay(self, tokens: float = 1) -> float:
+        """Seconds until given amount of tokens becomes available."""
+        with self._lock:
+            self._refill()
+            return max(0., (tokens - self._tokens) / self.rate)
+
+    def try_acquire(self, tokens: float = 1) -> bool:
+        """Takes given amount of tokens, if available right away.
+
+        Returns:
+            Whether the tokens were taken.
+        """
+        with self._lock:
+            self._refill()
+            if self._tokens < tokens:
+                return False
+            self._tokens -= tokens
+            return True
+
+    def acquire(self, tokens: float = 1, timeout: float = None) -> bool:
+        """Takes given amount of tokens, waiting for them when needed.
+        Tokens are reserved upfront, so waiting callers are served in order.
+
+        Args:
+            tokens (float, optional): Amount of tokens to take. Defaults to 1.
+            timeout (float, optional): Maximum number of seconds to wait. Defaults to waiting as long as needed.
+
+        Returns:
+            Whether the tokens were taken (false only when timed out).
+        """
+        with self._lock:
+            self._refill()
+            wait = max(0., (tokens - self._tokens) / self.rate)
+            if timeout is not None and wait > timeout:
+                return False
+            self._tokens -= tokens
+        if wait:
+            self._sleeper(wait)
+        return True
+
+
+class SharedTokenBucket(TokenBucket):
+    """Token bucket shared by many processes (e.g. `LuxMedFleet` workers), kept in shared memory.
+
+    Has to be handed to the processes when they are started (e.g. as `Process` arguments or pool initializer
+    arguments), it cannot be sent over a queue or pipe afterwards.
+    """
+
+    def __init__(self, rate: float, capacity: float = None, timer: Callable[[], float] = monotonic,
+                 sleeper: Callable[[float], None] = sleep, context: multiprocessing.context.BaseContext = None):
+        """Args:
+            rate (float): Tokens added per second.
+            capacity (float, optional): Maximum number of tokens (burst size), at least one. Defaults to the rate
+                (one second), but no less than a single token.
+            timer (callable, optional): Current time source, in seconds, common to all the processes.
+                Defaults to monotonic clock.
+            sleeper (callable, optional): Waits given number of seconds. Defaults to `time.sleep`.
+            context (multiprocessing context, optional): Context the processes are started with.
+                Defaults to the default one.
+        """
+        context = context or multiprocessing.get_context()
+        self._state = context.RawArray('d', 2)  # tokens, updated at
+        super().__init__(rate, capacity, timer, sleeper)
+        self._lock = context.Lock()
+
+    @property
+    def _tokens(self) -> float:
+        return self._state[0]
+
+    @_tokens.setter
+    def _tokens(self, value: float):
+        self._state[0] = value
+
+    @property
+    def _updated(self) -> float:
+        return self._state[1]
+
+    @_updated.setter
+    def _updated(self, value: float):
+        self._state[1] = value
+
+    def __getstate__(self):
+        return self.__dict__
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
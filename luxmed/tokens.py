@@ -0,0 +1,163 @@
+import json
+import os
+from contextlib import contextmanager
+from pathlib import Path
+from tempfile import NamedTemporaryFile
+from time import time
+from typing import Dict
+from typing import NamedTuple
+from typing import Optional
+from typing import Union
+
+try:
+    import fcntl
+except ImportError:  # not available on Windows, where the file is not locked
+    fcntl = None
+
+
+class LuxMedToken(NamedTuple):
+    """API access token."""
+    access_token: str
+    token_type: str
+    expires_at: float  # seconds since the epoch
+    refresh_token: Optional[str] = None
+
+    @classmethod
+    def from_response(cls, data: Dict, now: float = None) -> 'LuxMedToken':
+        """Args:
+            data (dict): Token API response.
+            now (float, optional): Time the token has been issued at (seconds since the epoch). Defaults to now.
+        """
+        if now is None:
+            now = time()
+        return cls(
+            access_token=data['access_token'],
+            token_type=data['token_type'],
+            expires_at=now + data.get('expires_in', 0),
+            refresh_token=data.get('refresh_token'))
+
+    @property
+    def header(self) -> str:
+        """Authorization header value."""
+        return self.token_type + ' ' + self.access_token
+
+    def expires_within(self, seconds: float) -> bool:
+        """Whether the token expires (or already has) within given amount of seconds from now."""
+        return self.expires_at - seconds <= time()
+
+
+class TokenCache:
+    """Base for token caches, which allow to skip authentication with the credentials (e.g. on restart)."""
+
+    def load(self, key: str) -> Optional[LuxMedToken]:
+        """Returns token stored under the given key, if any."""
+        raise NotImplementedError
+
+    def save(self, key: str, token: LuxMedToken):
+        """Stores token under the given key."""
+        raise NotImplementedError
+
+    def delete(self, key: str):
+        """Removes token stored under the given key, if any."""
+        raise NotImplementedError
+
+
+class MemoryTokenCache(TokenCache):
+    """Process wide token cache."""
+
+    def __init__(self):
+        self._tokens: Dict[str, LuxMedToken] = {}
+
+    def load(self, key: str) -> Optional[LuxMedToken]:
+        return self._tokens.get(key)
+
+    def save(self, key: str, token: LuxMedToken):
+        self._tokens[key] = token
+
+    def delete(self, key: str):
+        self._tokens.pop(key, None)
+
+
+class FileTokenCache(TokenCache):
+    """Keeps tokens in a JSON file readable by the owner only."""
+
+    def __init__(self, path: Union[str, Path]):
+        """Args:
+            path (str or Path): Cache file path. Created when missing.
+        """
+        self.path = Path(path)
+
+    def _read(self) -> Dict[str, list]:
+        try:
+            with self.path.open() as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    def _write(self, tokens: Dict[str, list]):
+        # write to a temporary file first, so that concurrent readers never see partial content
+        with NamedTemporaryFile('w', dir=str(self.path.parent), delete=False) as f:
+            json.dump(tokens, f)
+        os.chmod(f.name, 0o600)
+        os.replace(f.name, str(self.path))
+
+    def load(self, key: str) -> Optional[LuxMedToken]:
+        try:
+            return LuxMedToken(*self._read()[key])
+        except (KeyError, TypeError):
+            return
+
+    @contextmanager
+    def _locked(self):
+        # serializes read-modify-write of the processes sharing the file, so that none of the updates is lost
+        if fcntl is None:
+            yield
+            return
+        with open(str(self.path) + '.lock', 'w') as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def save(self, key: str, token: LuxMedToken):
+        with self._locked():
+            tokens = self._read()
+            tokens[key] = list(token)
+            self._write(tokens)
+
+    def delete(self, key: str):
+        with self._locked():
+            tokens = self._read()
+            if tokens.pop(key, None) is not None:
+                self._write(tokens)
+
+
+class KeyringTokenCache(TokenCache):
+    """Keeps tokens in the system keyring. Requires the optional `keyring` dependency."""
+
+    def __init__(self, service_name: str = 'luxmed'):
+        """Args:
+            service_name (str, optional): Keyring service name. Defaults to luxmed.
+        """
+        import keyring
+        self._keyring = keyring
+        self.service_name = service_name
+
+    def load(self, key: str) -> Optional[LuxMedToken]:
+        data = self._keyring.get_password(self.service_name, key)
+        if data is None:
+            return
+        try:
+            return LuxMedToken(*json.loads(data))
+        except (ValueError, TypeError):
+            return
+
+    def save(self, key: str, token: LuxMedToken):
+        self._keyring.set_password(self.service_name, key, json.dumps(list(token)))
+
+    def delete(self, key: str):
+        try:
+            self._keyring.delete_password(self.service_name, key)
+        except self._keyring.errors.PasswordDeleteError:
+            pass
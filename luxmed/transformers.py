@@ -1,4 +1,5 @@
 from datetime import date
+from functools import lru_cache
 from typing import Dict
 from typing import Iterator
 from typing import List
@@ -9,12 +10,25 @@ from inflection import camelize
 
 
 FILTER_DEFAULTS = dict(from_date=lambda: date.today().isoformat())
+# names of the commonly used filters, spared from the (regex based) camelization
+FILTER_NAMES = {
+    name: 'filter.' + camelize(name) for name in (
+        'city_id', 'clinic_id', 'doctor_id', 'from_date', 'language_id', 'payer_id', 'service_id', 'time_of_day',
+        'to_date')}
 
 
-def full_filter_name(name: str) -> str:
+@lru_cache(maxsize=256)
+def _camelized_filter_name(name: str) -> str:
     return 'filter.' + camelize(name)
 
 
+def full_filter_name(name: str) -> str:
+    try:
+        return FILTER_NAMES[name]
+    except KeyError:
+        return _camelized_filter_name(name)
+
+
 def filter_args(**kwargs) -> Iterator[Tuple[str, Union[int, str]]]:
     """Converts all given keyword arguments to the proper filters understood by the service API.
     When given argument does not have a value, a default one is used or it is dropped.
@@ -1,83 +1,345 @@
-from json import JSONDecodeError
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock
+from threading import local
+from time import perf_counter
+from typing import Collection
 from typing import Dict
+from typing import Iterator
 from typing import List
+from typing import Optional
 from typing import Union
 from uuid import uuid4
 
+from requests.exceptions import ChunkedEncodingError
 from requests.exceptions import ConnectionError
 from requests.exceptions import HTTPError
+from requests.exceptions import RequestException
 from requests.exceptions import Timeout
+from requests import Response
 from requests import Session
+from requests import codes
+from requests.adapters import HTTPAdapter
 
+from luxmed.decoding import JSONDecoder
+from luxmed.decoding import resolve_decoder
 from luxmed.errors import LuxMedError
 from luxmed.errors import LuxMedConnectionError
 from luxmed.errors import LuxMedTimeoutError
+from luxmed.metrics import MetricsSink
+from luxmed.metrics import endpoint_name
+from luxmed.resilience import DEFAULT_RETRY
+from luxmed.resilience import CircuitBreaker
+from luxmed.resilience import RetryPolicy
+from luxmed.responses import ResponseCache
+from luxmed.throttling import TokenBucket
+from luxmed.tokens import LuxMedToken
+from luxmed.tokens import TokenCache
+from luxmed.urls import BASE_API_URL
+from luxmed.urls import BASE_URL
 from luxmed.urls import HOST
 from luxmed.urls import TOKEN_URL
 
 
+def client_headers(app_uuid: str, lang_code: str) -> Dict[str, str]:
+    """Headers identifying the client as the official mobile application."""
+    return {
+        'x-api-client-identifier': 'Android',
+        'Accept-Language': lang_code,
+        'Custom-User-Agent': 'Patient Portal; 4.17.0; '
+                             f'{app_uuid}; '
+                             'Android; 28; generic_x86 Android SDK built for x86',
+        'Host': HOST,
+        'Connection': 'Keep-Alive',
+        'Accept-Encoding': 'gzip',
+        'User-Agent': 'okhttp/3.11.0'}
+
+
 class LuxMedTransport:
     """Responsible for communication with the API."""
 
     TOKEN_HEADER_NAME = 'Authorization'
 
     def __init__(self, user_name: str, password: str,
-                 app_uuid: str = None, client_uuid: str = None, lang_code: str = 'en'):
+                 app_uuid: str = None, client_uuid: str = None, lang_code: str = 'en', adapter: HTTPAdapter = None,
+                 token_cache: TokenCache = None, refresh_margin: float = 60,
+                 retry: Optional[RetryPolicy] = DEFAULT_RETRY, rate_limit: TokenBucket = None,
+                 host_rate_limit: TokenBucket = None, circuit_breaker: CircuitBreaker = None,
+                 metrics: MetricsSink = None, base_url: str = None, response_cache: ResponseCache = None,
+                 json_decoder: Union[str, JSONDecoder] = 'auto', thread_safe: bool = False,
+                 max_connections: int = 10):
         """Args:
             user_name (str): Your LUX MED login.
             password (str): Your LUX MED password.
             app_uuid (str, optional): Application UUID. Defaults to random UUID.
             client_uuid (str, optional): Client UUID. Defaults to random UUID.
             lang_code (str, optional): Two letter (ISO 639-1) language code. Defaults to en.
+            adapter (HTTPAdapter, optional): Transport adapter (connection pool), can be shared between sessions.
+                Defaults to a private one.
+            token_cache (TokenCache, optional): Keeps access tokens between the client instances (e.g. restarts).
+            refresh_margin (float, optional): Refresh access token this many seconds before it expires.
+                Defaults to 60.
+            retry (RetryPolicy, optional): Retries of the failed idempotent requests. Defaults to the default
+                policy, None disables retries.
+            rate_limit (TokenBucket, optional): Limits requests of this account.
+            host_rate_limit (TokenBucket, optional): Limits requests to the API host, can be shared between
+                the clients (accounts).
+            circuit_breaker (CircuitBreaker, optional): Fails requests fast while the API keeps failing,
+                can be shared between the clients (accounts).
+            metrics (MetricsSink, optional): Receives metrics of every API call, e.g. `MetricsRegistry`,
+                can be shared between the clients (accounts).
+            base_url (str, optional): API origin (scheme, host and port) used instead of the official one,
+                e.g. a local test server.
+            response_cache (ResponseCache, optional): Reuses (revalidated) responses of the read-mostly endpoints,
+                can be shared between the clients (accounts).
+            json_decoder (str or callable, optional): JSON decoder name or function, see `luxmed.decoding`.
+                Defaults to the fastest one available.
+            thread_safe (bool, optional): Allow sending requests from many threads at once: every thread gets its
+                own session, while they all share the access token and connection pool. Defaults to false.
+            max_connections (int, optional): Maximum number of connections kept open to the API host in the
+                thread-safe mode, should match the number of threads using the client. Ignored when an adapter
+                is given. Defaults to 10.
         """
         self.user_name = user_name
         self.password = password
         self.app_uuid = app_uuid or str(uuid4())
         self.client_uuid = client_uuid or str(uuid4())
         self.lang_code = lang_code
+        self.token_cache = token_cache
+        self.refresh_margin = refresh_margin
+        self.retry = retry
+        self.rate_limits = [limit for limit in (host_rate_limit, rate_limit) if limit is not None]
+        self.circuit_breaker = circuit_breaker
+        self.metrics = metrics
+        self.base_url = base_url and base_url.rstrip('/')
+        self.response_cache = response_cache
+        self._loads = resolve_decoder(json_decoder)
+        self.token: Optional[LuxMedToken] = None
+        self.thread_safe = thread_safe
+        if adapter is None and thread_safe:
+            # all the threads talk to the very same host, so a single host pool is enough
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_connections)
+        self._adapter = adapter
+        # a single authentication (or token refresh) in flight, concurrent callers wait for its token
+        self._auth_lock = Lock()
+        self._local = local()
+        self._shared_session = None if thread_safe else self._new_session(adapter)
+
+        if token_cache is not None:
+            token = token_cache.load(self.user_name)
+            if token is not None and not token.expires_within(self.refresh_margin):
+                self._set_token(token, cache=False)
+
+    def _new_session(self, adapter: HTTPAdapter = None) -> Session:
+        session = Session()
+        session.headers = client_headers(self.app_uuid, self.lang_code)
+        if self.base_url:
+            del session.headers['Host']
+        if adapter is not None:
+            session.mount('https://', adapter)
+            if self.base_url:
+                session.mount(self.base_url, adapter)
+        if self.token is not None:
+            session.headers[self.TOKEN_HEADER_NAME] = self.token.header
+        return session
+
+    @property
+    def _session(self) -> Session:
+        """Session of the current thread (in the thread-safe mode) or the only one, carrying the current token."""
+        if self._shared_session is not None:
+            return self._shared_session
+        local_ = self._local
+        session = getattr(local_, 'session', None)
+        if session is None:
+            session = local_.session = self._new_session(self._adapter)
+            local_.token = self.token
+        elif local_.token is not self.token:  # renewed by another thread
+            local_.token = self.token
+            session.headers[self.TOKEN_HEADER_NAME] = self.token.header
+        return session
+
+    def __getstate__(self):
+        # sessions and their connections are process bound, unpickled copy opens its own ones
+        state = self.__dict__.copy()
+        del state['_auth_lock'], state['_local'], state['_shared_session']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._auth_lock = Lock()
+        self._local = local()
+        self._shared_session = None if self.thread_safe else self._new_session(self._adapter)
+
+    def _record(self, success: bool):
+        if self.circuit_breaker is not None:
+            if success:
+                self.circuit_breaker.record_success()
+            else:
+                self.circuit_breaker.record_failure()
+
+    def _failed(self, method: str, url: str, error: LuxMedError) -> LuxMedError:
+        self._record(False)
+        if self.metrics is not None:
+            self.metrics.error(self._endpoint(url), method, error)
+        return error
+
+    @staticmethod
+    def _network_error(error: RequestException) -> LuxMedError:
+        if isinstance(error, Timeout):  # before the connection error, as connect timeout is both
+            return LuxMedTimeoutError('Request timed out')
+        if isinstance(error, (ConnectionError, ChunkedEncodingError)):  # the latter when dropped mid-body
+            return LuxMedConnectionError('Connection failed')
+        return LuxMedError(f'Request failed: {error}')  # e.g. too many redirects
+
+    def _url(self, url: str) -> str:
+        if self.base_url and url.startswith(BASE_URL):
+            return self.base_url + url[len(BASE_URL):]
+        return url
 
-        self._session = Session()
-        self._session.headers = {
-            'x-api-client-identifier': 'Android',
-            'Accept-Language': self.lang_code,
-            'Custom-User-Agent': 'Patient Portal; 4.17.0; '
-                                 f'{self.app_uuid}; '
-                                 'Android; 28; generic_x86 Android SDK built for x86',
-            'Host': HOST,
-            'Connection': 'Keep-Alive',
-            'Accept-Encoding': 'gzip',
-            'User-Agent': 'okhttp/3.11.0'}
+    def _endpoint(self, url: str) -> str:
+        if self.base_url and url.startswith(self.base_url):
+            url = BASE_URL + url[len(self.base_url):]
+        return endpoint_name(url)
+
+    def _observe(self, response: Response, seconds: float, streamed: bool):
+        request = response.request
+        body = request.body
+        length = response.headers.get('Content-Length')
+        if length is not None:
+            response_bytes = int(length)
+        else:  # streamed body is not read yet, it must not be consumed here
+            response_bytes = 0 if streamed else len(response.content)
+        self.metrics.request(
+            self._endpoint(request.url), request.method, response.status_code, seconds,
+            len(body) if body else 0, response_bytes)
+
+    def _attempt(self, method: str, url: str, **kwargs) -> Response:
+        if self.circuit_breaker is not None:
+            self.circuit_breaker.before_request()
+        for limit in self.rate_limits:
+            limit.acquire()
+        start = perf_counter()
+        try:
+            response = self._session.request(method, self._url(url), **kwargs)
+        except RequestException as error:
+            raise self._failed(method, url, self._network_error(error)) from error
+        except BaseException:  # e.g. interrupted, half-open circuit must not await the outcome forever
+            self._record(False)
+            raise
+        if self.metrics is not None:
+            self._observe(response, perf_counter() - start, kwargs.get('stream', False))
+        self._record(response.status_code < 500 and response.status_code != codes.too_many_requests)
+        return response
+
+    def _session_request(self, method: str, url: str, **kwargs) -> Response:
+        """Sends request, throttled and retried according to the client policies."""
+        retry = self.retry if self.retry is not None and self.retry.is_idempotent(method, url) else None
+        attempt = 0
+        while True:
+            try:
+                response = self._attempt(method, url, **kwargs)
+            except (LuxMedConnectionError, LuxMedTimeoutError):
+                delay = retry.delay(attempt) if retry is not None else None
+                if delay is None:
+                    raise
+            else:
+                if retry is None or response.status_code not in retry.statuses:
+                    return response
+                delay = retry.delay(attempt, response)
+                if delay is None:
+                    return response
+                response.close()
+            retry.sleep(delay)
+            attempt += 1
 
     def _request(self, method: str, url: str, **kwargs):
-        response = self._session.request(method, url, **kwargs)
+        return self._parse(self._session_request(method, url, **kwargs))
+
+    def _parse(self, response: Response):
         try:
             response.raise_for_status()
         except HTTPError as error:
-            raise LuxMedError.from_response(response) from error
-        except ConnectionError as error:
-            raise LuxMedConnectionError('Connection failed') from error
-        except Timeout as error:
-            raise LuxMedTimeoutError('Request timed out') from error
-        try:
-            if 'application/json' in response.headers['Content-Type']:
-                return response.json()
-            else:
-                return response.content
-        except KeyError:  # no content
+            luxmed_error = LuxMedError.from_response(response, self._loads)
+            if self.metrics is not None:
+                self.metrics.error(self._endpoint(response.request.url), response.request.method, luxmed_error)
+            raise luxmed_error from error
+        return self._decode(response.headers.get('Content-Type'), response.content)
+
+    def _decode(self, content_type: Optional[str], content: bytes):
+        if content_type is None:  # no content
             return
+        if 'application/json' in content_type:
+            return self._loads(content)
+        return content
+
+    def _set_token(self, token: LuxMedToken, cache: bool = True):
+        self.token = token
+        if self._shared_session is not None:  # sessions of the threads pick it up on their next request
+            self._shared_session.headers[self.TOKEN_HEADER_NAME] = token.header
+        if cache and self.token_cache is not None:
+            self.token_cache.save(self.user_name, token)
+
+    def _renew(self, stale: Optional[LuxMedToken]):
+        """Replaces given (missing, expiring or rejected) token, unless another thread already did."""
+        with self._auth_lock:
+            if self.token is not stale:
+                return
+            if stale is None:
+                self.authenticate()
+            else:
+                self.refresh()
+
+    def _ensure_token(self):
+        token = self.token
+        if token is None or token.expires_within(self.refresh_margin):
+            self._renew(token)
 
     def authenticate(self):
         """Authenticates session with the credentials given during initialization."""
-        token = self._request('POST', TOKEN_URL, data={
+        self._set_token(LuxMedToken.from_response(self._request('POST', TOKEN_URL, data={
             'client_id': self.client_uuid,
             'grant_type': 'password',
             'username': self.user_name,
-            'password': self.password})
-        self._session.headers[self.TOKEN_HEADER_NAME] = token['token_type'] + ' ' + token['access_token']
+            'password': self.password})))
+        if self.metrics is not None:
+            self.metrics.auth('password')
+
+    def refresh(self):
+        """Renews access token using the refresh token.
+        Falls back to the authentication with credentials, when refresh token is not available or got rejected.
+        """
+        if self.token is None or not self.token.refresh_token:
+            return self.authenticate()
+        try:
+            self._set_token(LuxMedToken.from_response(self._request('POST', TOKEN_URL, data={
+                'client_id': self.client_uuid,
+                'grant_type': 'refresh_token',
+                'refresh_token': self.token.refresh_token})))
+        except LuxMedError:
+            self.authenticate()
+        else:
+            if self.metrics is not None:
+                self.metrics.auth('refresh_token')
+
+    def _send(self, method: str, url: str, **kwargs) -> Response:
+        self._ensure_token()
+        if isinstance(kwargs.get('params'), Iterator):  # might be needed twice
+            kwargs['params'] = list(kwargs['params'])
+        token = self.token
+        response = self._session_request(method, url, **kwargs)
+        if response.status_code == codes.unauthorized:
+            response.close()
+            self._renew(token)
+            response = self._session_request(method, url, **kwargs)
+        return response
 
     def request(self, method: str, url: str, **kwargs) -> Union[Dict, List, None]:
         """Sends request via given HTTP method to a URL with all the required headers set.
 
+        Responses of the read-mostly endpoints are reused when the response cache is enabled.
+        Access token is refreshed shortly before it expires. Request rejected as unauthorized is retried once,
+        with a renewed access token. Idempotent requests failed temporarily are retried according to the retry
+        policy, while all the requests are subject to the rate limits and the circuit breaker.
+
         Args:
             method: The HTTP method.
             url: Requested URL.
@@ -86,9 +348,94 @@ class LuxMedTransport:
         Returns:
             Parsed JSON or None when not available.
         """
-        if self.TOKEN_HEADER_NAME not in self._session.headers:
-            self.authenticate()
-        return self._request(method, url, **kwargs)
+        cache = self.response_cache
+        if cache is None or not cache.cacheable(method, url):
+            return self._parse(self._send(method, url, **kwargs))
+
+        if isinstance(kwargs.get('params'), Iterator):  # needed for the key as well
+            kwargs['params'] = list(kwargs['params'])
+        key = cache.key(self.user_name, self.lang_code, url, kwargs.get('params'))
+        cached, fresh = cache.lookup(key)
+        if fresh:
+            return self._decode(cached.content_type, cached.content)
+        if cached is not None:
+            kwargs['headers'] = dict(kwargs.get('headers') or {}, **cached.validators)
+        response = self._send(method, url, **kwargs)
+        if cached is not None and response.status_code == codes.not_modified:
+            response.close()
+            cached = cache.revalidated(key, cached)
+            return self._decode(cached.content_type, cached.content)
+        data = self._parse(response)
+        cache.store(key, response.content, response.headers)
+        return data
+
+    def open(self, method: str, url: str, accept: Collection[int] = (), **kwargs) -> Response:
+        """Like `request`, but returns the response as soon as its headers arrive, leaving the body unread.
+        Response has to be closed afterwards (e.g. used as a context manager).
+
+        Args:
+            method: The HTTP method.
+            url: Requested URL.
+            accept (collection of int, optional): Error statuses returned as they are, instead of being raised.
+            **kwargs: Remaining request parameters forwarded to the underlying `requests.request` method.
+
+        Returns:
+            Successful (or accepted) streamed response.
+        """
+        response = self._send(method, url, stream=True, **kwargs)
+        if response.status_code >= 400 and response.status_code not in accept:
+            with response:
+                self._parse(response)  # raises
+        return response
+
+    def stream(self, method: str, url: str, chunk_size: int = 64 * 1024, **kwargs) -> Iterator[bytes]:
+        """Like `request`, but yields raw (decompressed) response body in chunks, as they arrive.
+
+        Args:
+            method: The HTTP method.
+            url: Requested URL.
+            chunk_size (int, optional): Maximum chunk size, in bytes. Defaults to 64 KiB.
+            **kwargs: Remaining request parameters forwarded to the underlying `requests.request` method.
+
+        Yields:
+            Response body chunks.
+        """
+        with self.open(method, url, **kwargs) as response:
+            yield from self.iter_body(response, chunk_size)
+
+    def iter_body(self, response: Response, chunk_size: int = 64 * 1024) -> Iterator[bytes]:
+        """Yields body of a response returned by `open` in chunks, as they arrive.
+        Network failures while reading it (e.g. connection dropped mid-body) are raised as the LUX MED errors.
+
+        Args:
+            response (Response): Streamed response.
+            chunk_size (int, optional): Maximum chunk size, in bytes. Defaults to 64 KiB.
+
+        Yields:
+            Response body chunks.
+        """
+        try:
+            yield from response.iter_content(chunk_size)
+        except RequestException as error:
+            raise self._failed(response.request.method, response.request.url, self._network_error(error)) from error
+
+    def warm_up(self, connections: int = 1):
+        """Prepares for the latency critical requests (e.g. reservation) ahead of time:
+        makes sure the access token is valid and that connections to the API host are open.
+
+        Args:
+            connections (int, optional): Number of connections to open. Defaults to 1.
+        """
+        self._ensure_token()
+
+        def open_connection(_):
+            try:
+                self._session.head(self._url(BASE_API_URL)).close()
+            except RequestException:
+                pass  # the request itself is not what matters
+
+        with ThreadPoolExecutor(max_workers=connections) as executor:
+            list(executor.map(open_connection, range(connections)))
 
     def delete(self, url, **kwargs):
         return self.request('DELETE', url, **kwargs)
@@ -1,10 +1,22 @@
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import date
 from datetime import timedelta
+from itertools import islice
+from typing import Callable
 from typing import Dict
+from typing import Iterable
+from typing import Iterator
 from typing import List
+from typing import Tuple
+from typing import TypeVar
 from typing import Union
 
 
+T = TypeVar('T')
+R = TypeVar('R')
+
+
 def find_link_rel(links: List, name: str) -> Union[Dict, None]:
     """Returns link with given relation name."""
     for link in links:
@@ -16,3 +28,54 @@ def year_ago(from_date: date = None) -> date:
     if from_date is None:
         from_date = date.today()
     return from_date - timedelta(days=365)
+
+
+def date_windows(from_date: date, to_date: date, days: int) -> Iterator[Tuple[date, date]]:
+    """Splits date range into consecutive, non-overlapping windows. Both ends are inclusive.
+
+    Args:
+        from_date (date): Range start.
+        to_date (date): Range end.
+        days (int): Maximum window length.
+
+    Yields:
+        Window start and end dates.
+    """
+    if days < 1:
+        raise ValueError('Window must span at least a day.')
+    while from_date <= to_date:
+        window_end = min(from_date + timedelta(days=days - 1), to_date)
+        yield from_date, window_end
+        from_date = window_end + timedelta(days=1)
+
+
+def ordered_map(function: Callable[[T], R], items: Iterable[T], max_workers: int = 4,
+                prefetch: int = None) -> Iterator[R]:
+    """Concurrent (threaded) map yielding results in the order of the given items.
+    Only limited number of items is being processed (or waiting to be consumed) at a time.
+
+    Args:
+        function (callable): Called with every item.
+        items (iterable): Function arguments.
+        max_workers (int, optional): Maximum number of concurrent calls. Defaults to 4.
+        prefetch (int, optional): Maximum number of results computed ahead of the consumer.
+            Defaults to the number of workers.
+
+    Yields:
+        Function results.
+    """
+    items = iter(items)
+    pending = deque()
+    executor = ThreadPoolExecutor(max_workers=max_workers)
+    try:
+        for item in islice(items, prefetch or max_workers):
+            pending.append(executor.submit(function, item))
+        while pending:
+            result = pending.popleft().result()
+            for item in islice(items, 1):
+                pending.append(executor.submit(function, item))
+            yield result
+    finally:
+        for future in pending:
+            future.cancel()
+        executor.shutdown(wait=False)
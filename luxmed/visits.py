@@ -1,18 +1,26 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import as_completed
 from datetime import date
 from datetime import datetime
 from datetime import timedelta
 from enum import IntEnum
 from enum import unique
 from itertools import chain
+from json import dumps
+from time import perf_counter
 from typing import Any
 from typing import Dict
+from typing import Iterable
 from typing import Iterator
 from typing import List
+from typing import NamedTuple
 from typing import Tuple
 from typing import Union
 
-from inflection import camelize
-
+from luxmed.errors import LuxMedError
+from luxmed.models import VisitTerm
+from luxmed.streaming import iter_array_items
 from luxmed.transformers import filter_args
 from luxmed.transport import LuxMedTransport
 from luxmed.urls import HISTORY_VISITS_URL
@@ -21,9 +29,14 @@ from luxmed.urls import VISIT_RESERVE_TEMPORARY_URL
 from luxmed.urls import VISIT_RESERVE_URL
 from luxmed.urls import VISIT_TERMS_URL
 from luxmed.urls import VISIT_TERMS_VALUATION_URL
+from luxmed.utils import date_windows
+from luxmed.utils import ordered_map
 from luxmed.utils import year_ago
 
 
+logger = logging.getLogger(__name__)
+
+
 @unique
 class VisitHours(IntEnum):
     ALL = 0
@@ -32,26 +45,139 @@ class VisitHours(IntEnum):
     PAST_17 = 3
 
 
+@unique
+class Evaluation(IntEnum):
+    """How to run the (seemingly optional) appointment evaluation during reservation."""
+    SKIP = 0
+    SEQUENTIAL = 1  # before the final reservation, like the official app does
+    CONCURRENT = 2  # along with the final reservation
+
+
+class PreparedReservation(NamedTuple):
+    """Reservation requests data, serialized upfront. See `LuxMedVisits.prepare_reservation`."""
+    temporary: bytes  # temporary reservation and evaluation JSON
+    final_prefix: bytes  # permanent reservation JSON, lacking only the temporary reservation ID
+
+
+class ReservationResult(NamedTuple):
+    details: Dict
+    timings: Dict[str, float]  # seconds spent on every step
+
+
+class VisitTerms(Iterator):
+    """Available appointments, as returned by the `LuxMedVisits.find`."""
+
+    def __init__(self, visits: Iterator):
+        self._visits = visits
+
+    def __next__(self):
+        return next(self._visits)
+
+    def to_columns(self) -> Dict[str, Any]:
+        """Consumes remaining appointments into NumPy arrays. See `luxmed.columns.visits_to_arrays`."""
+        from luxmed.columns import visits_to_arrays  # numpy is an optional dependency
+        return visits_to_arrays(self)
+
+
+class VisitQuery(NamedTuple):
+    """Available appointments search query. See `LuxMedVisits.find` for the fields description."""
+    city_id: int
+    service_id: int
+    language_id: int
+    payer_id: int
+    clinic_id: int = None
+    doctor_id: int = None
+    from_date: date = None
+    to_date: date = None
+    hours: VisitHours = VisitHours.ALL
+
+
+def find_filters(city_id: int, service_id: int, language_id: int, payer_id: int,
+                 clinic_id: int = None, doctor_id: int = None,
+                 from_date: date = None, to_date: date = None,
+                 hours: VisitHours = VisitHours.ALL) -> Iterator[Tuple[str, Union[int, str]]]:
+    """Available appointments search filters. See `LuxMedVisits.find` for the arguments description."""
+    if not to_date:
+        to_date = (from_date or date.today()) + timedelta(days=7)
+    return filter_args(
+        city_id=city_id, service_id=service_id, language_id=language_id, payer_id=payer_id,
+        clinic_id=clinic_id, doctor_id=doctor_id,
+        from_date=from_date, to_date=to_date,
+        time_of_day=hours.value)
+
+
+def available_terms(available: Dict) -> Iterator[Dict]:
+    """Yields all available appointments (regular first, additional later) from the raw search response."""
+    for visits in chain(
+            available.get('AgregateAvailableVisitTerms', []),
+            available.get('AgregateAvailableAdditionalVisitTerms', [])):
+        yield from visits['AvailableVisitsTermPresentation']
+
+
+def term_key(visit: Dict) -> Tuple[int, str]:
+    """Identifies available appointment (term) regardless of the list it came from."""
+    return visit['ScheduleId'], visit['VisitDate']['StartDateTime']
+
+
+def unique_terms(visits: Iterable[Dict]) -> Iterator[Dict]:
+    """Yields available appointments skipping the repeated ones (see `term_key`), preserving the order."""
+    seen = set()
+    for visit in visits:
+        key = term_key(visit)
+        if key not in seen:
+            seen.add(key)
+            yield visit
+
+
+def term_start(visit: Dict) -> str:
+    """Available appointment start date time, as returned by the API (local time ISO-8601)."""
+    return visit['VisitDate']['StartDateTime']
+
+
+def reservation_data(*args, payer_details: List[Dict], **kwargs) -> Dict:
+    """Temporary reservation and evaluation request data."""
+    data = dict(LuxMedVisits._common_reservation_data(*args, **kwargs))
+    data['PayerDetailsList'] = payer_details
+    return data
+
+
+def final_reservation_data(*args, payer_data: Dict, temporary_reservation_id: int, **kwargs) -> Dict:
+    """Permanent reservation request data."""
+    data = dict(LuxMedVisits._common_reservation_data(*args, **kwargs))
+    del data['ReferralRequiredByService']
+    data['PayerData'] = payer_data
+    data['TemporaryReservationId'] = temporary_reservation_id
+    return data
+
+
 class LuxMedVisits:
     """Doctor appointments."""
 
     def __init__(self, transport: LuxMedTransport):
         self._transport = transport
         self._headers = {'Api-Version': '2.0'}
+        self._json_headers = {'Content-Type': 'application/json'}
 
     @staticmethod
     def _common_reservation_data(
             clinic_id: int, doctor_id: int, room_id: int, service_id: int, start_date_time: Union[datetime, str],
-            is_additional: bool = False, referral_required_by_service: bool = False) -> Iterator[Tuple[str, Any]]:
-        for key, value in locals().items():
-            if isinstance(value, datetime):
-                value = value.isoformat()
-            yield camelize(key), value
+            is_additional: bool = False, referral_required_by_service: bool = False) -> Tuple[Tuple[str, Any], ...]:
+        if isinstance(start_date_time, datetime):
+            start_date_time = start_date_time.isoformat()
+        return (
+            ('ClinicId', clinic_id),
+            ('DoctorId', doctor_id),
+            ('RoomId', room_id),
+            ('ServiceId', service_id),
+            ('StartDateTime', start_date_time),
+            ('IsAdditional', is_additional),
+            ('ReferralRequiredByService', referral_required_by_service))
 
     def _post_reservation_to(self, url: str, *args, payer_details: List[Dict], **kwargs) -> Dict:
-        data = dict(self._common_reservation_data(*args, **kwargs))
-        data['PayerDetailsList'] = payer_details
-        return self._transport.post(url, json=data)
+        return self._transport.post(url, json=reservation_data(*args, payer_details=payer_details, **kwargs))
+
+    def _available(self, **kwargs) -> Dict:
+        return self._transport.get(VISIT_TERMS_URL, params=find_filters(**kwargs), headers=self._headers)
 
     def cancel(self, reservation_id: int):
         """Cancels given appointment reservation ID.
@@ -84,9 +210,13 @@ class LuxMedVisits:
     def find(self, city_id: int, service_id: int, language_id: int, payer_id: int,
              clinic_id: int = None, doctor_id: int = None,
              from_date: date = None, to_date: date = None,
-             hours: VisitHours = VisitHours.ALL) -> Iterator[Dict]:
+             hours: VisitHours = VisitHours.ALL, shard_days: int = None, max_workers: int = 4,
+             stream: bool = False, compact: bool = False) -> VisitTerms:
         """Find all available doctor appointments.
 
+        Long date ranges can be split into shards (shorter date windows) fetched concurrently.
+        Shards are yielded as soon as all the preceding ones are, so the first results arrive early.
+
         Args:
             city_id (int): City where the appointment should take place in.
             service_id (int): Desired service.
@@ -98,23 +228,89 @@ class LuxMedVisits:
             from_date (date, optional): Start searching from this date. Defaults to current day.
             to_date (date, optional): Search until this date. Defaults to a week, starting from the from_date.
             hours (VisitHours, optional): Show only appointments within those hours. Defaults to all.
+            shard_days (int, optional): Split the date range into windows of this many days.
+                Sharded results are yielded in chronological order. Defaults to no sharding.
+            max_workers (int, optional): Maximum number of shards fetched concurrently. Defaults to 4.
+            stream (bool, optional): Decode appointments as the response arrives, yielding the first ones before
+                the download finishes and without holding the whole response in memory. Ignored with sharding.
+                Defaults to false.
+            compact (bool, optional): Yield compact `VisitTerm` models instead of the raw dictionaries.
+                Defaults to false.
 
-        Yields:
-            Available appointments.
+        Returns:
+            Available appointments iterator, which can be also converted into NumPy arrays.
+            Appointments present on many lists (or in many shards) are yielded once.
         """
-        if not to_date:
-            to_date = (from_date or date.today()) + timedelta(days=7)
-        available = self._transport.get(VISIT_TERMS_URL, params=filter_args(
+        visits = self._find(
             city_id=city_id, service_id=service_id, language_id=language_id, payer_id=payer_id,
-            clinic_id=clinic_id, doctor_id=doctor_id,
-            from_date=from_date, to_date=to_date,
-            time_of_day=hours.value), headers=self._headers)
+            clinic_id=clinic_id, doctor_id=doctor_id, hours=hours,
+            from_date=from_date, to_date=to_date, shard_days=shard_days, max_workers=max_workers, stream=stream)
+        if compact:
+            visits = map(VisitTerm.from_dict, visits)
+        return VisitTerms(visits)
+
+    def _find(self, from_date: date, to_date: date, shard_days: int, max_workers: int, stream: bool,
+              **filters) -> Iterator[Dict]:
+        if shard_days is None:
+            if stream:
+                yield from unique_terms(iter_array_items(self._transport.stream(
+                    'GET', VISIT_TERMS_URL, params=find_filters(from_date=from_date, to_date=to_date, **filters),
+                    headers=self._headers), 'AvailableVisitsTermPresentation'))
+            else:
+                yield from unique_terms(available_terms(self._available(
+                    from_date=from_date, to_date=to_date, **filters)))
+            return
+
+        if not from_date:
+            from_date = date.today()
+        if not to_date:
+            to_date = from_date + timedelta(days=7)
+
+        def fetch(window: Tuple[date, date]) -> List[Dict]:
+            return sorted(
+                available_terms(self._available(from_date=window[0], to_date=window[1], **filters)),
+                key=term_start)
 
-        for visits in chain(
-                available.get('AgregateAvailableVisitTerms', []),
-                available.get('AgregateAvailableAdditionalVisitTerms', [])):
-            for visit in visits['AvailableVisitsTermPresentation']:
-                yield visit
+        yield from unique_terms(chain.from_iterable(
+            ordered_map(fetch, date_windows(from_date, to_date, shard_days), max_workers=max_workers)))
+
+    def find_many(self, queries: Iterable[Union[VisitQuery, Dict]],
+                  max_workers: int = 4) -> Iterator[Tuple[VisitQuery, Union[Dict, LuxMedError]]]:
+        """Find available doctor appointments for many queries at once.
+        Queries are run concurrently and their results are yielded as soon as they complete.
+        Failed query does not abort the remaining ones, its error is yielded instead.
+
+        Args:
+            queries (iterable of VisitQuery or dict): Search queries (or `find` keyword arguments).
+            max_workers (int, optional): Maximum number of queries run concurrently. Defaults to 4.
+
+        Yields:
+            Query along with one of its available appointments or with an error it failed with.
+        """
+        def find(query: VisitQuery) -> Union[List[Dict], LuxMedError]:
+            try:
+                return list(self.find(**query._asdict()))
+            except LuxMedError as error:
+                return error
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {}
+            for query in queries:
+                if not isinstance(query, VisitQuery):
+                    query = VisitQuery(**query)
+                futures[executor.submit(find, query)] = query
+            try:
+                for future in as_completed(futures):
+                    query = futures[future]
+                    visits = future.result()
+                    if isinstance(visits, LuxMedError):
+                        yield query, visits
+                        continue
+                    for visit in visits:
+                        yield query, visit
+            finally:
+                for future in futures:
+                    future.cancel()
 
     def history(self, from_date: date = None, to_date: date = None) -> List[Dict]:
         """Historic doctor appointments.
@@ -133,6 +329,31 @@ class LuxMedVisits:
         return self._transport.get(HISTORY_VISITS_URL, params=filter_args(
             from_date=from_date, to_date=to_date))
 
+    def iter_history(self, from_date: date, to_date: date = None, window_days: int = 365,
+                     max_workers: int = 4) -> Iterator[Dict]:
+        """Historic doctor appointments over an arbitrary (e.g. multi-year) date range.
+
+        Range is split into windows fetched concurrently, ahead of the consumer, while only a few of them
+        are kept in memory at a time. Windows are yielded in chronological order.
+
+        Args:
+            from_date (date): Show past appointments since this date.
+            to_date (date, optional): Show past appointments until this date. Defaults to the current date.
+            window_days (int, optional): Number of days fetched with a single request. Defaults to a year.
+            max_workers (int, optional): Maximum number of windows fetched concurrently. Defaults to 4.
+
+        Yields:
+            Historic appointments.
+        """
+        if not to_date:
+            to_date = date.today()
+
+        def fetch(window: Tuple[date, date]) -> List[Dict]:
+            return self.history(from_date=window[0], to_date=window[1])
+
+        for visits in ordered_map(fetch, date_windows(from_date, to_date, window_days), max_workers=max_workers):
+            yield from visits
+
     def reserve_temporarily(self, *args, payer_details: List[Dict], **kwargs) -> Dict:
         """Temporarily reserves given appointment.
         Given appointment details should come directly from the freshly fetched available visits.
@@ -156,6 +377,62 @@ class LuxMedVisits:
         """
         return self._post_reservation_to(VISIT_RESERVE_TEMPORARY_URL, *args, payer_details=payer_details, **kwargs)
 
+    def prepare_reservation(self, *args, payer_data: Dict, **kwargs) -> PreparedReservation:
+        """Builds and serializes all the reservation requests data ahead of time. See `reserve` for the arguments.
+
+        Returns:
+            Data ready to be used by the `reserve_prepared`.
+        """
+        final = dumps(final_reservation_data(
+            *args, payer_data=payer_data, temporary_reservation_id=0, **kwargs)).encode()
+        final_prefix = final[:final.rindex(b'0}')]
+        if not final_prefix.endswith(b'"TemporaryReservationId": '):
+            raise ValueError('Unexpected reservation data layout.')
+        return PreparedReservation(
+            temporary=dumps(reservation_data(*args, payer_details=[payer_data], **kwargs)).encode(),
+            final_prefix=final_prefix)
+
+    def reserve_prepared(self, prepared: PreparedReservation,
+                         evaluation: Evaluation = Evaluation.SEQUENTIAL) -> ReservationResult:
+        """Reserves appointment using previously prepared data.
+        Consider warming up the transport (`LuxMedTransport.warm_up`) beforehand.
+
+        Args:
+            prepared (PreparedReservation): Data returned by the `prepare_reservation`.
+            evaluation (Evaluation, optional): Whether to skip evaluation or run it concurrently
+                with the final reservation (its failure is only logged then, as the appointment is reserved
+                regardless). Defaults to run it in between, like the official app does.
+
+        Returns:
+            Reservation details, along with time spent on each of the steps.
+        """
+        timings = {}
+        started = perf_counter()
+
+        def post(step: str, url: str, data: bytes) -> Dict:
+            step_started = perf_counter()
+            try:
+                return self._transport.post(url, data=data, headers=self._json_headers)
+            finally:
+                timings[step] = perf_counter() - step_started
+
+        temp_reservation = post('temporary_reservation', VISIT_RESERVE_TEMPORARY_URL, prepared.temporary)
+        final = prepared.final_prefix + str(temp_reservation['Id']).encode() + b'}'
+        if evaluation == Evaluation.CONCURRENT:
+            with ThreadPoolExecutor(max_workers=1) as executor:
+                evaluated = executor.submit(post, 'evaluation', VISIT_TERMS_VALUATION_URL, prepared.temporary)
+                details = post('reservation', VISIT_RESERVE_URL, final)
+                try:
+                    evaluated.result()
+                except Exception as error:  # appointment is reserved already, it must not be reported as failed
+                    logger.warning('Evaluation of the reserved appointment failed: %s', error)
+        else:
+            if evaluation == Evaluation.SEQUENTIAL:
+                post('evaluation', VISIT_TERMS_VALUATION_URL, prepared.temporary)
+            details = post('reservation', VISIT_RESERVE_URL, final)
+        timings['total'] = perf_counter() - started
+        return ReservationResult(details, timings)
+
     def reserve(self, *args, payer_data: Dict, **kwargs) -> Dict:
         """Reserves given appointment.
         Given appointment details should come directly from the freshly fetched available visits.
@@ -176,14 +453,8 @@ class LuxMedVisits:
             Reservation details.
         """
 
-        temp_reservation = self.reserve_temporarily(*args, payer_details=[payer_data], **kwargs)
-        self.evaluate(*args, payer_details=[payer_data], **kwargs)  # not really needed? but lets follow app
-
-        data = dict(self._common_reservation_data(*args, **kwargs))
-        del data['ReferralRequiredByService']
-        data['PayerData'] = payer_data
-        data['TemporaryReservationId'] = temp_reservation['Id']
-        return self._transport.post(VISIT_RESERVE_URL, json=data)
+        # evaluation is not really needed? but lets follow app
+        return self.reserve_prepared(self.prepare_reservation(*args, payer_data=payer_data, **kwargs)).details
 
     def reserved(self) -> List[Dict]:
         """Currently reserved doctor appointments.
@@ -0,0 +1,186 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from heapq import heappop
+from heapq import heappush
+from itertools import count
+from random import uniform
+from threading import Condition
+from threading import Thread
+from time import monotonic
+from typing import Callable
+from typing import Dict
+from typing import List
+from typing import Set
+from typing import Union
+
+from luxmed.errors import LuxMedError
+from luxmed.throttling import TokenBucket
+from luxmed.visits import LuxMedVisits
+from luxmed.visits import VisitQuery
+from luxmed.visits import term_key
+
+
+logger = logging.getLogger(__name__)
+
+
+class VisitWatch:
+    """Single watched query. Returned by `VisitWatcher.watch`."""
+
+    def __init__(self, query: VisitQuery, callback: Callable[[VisitQuery, List[Dict]], None],
+                 interval: float, jitter: float, notify_initial: bool):
+        self.query = query
+        self.callback = callback
+        self.interval = interval
+        self.jitter = jitter
+        self.notify_initial = notify_initial
+        self.active = True
+        self.polls = 0
+        self._seen: Set = set()
+
+    def _next_delay(self) -> float:
+        return self.interval * (1 + uniform(-self.jitter, self.jitter))
+
+    def __repr__(self) -> str:
+        return f'{type(self).__name__}({self.query}, interval={self.interval})'
+
+
+class VisitWatcher:
+    """Polls many available appointment queries on a single scheduler thread,
+    notifying about the newly released appointments only.
+
+    Every query has its own (jittered) interval, while all of them share a common request budget.
+    """
+
+    def __init__(self, visits: LuxMedVisits, budget: TokenBucket = None, max_workers: int = 4,
+                 on_error: Callable[[VisitWatch, LuxMedError], None] = None):
+        """Args:
+            visits (LuxMedVisits): Used for searching.
+            budget (TokenBucket, optional): Shared request budget. Defaults to unlimited.
+            max_workers (int, optional): Maximum number of queries polled concurrently. Defaults to 4.
+            on_error (callable, optional): Called with watch and the error its poll failed with.
+                Defaults to logging the error. Failed watch is polled again after its interval.
+        """
+        self.visits = visits
+        self.budget = budget
+        self.max_workers = max_workers
+        self.on_error = on_error
+        self._queue = []  # (due time, sequence, watch) heap
+        self._sequence = count()
+        self._condition = Condition()
+        self._running = False
+        self._thread = None
+        self._executor = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def _schedule(self, watch: VisitWatch, delay: float):
+        with self._condition:
+            heappush(self._queue, (monotonic() + delay, next(self._sequence), watch))
+            self._condition.notify()
+
+    def _poll(self, watch: VisitWatch):
+        try:
+            visits = list(self.visits.find(**watch.query._asdict()))
+        except LuxMedError as error:
+            if self.on_error is None:
+                logger.warning('Polling %r failed: %s', watch, error)
+            else:
+                self.on_error(watch, error)
+        else:
+            keys = set()
+            new = []
+            for visit in visits:
+                key = term_key(visit)
+                keys.add(key)
+                if key not in watch._seen:
+                    new.append(visit)
+            watch._seen = keys  # terms which disappear and come back again are considered new
+            watch.polls += 1
+            if new and (watch.polls > 1 or watch.notify_initial):
+                try:
+                    watch.callback(watch.query, new)
+                except Exception:
+                    logger.exception('Callback of %r failed', watch)
+        finally:
+            if watch.active:
+                self._schedule(watch, watch._next_delay())
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while self._running:
+                    if self._queue:
+                        wait = self._queue[0][0] - monotonic()
+                        if wait <= 0:
+                            break
+                    else:
+                        wait = None
+                    self._condition.wait(wait)
+                if not self._running:
+                    return
+                due, _, watch = heappop(self._queue)
+            if not watch.active:
+                continue
+            if self.budget is not None and not self.budget.try_acquire():
+                # out of budget, retry once enough of it accumulates
+                self._schedule(watch, self.budget.delay())
+                continue
+            self._executor.submit(self._poll, watch)
+
+    def watch(self, query: Union[VisitQuery, Dict], callback: Callable[[VisitQuery, List[Dict]], None],
+              interval: float = 60, jitter: float = 0.1, notify_initial: bool = True) -> VisitWatch:
+        """Starts watching given query.
+
+        Args:
+            query (VisitQuery or dict): Search query (or `LuxMedVisits.find` keyword arguments).
+            callback (callable): Called with the query and a list of newly found appointments.
+            interval (float, optional): Seconds between polls. Defaults to a minute.
+            jitter (float, optional): Randomly stretch or shrink every interval by up to this fraction of it.
+                Defaults to 10%.
+            notify_initial (bool, optional): Whether to notify about appointments found by the first poll.
+                Defaults to true.
+
+        Returns:
+            Watch handle, which can be used to stop watching.
+        """
+        if not isinstance(query, VisitQuery):
+            query = VisitQuery(**query)
+        watch = VisitWatch(query, callback, interval=interval, jitter=jitter, notify_initial=notify_initial)
+        self._schedule(watch, 0)
+        return watch
+
+    def unwatch(self, watch: VisitWatch):
+        """Stops watching given query."""
+        watch.active = False
+        with self._condition:
+            self._queue = [entry for entry in self._queue if entry[2] is not watch]
+            self._queue.sort()
+
+    def start(self):
+        """Starts polling in the background."""
+        with self._condition:
+            if self._running:
+                return
+            self._running = True
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers)
+        self._thread = Thread(target=self._run, name='VisitWatcher', daemon=True)
+        self._thread.start()
+
+    def stop(self, wait: bool = True):
+        """Stops polling.
+
+        Args:
+            wait (bool, optional): Whether to wait for the polls in progress to finish. Defaults to true.
+        """
+        with self._condition:
+            self._running = False
+            self._condition.notify()
+        if self._thread is not None:
+            self._thread.join()
+            self._executor.shutdown(wait=wait)
+            self._thread = self._executor = None
@@ -30,7 +30,12 @@ setup(
     keywords='luxmed api client',
     license='MIT',
     url='https://github.com/przemal/luxmed',
-    packages=find_packages(exclude=['tests']),
-    python_requires='>=3.6',
+    packages=find_packages(exclude=['benchmarks', 'tests']),
+    python_requires='>=3.7',
     install_requires=install_requires,
+    extras_require={
+        'async': ['aiohttp>=3.6.0'],
+        'keyring': ['keyring>=19.0.0'],
+        'numpy': ['numpy>=1.16.0'],
+        'orjson': ['orjson>=3.0.0']},
     tests_require=tests_require)
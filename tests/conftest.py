@@ -17,6 +17,8 @@ import pytest
 from vcr import VCR
 from vcr.filters import replace_post_data_parameters
 
+from benchmarks.server import FakeLuxMedData
+from benchmarks.server import FakeLuxMedServer
 from luxmed.transport import LuxMedTransport
 from luxmed.urls import VISIT_RESERVE_TEMPORARY_URL
 from luxmed.urls import VISIT_RESERVE_URL
@@ -141,7 +143,7 @@ def filter_request(request):
     if request.method == 'POST' and request.body:
         try:
             data = json.loads(request.body)
-        except json.JSONDecodeError:
+        except (json.JSONDecodeError, TypeError):  # TypeError is raised for the non-serialized aiohttp data
             pass
         else:
             if (request.uri.startswith(VISIT_RESERVE_TEMPORARY_URL)
@@ -167,6 +169,8 @@ def filter_response(response):
         data = json.loads(response['body']['string'])
     except json.JSONDecodeError:
         return response
+    if not isinstance(data, dict):
+        return response
 
     for key in FIELD_MASK:
         if key in data:
@@ -311,3 +315,17 @@ def authenticated_transport(app_uuid, client_uuid, credentials, record_mode, vcr
             use_cassette('authenticated.yaml', **vcr_config):
         transport.authenticate()
     yield transport
+
+
+@pytest.fixture(scope='session')
+def fake_server():
+    with FakeLuxMedServer(data=FakeLuxMedData(terms_per_day=10, examination_results=5)) as server:
+        yield server
+
+
+@pytest.fixture(scope='session')
+def truncating_server():
+    """Drops the connection in the middle of the longer responses (e.g. available terms or documents)."""
+    with FakeLuxMedServer(data=FakeLuxMedData(terms_per_day=10, examination_results=5),
+                          truncate_after=16 * 1024) as server:
+        yield server
@@ -0,0 +1,90 @@
+import asyncio
+
+import pytest
+
+from luxmed.decoding import stdlib_loads
+from luxmed.errors import LuxMedAuthenticationError
+
+pytest.importorskip('aiohttp')
+
+from luxmed.aio import AsyncLuxMed  # noqa: E402
+from luxmed.aio import AsyncLuxMedTransport  # noqa: E402
+
+
+def run(coroutine_function, **kwargs):
+    async def run_and_close(luxmed_):
+        try:
+            return await coroutine_function(luxmed_)
+        finally:
+            await luxmed_.close()
+    return asyncio.run(run_and_close(AsyncLuxMed(
+        user_name='user', password='password',
+        app_uuid='3a0cab8a-84f2-4fce-aff3-ddd623e0c4f4', client_uuid='aeb7c10a-ae52-4593-86b2-195df87f4081',
+        **kwargs)))
+
+
+async def first(iterator):
+    async for item in iterator:
+        return item
+    raise StopAsyncIteration
+
+
+@pytest.mark.vcr('authenticated.yaml', 'cities_languages.yaml')
+def test_warsaw_city(today):
+    async def cities(luxmed):
+        return await luxmed.cities(from_date=today)
+    assert run(cities)[1] == 'Warszawa'
+
+
+@pytest.mark.vcr('authenticated.yaml', 'cities_languages.yaml')
+def test_json_decoder(today):
+    decoded = []
+
+    def loads(content):
+        decoded.append(content)
+        return stdlib_loads(content)
+
+    async def cities(luxmed):
+        return await luxmed.cities(from_date=today)
+    assert run(cities, json_decoder=loads)[1] == 'Warszawa'
+    assert len(decoded) == 2  # access token and filters
+
+
+@pytest.mark.vcr('authenticated.yaml', 'examination_results.yaml')
+def test_examination_results(today, year_ago):
+    async def results(luxmed):
+        return await first(luxmed.examination.results(from_date=year_ago, to_date=today))
+    assert 'MedicalExaminationId' in run(results)
+
+
+@pytest.mark.vcr('authenticated.yaml', 'warsaw_internist_visits.yaml')
+def test_find_warsaw_internist_visits(today, next_week, payer_id):
+    async def find(luxmed):
+        return await first(luxmed.visits.find(
+            city_id=1, service_id=4502, language_id=10,
+            payer_id=payer_id, from_date=today, to_date=next_week))
+    assert run(find)['ServiceId'] == 4502
+
+
+@pytest.mark.vcr('authenticated.yaml', 'warsaw_internist_visit_reserve.yaml')
+def test_warsaw_internist_visit_reserve(payer_details):
+    service_id = 4502
+    payer = payer_details.copy()
+    payer['ServaId'] = service_id
+
+    async def reserve(luxmed):
+        return await luxmed.visits.reserve(
+            clinic_id=1, doctor_id=10200, room_id=303, service_id=service_id,
+            start_date_time='2019-08-22T09:00:00+02:00', payer_data=payer)
+    assert 'ReservedVisitsLimitInfo' in run(reserve)
+
+
+@pytest.mark.vcr('unauthenticated.yaml')
+def test_failed_authentication(app_uuid, client_uuid):
+    async def authenticate():
+        async with AsyncLuxMedTransport(
+                user_name='user', password='badpassword',
+                app_uuid=app_uuid, client_uuid=client_uuid) as transport:
+            await transport.authenticate()
+    with pytest.raises(LuxMedAuthenticationError):
+        asyncio.run(authenticate())
@@ -0,0 +1,39 @@
+import pytest
+
+from benchmarks.history import regressions
+from benchmarks.load import run
+from benchmarks.server import DOCUMENT_SIZE
+from benchmarks.suite import BENCHMARKS
+from luxmed import LuxMed
+from luxmed.errors import LuxMedAuthenticationError
+
+
+@pytest.mark.parametrize('name', sorted(BENCHMARKS))
+def test_benchmark_runs(name):
+    BENCHMARKS[name]()()
+
+
+def test_regressions():
+    runs = [{'results': {'a': 1., 'b': 1.}}, {'results': {'a': 1.1}}, {'results': {'a': 0.9, 'b': 1.}}]
+    assert [regression.name for regression in regressions(runs, {'a': 1.1, 'b': 1.3, 'c': 5.})] == ['b']
+    assert regressions(runs, {'a': 1.1, 'b': 1.3}, tolerance=0.5) == []
+
+
+def test_fake_server_client_round_trip(fake_server, tmp_path):
+    luxmed = LuxMed(user_name='user', password='password', base_url=fake_server.base_url)
+    assert luxmed.cities()[1] == 'City 1'
+    term = next(luxmed.visits.find(city_id=1, service_id=4500, language_id=10, payer_id=10101, compact=True))
+    assert 'ReservedVisitsLimitInfo' in luxmed.visits.reserve(
+        payer_data=term.payer_details[0], **term.reservation_args())
+    result = next(luxmed.examination.results())
+    assert result.download(tmp_path / result.file_name) == DOCUMENT_SIZE
+
+
+def test_fake_server_failed_authentication(fake_server):
+    with pytest.raises(LuxMedAuthenticationError):
+        LuxMed(user_name='user', password='bad', base_url=fake_server.base_url).user()
+
+
+def test_load_run(fake_server):
+    result = run(fake_server.base_url, workers=2, operations=10)
+    assert sum(stats.count for stats in result['operations'].values()) == 10
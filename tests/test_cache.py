@@ -0,0 +1,81 @@
+from threading import Event
+from threading import Thread
+from time import sleep
+
+import pytest
+
+from luxmed.cache import TTLCache
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return Clock()
+
+
+def test_cached(clock):
+    cache = TTLCache(ttl=10, timer=clock)
+    assert cache.get('key', lambda: 1) == 1
+    assert cache.get('key', lambda: 2) == 1
+
+
+def test_expired(clock):
+    cache = TTLCache(ttl=10, timer=clock)
+    cache.get('key', lambda: 1)
+    clock.now = 10
+    assert 'key' not in cache
+    assert cache.get('key', lambda: 2) == 2
+
+
+def test_least_recently_used_evicted(clock):
+    cache = TTLCache(max_size=2, timer=clock)
+    cache.get('first', lambda: 1)
+    cache.get('second', lambda: 2)
+    cache.get('first', lambda: 1)
+    cache.get('third', lambda: 3)
+    assert 'first' in cache
+    assert 'second' not in cache
+
+
+def test_failed_load_not_cached():
+    cache = TTLCache()
+    with pytest.raises(ValueError):
+        cache.get('key', lambda: int('x'))
+    assert cache.get('key', lambda: 1) == 1
+
+
+def test_concurrent_loads_coalesced():
+    cache = TTLCache()
+    started = Event()
+    release = Event()
+    loads = []
+    results = []
+
+    def load():
+        loads.append(1)
+        started.set()
+        release.wait()
+        return 'value'
+
+    def get():
+        results.append(cache.get('key', load))
+
+    leader = Thread(target=get)
+    leader.start()
+    started.wait()
+    followers = [Thread(target=get) for _ in range(3)]
+    for thread in followers:
+        thread.start()
+    sleep(0.05)  # let the followers queue up behind the leader
+    release.set()
+    for thread in [leader] + followers:
+        thread.join()
+    assert loads == [1]
+    assert results == ['value'] * 4
@@ -0,0 +1,64 @@
+import pytest
+
+from luxmed.catalog import LuxMedCatalog
+
+
+class FakeLuxMed:
+    """Serves visit filters from a static city -> clinics -> services -> doctors graph."""
+
+    def __init__(self):
+        self.graph = {1: {10: {100: {1000: 'HANNA', 1001: 'JAN'}, 101: {1000: 'HANNA'}}, 11: {100: {1002: 'ADAM'}}}}
+        self.doctors_calls = []
+
+    def cities(self):
+        return {1: 'Warszawa'}
+
+    def clinics(self, city_id):
+        return {clinic_id: f'Clinic {clinic_id}' for clinic_id in self.graph[city_id]}
+
+    def services(self, city_id, clinic_id):
+        return {service_id: f'Service {service_id}' for service_id in self.graph[city_id][clinic_id]}
+
+    def doctors(self, city_id, service_id, clinic_id):
+        self.doctors_calls.append((city_id, service_id, clinic_id))
+        return self.graph[city_id][clinic_id][service_id]
+
+
+@pytest.fixture
+def luxmed():
+    return FakeLuxMed()
+
+
+@pytest.fixture
+def catalog(luxmed, tmp_path):
+    catalog_ = LuxMedCatalog(luxmed, tmp_path / 'catalog.json.gz')
+    catalog_.refresh()
+    return catalog_
+
+
+def test_lookups(catalog):
+    assert catalog.cities() == {1: 'Warszawa'}
+    assert catalog.clinics(1) == {10: 'Clinic 10', 11: 'Clinic 11'}
+    assert set(catalog.services(1, clinic_id=10)) == {100, 101}
+    assert catalog.doctors(1, 100) == {1000: 'HANNA', 1001: 'JAN', 1002: 'ADAM'}
+    assert catalog.find('doctors', 'hanna') == 1000
+
+
+def test_loaded_from_file(catalog, tmp_path):
+    loaded = LuxMedCatalog(path=tmp_path / 'catalog.json.gz')
+    assert loaded.graph == catalog.graph
+    assert loaded.doctors(1, 100, clinic_id=11) == {1002: 'ADAM'}
+
+
+def test_incremental_refresh(catalog, luxmed):
+    luxmed.graph[1][11][102] = {1003: 'EWA'}
+    luxmed.doctors_calls.clear()
+    assert catalog.refresh() == {(1, 11)}
+    assert {clinic_id for _, _, clinic_id in luxmed.doctors_calls} == {11}
+    assert catalog.doctors(1, 102) == {1003: 'EWA'}
+
+
+def test_fresh_city_skipped(catalog, luxmed):
+    luxmed.doctors_calls.clear()
+    assert catalog.refresh(max_age=3600) == set()
+    assert luxmed.doctors_calls == []
@@ -0,0 +1,22 @@
+import pytest
+
+np = pytest.importorskip('numpy')
+
+from luxmed.columns import visits_to_arrays  # noqa: E402
+from tests.test_models import VISIT  # noqa: E402
+
+
+def test_visits_to_arrays():
+    other = dict(VISIT, ServiceId=4387, Clinic={'Id': 2, 'Name': 'LX Kraków'}, VisitDate={
+        'StartDateTime': '2019-12-22T10:00:00+01:00', 'EndDateTime': '2019-12-22T10:15:00+01:00'})
+    columns = visits_to_arrays([VISIT, other, VISIT])
+    assert columns['start'].dtype == np.dtype('datetime64[s]')
+    assert columns['start'][1] == np.datetime64('2019-12-22T10:00:00')
+    assert list(columns['utc_offset']) == [120, 60, 120]
+    assert list(columns['service_id']) == [4502, 4387, 4502]
+    assert list(columns['clinic_name_categories'][columns['clinic_name']]) == [
+        'LX Warszawa', 'LX Kraków', 'LX Warszawa']
+
+
+def test_no_visits():
+    assert len(visits_to_arrays([])['start']) == 0
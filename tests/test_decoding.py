@@ -0,0 +1,47 @@
+import json
+
+import pytest
+from requests import Response
+
+from luxmed.decoding import resolve_decoder
+from luxmed.decoding import stdlib_loads
+from luxmed.errors import LuxMedAuthenticationError
+from luxmed.errors import LuxMedError
+from luxmed.transport import LuxMedTransport
+
+
+def test_resolve_decoder():
+    assert resolve_decoder('json') is stdlib_loads
+    assert resolve_decoder(json.loads) is json.loads
+    assert resolve_decoder('auto')('{"Id": "Łódź"}'.encode()) == {'Id': 'Łódź'}
+    with pytest.raises(ValueError):
+        resolve_decoder('yaml')
+
+
+@pytest.mark.parametrize('decoder', ['json', 'orjson'])
+def test_error_decoded(decoder):
+    loads = resolve_decoder(decoder) if decoder == 'json' else pytest.importorskip('orjson').loads
+    response = Response()
+    response._content = b'{"Errors": [{"ErrorCode": 2, "Message": "Invalid login or password."}]}'
+    assert isinstance(LuxMedError.from_response(response, loads), LuxMedAuthenticationError)
+    response._content = b'<html>'
+    with pytest.raises(LuxMedError, match='JSON data missing'):
+        raise LuxMedError.from_response(response, loads)
+
+
+def test_error_without_errors_listed():
+    response = Response()
+    response.status_code = 401
+    response._content = b'{"Message": "Authorization has been denied for this request."}'
+    error = LuxMedError.from_response(response)
+    assert type(error) is LuxMedError and str(error) == 'Authorization has been denied for this request (HTTP 401)'
+    assert str(LuxMedError.from_data({'error': 'invalid_grant'}, 400)) == 'invalid_grant (HTTP 400)'
+    assert str(LuxMedError.from_data([])) == 'Request failed'
+
+
+@pytest.mark.vcr('unauthenticated.yaml')
+def test_failed_authentication_stdlib_decoder(app_uuid, client_uuid):
+    with pytest.raises(LuxMedAuthenticationError):
+        LuxMedTransport(
+            user_name='user', password='badpassword', app_uuid=app_uuid, client_uuid=client_uuid,
+            json_decoder='json').authenticate()
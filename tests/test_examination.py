@@ -1,6 +1,13 @@
+from io import BytesIO
+
 import pytest
 
+from benchmarks.server import DOCUMENT_SIZE
+from luxmed.download import safe_file_name
+from luxmed.errors import LuxMedConnectionError
 from luxmed.examination import LuxMedExamination
+from luxmed.examination import LuxMedExaminationResult
+from luxmed.transport import LuxMedTransport
 
 
 @pytest.fixture(scope='module')
@@ -16,3 +23,85 @@ def test_examination_results(examination, today, year_ago):
 @pytest.mark.vcr('examination_results.yaml')
 def test_examination_result_action_wrapper(examination, today, year_ago):
     assert hasattr(next(examination.results(from_date=year_ago, to_date=today)), 'details')
+
+
+@pytest.mark.vcr('examination_results.yaml')
+def test_examination_results_compact(examination, today, year_ago):
+    result = next(examination.results(from_date=year_ago, to_date=today, compact=True))
+    assert result['MedicalExaminationId'] == result.id
+    assert result.date.year == 2012
+    assert hasattr(result, 'details')
+
+
+@pytest.fixture
+def document_result(authenticated_transport):
+    return LuxMedExaminationResult({
+        'MedicalExaminationId': '10100',
+        'DownloadLinks': [{
+            'FileName': 'medical_examination_10100.pdf',
+            'Rel': 'examination-result-document',
+            'Href': '/PatientPortalMobileAPI/api/medical-examinations-results/internal/10100/document'}]},
+        authenticated_transport)
+
+
+@pytest.mark.vcr('examination_result_documents.yaml')
+def test_examination_result_download_into_file(document_result):
+    file = BytesIO()
+    document_result.download(file)
+    assert file.getvalue() == b'%PDF-1.4 examination 10100 %%EOF'
+
+
+@pytest.mark.vcr('examination_result_document_resumed.yaml')
+def test_examination_result_download_resumed(document_result, tmp_path):
+    path = tmp_path / document_result.file_name
+    path.with_name(path.name + '.part').write_bytes(b'%PDF-1.4 ')
+    assert document_result.download(path) == 23
+    assert path.read_bytes() == b'%PDF-1.4 examination 10100 %%EOF'
+
+
+@pytest.fixture
+def fake_document_result(fake_server):
+    transport = LuxMedTransport(user_name='user', password='password', base_url=fake_server.base_url)
+    return next(LuxMedExamination(transport).results())
+
+
+def test_examination_result_download_complete_part(fake_document_result, tmp_path):
+    path = tmp_path / fake_document_result.file_name
+    part = fake_document_result.document()
+    path.with_name(path.name + '.part').write_bytes(part)
+    assert fake_document_result.download(path) == 0
+    assert path.read_bytes() == part
+
+
+def test_examination_result_download_oversized_part(fake_document_result, tmp_path):
+    path = tmp_path / fake_document_result.file_name
+    path.with_name(path.name + '.part').write_bytes(b'x' * (DOCUMENT_SIZE + 1))
+    assert fake_document_result.download(path) == DOCUMENT_SIZE
+    assert path.read_bytes() == fake_document_result.document()
+
+
+def test_examination_download_all_connection_dropped(truncating_server, tmp_path):
+    transport = LuxMedTransport(user_name='user', password='password', base_url=truncating_server.base_url)
+    downloaded = list(LuxMedExamination(transport).download_all(tmp_path))
+    assert len(downloaded) == 5
+    assert all(isinstance(error, LuxMedConnectionError) for _, error in downloaded)
+    assert not list(tmp_path.glob('*.pdf'))
+
+
+def test_examination_result_without_documents():
+    assert LuxMedExaminationResult({'MedicalExaminationId': '10100'}, None).document_link is None
+
+
+def test_safe_file_name():
+    assert safe_file_name('../../etc/passwd', '1.pdf') == 'passwd'
+    assert safe_file_name('..\\result.pdf', '1.pdf') == 'result.pdf'
+    assert safe_file_name('..', '1.pdf') == safe_file_name(None, '1.pdf') == '1.pdf'
+
+
+@pytest.mark.vcr('examination_results.yaml', 'examination_result_documents.yaml')
+def test_examination_download_all(examination, today, year_ago, tmp_path):
+    (tmp_path / 'medical_examination_10101.pdf').write_bytes(b'already downloaded')
+    downloaded = list(examination.download_all(tmp_path, from_date=year_ago, to_date=today, max_workers=1))
+    assert sorted(path.name for _, path in downloaded) == [
+        'medical_examination_10100.pdf', 'medical_examination_10101.pdf']
+    assert (tmp_path / 'medical_examination_10101.pdf').read_bytes() == b'already downloaded'
@@ -0,0 +1,74 @@
+import os
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+
+from luxmed import fleet as fleet_module
+from luxmed.errors import LuxMedAuthenticationError
+from luxmed.fleet import LuxMedFleet
+from luxmed.tokens import FileTokenCache
+from luxmed.visits import VisitQuery
+
+
+def test_find(fake_server, tmp_path):
+    queries = [VisitQuery(city_id=city_id, service_id=4500, language_id=10, payer_id=10101) for city_id in (1, 2, 3)]
+    with LuxMedFleet(processes=2, rate=1, burst=100, state_directory=tmp_path, batch_size=2) as fleet:
+        for user_name in ('user1', 'user2'):
+            fleet.add(user_name, 'password', base_url=fake_server.base_url)
+        fleet.add('bad', 'bad', base_url=fake_server.base_url)
+        results = list(fleet.find([(user_name, query) for user_name in ('user1', 'user2') for query in queries]
+                                  + [('bad', queries[0])]))
+        # second run reuses the clients already handed off to the processes
+        assert len(list(fleet.find([('user1', queries[0])]))) == 1
+
+    assert len(results) == 7
+    for user_name, query, visits in results:
+        if user_name == 'bad':
+            assert isinstance(visits, LuxMedAuthenticationError) and visits.code == 2
+        else:
+            assert visits and all(visit['ServiceId'] == 4500 for visit in visits)
+    token_cache = FileTokenCache(tmp_path / 'tokens.json')
+    assert token_cache.load('user1') and token_cache.load('user2')
+    assert fleet.budget.delay(100) > 0
+
+
+def test_unknown_account():
+    with LuxMedFleet(processes=1) as fleet:
+        with pytest.raises(KeyError):
+            list(fleet.find([('nobody', {'city_id': 1, 'service_id': 4500, 'language_id': 10, 'payer_id': 10101})]))
+
+
+def divide(luxmed, argument):
+    return 1 / argument
+
+
+def exit_worker(luxmed, argument):
+    os._exit(1)
+
+
+def clients(luxmed, argument):
+    return sorted(fleet_module._clients)
+
+
+def test_failed_jobs():
+    with LuxMedFleet(processes=1) as fleet:
+        fleet.add('user1', 'password')
+        fleet.add('user2', 'password')
+        results = {argument: result for _, argument, result in fleet.map(divide, [('user1', 0), ('user2', 2)])}
+        assert isinstance(results[0], ZeroDivisionError) and results[2] == .5
+
+        results = list(fleet.map(exit_worker, [('user1', None)]))
+        assert len(results) == 1 and isinstance(results[0][2], BrokenProcessPool)
+        # replaced process gets the clients handed off again
+        results = {user_name: result for user_name, _, result in fleet.map(clients, [('user1', None), ('user2', None)])}
+        assert results['user1'] == ['user1'] or results['user2'] == ['user2']
+        assert ['user1', 'user2'] in results.values()
+
+
+def test_remove_evicts_client():
+    with LuxMedFleet(processes=1) as fleet:
+        fleet.add('user1', 'password')
+        fleet.add('user2', 'password')
+        list(fleet.map(clients, [('user1', None), ('user2', None)]))
+        fleet.remove('user2')
+        assert list(fleet.map(clients, [('user1', None)])) == [('user1', None, ['user1'])]
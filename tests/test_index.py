@@ -0,0 +1,67 @@
+from datetime import date
+from datetime import datetime
+from datetime import time
+
+import pytest
+
+from benchmarks.server import FakeLuxMedData
+from luxmed.index import VisitIndex
+from luxmed.models import VisitTerm
+from luxmed.visits import available_terms
+from luxmed.visits import term_start
+
+
+@pytest.fixture(scope='module')
+def visits():
+    data = FakeLuxMedData(terms_per_day=20)
+    return list(available_terms(data.available_terms(1, 4500, date(2024, 3, 1), date(2024, 3, 21))))
+
+
+def test_matches_linear_scan(visits):
+    index = VisitIndex(visits)
+    clinic_ids = {visits[0]['Clinic']['Id'], visits[1]['Clinic']['Id']}
+
+    def matches(visit):
+        start = datetime.strptime(term_start(visit)[:19], '%Y-%m-%dT%H:%M:%S')
+        return start.time() >= time(16) and start.weekday() < 5 and visit['Clinic']['Id'] in clinic_ids \
+            and start >= datetime(2024, 3, 4)
+
+    expected = sorted(filter(matches, visits), key=lambda visit: (term_start(visit), visit['ScheduleId']))
+    assert expected
+    kwargs = dict(after=date(2024, 3, 4), from_time=time(16), weekdays=range(5), clinic_ids=clinic_ids)
+    assert list(index.find(**kwargs)) == expected
+    assert index.earliest(**kwargs) is expected[0]
+    assert index.first(3, **kwargs) == expected[:3]
+    assert list(index) == sorted(visits, key=lambda visit: (term_start(visit), visit['ScheduleId']))
+
+
+def test_attribute_filters(visits):
+    index = VisitIndex(VisitTerm.from_dict(visit) for visit in visits)
+    doctor_id = visits[0]['Doctor']['Id']
+    found = list(index.find(doctor_ids=[doctor_id], service_ids=[4500], payer_ids=[10101], before=date(2024, 3, 8)))
+    assert found and all(visit.doctor.id == doctor_id and visit.start_date_time < '2024-03-08' for visit in found)
+    assert list(index.find(service_ids=[4501])) == []
+    assert list(index.find(from_time=time(12), to_time=time(11))) == []
+
+
+def test_incremental_updates(visits):
+    index = VisitIndex()
+    assert index.update(visits[:10]) == 10
+    assert index.update(visits[5:15]) == 5
+    assert len(index) == 15
+    index.remove(visits[0])
+    assert visits[0] not in index
+    assert not index.discard(visits[0])
+    with pytest.raises(KeyError):
+        index.remove(visits[0])
+    assert index.earliest(doctor_ids=[visits[0]['Doctor']['Id']]) is not visits[0]
+    assert index.remove_before(date(2024, 3, 2)) == sum(term_start(visit) < '2024-03-02' for visit in visits[1:15])
+    assert len(index) == sum(term_start(visit) >= '2024-03-02' for visit in visits[1:15])
+    assert all(keys for index_ in index._attributes.values() for keys in index_.values())
+
+
+def test_invalid_weekdays(visits):
+    index = VisitIndex(visits)
+    for weekdays in ([], [7], [-1, 0]):
+        with pytest.raises(ValueError):
+            index.earliest(weekdays=weekdays)
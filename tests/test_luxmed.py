@@ -1,3 +1,6 @@
+import subprocess
+import sys
+
 import pytest
 
 from luxmed.luxmed import LuxMed
@@ -50,3 +53,17 @@ def test_user(credentials, luxmed):
 @pytest.mark.vcr('user_permissions.yaml')
 def test_user_permissions(luxmed):
     assert 'Visits' in luxmed.user_permissions()
+
+
+@pytest.mark.vcr('city_clinics_services.yaml')
+def test_city_filters_fetched_once(luxmed, today):
+    luxmed.filters_cache.clear()
+    luxmed.clinics(city_id=1, from_date=today)
+    assert len(luxmed.filters_cache) == 1
+    luxmed.services(city_id=1, from_date=today.isoformat())
+    assert len(luxmed.filters_cache) == 1
+
+
+def test_lazy_import():
+    code = 'import sys, luxmed; assert "requests" not in sys.modules; assert luxmed.LuxMed.__name__ == "LuxMed"'
+    subprocess.run([sys.executable, '-c', code], check=True)
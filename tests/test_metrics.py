@@ -0,0 +1,62 @@
+from time import time
+
+import pytest
+
+from luxmed.errors import LuxMedError
+from luxmed.metrics import MetricsRegistry
+from luxmed.metrics import endpoint_name
+from luxmed.tokens import LuxMedToken
+from luxmed.tokens import MemoryTokenCache
+from luxmed.transport import LuxMedTransport
+from luxmed.urls import BASE_URL
+from luxmed.urls import USER_URL
+
+
+def test_endpoint_name():
+    assert endpoint_name(USER_URL) == 'USER_URL'
+    assert endpoint_name(USER_URL + '/permissions?x=1') == 'USER_PERMISSIONS_URL'
+    assert endpoint_name(
+        BASE_URL + '/PatientPortalMobileAPI/api/medical-examinations-results/internal/10100') \
+        == 'EXAMINATION_RESULTS_URL'
+    assert endpoint_name('https://example.com/') == 'UNKNOWN'
+
+
+def test_prometheus_export():
+    registry = MetricsRegistry()
+    registry.request('USER_URL', 'GET', 200, 0.02, 0, 100)
+    registry.request('USER_URL', 'GET', 500, 20, 0, 0)
+    registry.error('USER_URL', 'GET', LuxMedError('Failed', code=7))
+    registry.auth('password')
+    text = registry.to_prometheus()
+    assert 'luxmed_requests_total{endpoint="USER_URL",method="GET",status="500"} 1\n' in text
+    assert 'luxmed_request_duration_seconds_bucket{endpoint="USER_URL",method="GET",le="0.025"} 1\n' in text
+    assert 'luxmed_request_duration_seconds_bucket{endpoint="USER_URL",method="GET",le="+Inf"} 2\n' in text
+    assert 'luxmed_response_bytes_total{endpoint="USER_URL",method="GET"} 100\n' in text
+    assert 'luxmed_errors_total{endpoint="USER_URL",method="GET",error="LuxMedError",code="7"} 1\n' in text
+    assert 'luxmed_auth_total{grant_type="password"} 1\n' in text
+
+
+@pytest.mark.vcr('user_expired_token.yaml')
+def test_transport_metrics(app_uuid, client_uuid):
+    cache = MemoryTokenCache()
+    cache.save('user', LuxMedToken(
+        access_token='0ld', token_type='bearer', expires_at=time() + 600,
+        refresh_token='9f7fe8cb-74f6-eeee-896c-615bfd7ee589'))
+    registry = MetricsRegistry()
+    transport = LuxMedTransport(
+        user_name='user', password='password', app_uuid=app_uuid, client_uuid=client_uuid, token_cache=cache,
+        metrics=registry)
+    transport.get(USER_URL)
+    assert registry.requests('USER_URL') == 2
+    assert registry.requests('TOKEN_URL', 'POST') == 1
+    assert registry.auths() == {'refresh_token': 1}
+    assert 'status="401"' in registry.to_prometheus()
+
+
+def test_failed_authentication_not_counted(fake_server):
+    registry = MetricsRegistry()
+    transport = LuxMedTransport(user_name='user', password='bad', base_url=fake_server.base_url, metrics=registry)
+    with pytest.raises(LuxMedError):
+        transport.authenticate()
+    assert registry.auths() == {}
+    assert registry.requests('TOKEN_URL', 'POST') == 1
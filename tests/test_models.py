@@ -0,0 +1,58 @@
+import pytest
+
+from luxmed.models import ExaminationResult
+from luxmed.models import VisitTerm
+
+
+VISIT = {
+    'ServiceId': 4502,
+    'Clinic': {'Id': 1, 'Name': 'LX Warszawa'},
+    'Doctor': {'Id': 1037, 'Name': 'HANNA'},
+    'Impediment': {'IsImpediment': False, 'ImpedimentText': ''},
+    'VisitDate': {
+        'StartDateTime': '2019-08-22T07:15:00+02:00',
+        'FormattedDate': '22nd August 2019, Thu. at 7:15',
+        'EndDateTime': '2019-08-22T07:30:00+02:00'},
+    'RoomId': 142,
+    'ScheduleId': 4825386,
+    'ReferralRequiredByService': False,
+    'PayerDetailsList': [{'PayerId': 10101}],
+    'TimeOfDay': 1,
+    'IsAdditional': False}
+
+
+@pytest.fixture
+def visit():
+    return VisitTerm.from_dict(VISIT)
+
+
+def test_visit_term_slotted(visit):
+    assert not hasattr(visit, '__dict__')
+
+
+def test_visit_term_mapping(visit):
+    expected = {key: value for key, value in VISIT.items() if key in VisitTerm.KEYS}
+    expected['VisitDate'] = {'StartDateTime': '2019-08-22T07:15:00+02:00', 'EndDateTime': '2019-08-22T07:30:00+02:00'}
+    assert dict(visit) == expected
+    with pytest.raises(KeyError):
+        visit['Impediment']
+
+
+def test_visit_term_dates(visit):
+    assert (visit.end - visit.start).seconds == 15 * 60
+
+
+def test_visit_term_reservation_args(visit):
+    assert visit.reservation_args()['start_date_time'] == '2019-08-22T07:15:00+02:00'
+
+
+def test_examination_result():
+    result = ExaminationResult.from_dict({
+        'MedicalExaminationId': '10100',
+        'ExaminationsNames': ['HCV Ab'],
+        'Date': {'DateTime': '2012-12-12T12:12:12+0000', 'FormattedDate': '12 Dec 2012'},
+        'DownloadLinks': [{'Rel': 'examination-result-document', 'Href': '/document'}],
+        'Links': [{'Rel': 'examination-result-details', 'Href': '/details'}]})
+    assert result['ExaminationsNames'] == ['HCV Ab']
+    assert result.date.day == 12
+    assert result.document_href == '/document'
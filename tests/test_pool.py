@@ -0,0 +1,39 @@
+import pytest
+
+from luxmed.pool import LuxMedPool
+from luxmed.urls import BASE_URL
+
+
+@pytest.fixture
+def pool():
+    with LuxMedPool(max_connections=2) as pool_:
+        pool_.add('first', 'password')
+        pool_.add('second', 'password', lang_code='pl')
+        yield pool_
+
+
+def test_shared_connection_pool(pool):
+    assert pool['first']._transport._session.get_adapter(BASE_URL) \
+        is pool['second']._transport._session.get_adapter(BASE_URL)
+
+
+def test_separate_sessions(pool):
+    pool['first']._transport._session.headers['Authorization'] = 'bearer XYZ'
+    assert 'Authorization' not in pool['second']._transport._session.headers
+    assert pool['second']._transport.lang_code == 'pl'
+
+
+def test_client_reused(pool):
+    assert pool['first'] is pool['first']
+
+
+def test_remove(pool):
+    pool.remove('first')
+    assert list(pool) == ['second']
+    with pytest.raises(KeyError):
+        pool['first']
+
+
+@pytest.mark.vcr('authenticated.yaml', 'user.yaml')
+def test_user(pool):
+    assert 'UserName' in pool['first'].user()
@@ -0,0 +1,115 @@
+from time import time
+
+import pytest
+from requests import Response
+from requests.adapters import HTTPAdapter
+from requests.exceptions import TooManyRedirects
+
+from luxmed.errors import LuxMedCircuitOpenError
+from luxmed.errors import LuxMedError
+from luxmed.resilience import CircuitBreaker
+from luxmed.resilience import RetryPolicy
+from luxmed.resilience import retry_after
+from luxmed.tokens import LuxMedToken
+from luxmed.tokens import MemoryTokenCache
+from luxmed.transport import LuxMedTransport
+from luxmed.urls import TOKEN_URL
+from luxmed.urls import USER_URL
+from luxmed.urls import VISIT_RESERVE_URL
+
+
+def response_with(**headers) -> Response:
+    response = Response()
+    response.headers.update(headers)
+    return response
+
+
+def test_retry_after():
+    assert retry_after(response_with()) is None
+    assert retry_after(response_with(**{'Retry-After': '2'})) == 2
+    assert retry_after(response_with(**{'Retry-After': 'Wed, 21 Oct 2015 07:28:00 GMT'})) == 0
+
+
+def test_retry_only_idempotent_requests():
+    retry = RetryPolicy()
+    assert retry.is_idempotent('GET', USER_URL)
+    assert retry.is_idempotent('POST', TOKEN_URL)
+    assert not retry.is_idempotent('POST', VISIT_RESERVE_URL)
+
+
+def test_retry_delay():
+    retry = RetryPolicy(max_retries=2, backoff=1, max_backoff=10)
+    assert 0 <= retry.delay(1) <= 2
+    assert retry.delay(0, response_with(**{'Retry-After': '5'})) == 5
+    assert retry.delay(0, response_with(**{'Retry-After': '60'})) is None
+    assert retry.delay(2) is None
+
+
+def test_circuit_breaker():
+    now = [0.]
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=10, timer=lambda: now[0])
+    breaker.record_failure()
+    breaker.before_request()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    with pytest.raises(LuxMedCircuitOpenError):
+        breaker.before_request()
+
+    now[0] = 10.
+    breaker.before_request()  # trial
+    with pytest.raises(LuxMedCircuitOpenError):
+        breaker.before_request()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+
+    now[0] = 20.
+    breaker.before_request()
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+@pytest.fixture
+def token_cache():
+    cache = MemoryTokenCache()
+    cache.save('user', LuxMedToken(access_token='t0k3n', token_type='bearer', expires_at=time() + 600))
+    return cache
+
+
+@pytest.mark.vcr('user_unavailable.yaml')
+def test_unavailable_retried(app_uuid, client_uuid, token_cache):
+    slept = []
+    transport = LuxMedTransport(
+        user_name='user', password='password', app_uuid=app_uuid, client_uuid=client_uuid, token_cache=token_cache,
+        retry=RetryPolicy(sleeper=slept.append))
+    assert transport.get(USER_URL)['UserName'] == 'user'
+    assert slept == [0]
+
+
+@pytest.mark.vcr('user_unavailable.yaml')
+def test_unavailable_opens_circuit(app_uuid, client_uuid, token_cache):
+    transport = LuxMedTransport(
+        user_name='user', password='password', app_uuid=app_uuid, client_uuid=client_uuid, token_cache=token_cache,
+        retry=RetryPolicy(sleeper=lambda seconds: None), circuit_breaker=CircuitBreaker(failure_threshold=1))
+    with pytest.raises(LuxMedCircuitOpenError):
+        transport.get(USER_URL)
+
+
+class RedirectLoopAdapter(HTTPAdapter):
+    def send(self, request, **kwargs):
+        raise TooManyRedirects('Exceeded 30 redirects.')
+
+
+def test_request_failure_ends_circuit_trial(app_uuid, client_uuid, token_cache):
+    now = [0.]
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10, timer=lambda: now[0])
+    breaker.record_failure()
+    now[0] = 10.
+    transport = LuxMedTransport(
+        user_name='user', password='password', app_uuid=app_uuid, client_uuid=client_uuid, token_cache=token_cache,
+        adapter=RedirectLoopAdapter(), circuit_breaker=breaker)
+    with pytest.raises(LuxMedError):
+        transport.get(USER_URL)
+    assert breaker.state == CircuitBreaker.OPEN
+
+    now[0] = 20.
+    breaker.before_request()  # next trial, rather than waiting for the failed one forever
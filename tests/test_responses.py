@@ -0,0 +1,62 @@
+from time import time
+
+import pytest
+
+from luxmed.responses import CachedResponse
+from luxmed.responses import DiskResponseCacheBackend
+from luxmed.responses import ResponseCache
+from luxmed.tokens import LuxMedToken
+from luxmed.tokens import MemoryTokenCache
+from luxmed.transport import LuxMedTransport
+from luxmed.urls import USER_URL
+from luxmed.urls import VISIT_RESERVE_URL
+
+
+@pytest.fixture
+def transport(app_uuid, client_uuid):
+    cache = MemoryTokenCache()
+    cache.save('user', LuxMedToken(access_token='t0k3n', token_type='bearer', expires_at=time() + 600))
+    return LuxMedTransport(
+        user_name='user', password='password', app_uuid=app_uuid, client_uuid=client_uuid, token_cache=cache,
+        response_cache=ResponseCache())
+
+
+def test_cacheable():
+    cache = ResponseCache()
+    assert cache.cacheable('GET', USER_URL)
+    assert not cache.cacheable('POST', USER_URL)
+    assert not cache.cacheable('GET', VISIT_RESERVE_URL)
+    assert cache.key('user', 'en', USER_URL, [('a', 1)]) != cache.key('user', 'pl', USER_URL, [('a', 1)])
+
+
+@pytest.mark.vcr('user_etag.yaml')
+def test_response_revalidated(transport):
+    assert transport.get(USER_URL)['UserName'] == 'user'
+    assert transport.get(USER_URL)['UserName'] == 'user'
+    assert transport.response_cache.stats() == {'hits': 0, 'revalidated': 1, 'misses': 1}
+
+
+@pytest.mark.vcr('user.yaml')
+def test_response_reused_within_ttl(transport):
+    user = transport.get(USER_URL)
+    assert transport.get(USER_URL) == user  # cassette allows a single request only
+    assert transport.response_cache.stats() == {'hits': 1, 'revalidated': 0, 'misses': 1}
+
+
+def test_response_expired():
+    now = [0.]
+    cache = ResponseCache(ttl=10, timer=lambda: now[0])
+    cache.store('key', b'{}', {'Content-Type': 'application/json'})
+    assert cache.lookup('key')[1]
+    now[0] = 10.
+    assert cache.lookup('key') == (None, False)
+
+
+def test_disk_backend(tmp_path):
+    backend = DiskResponseCacheBackend(tmp_path)
+    response = CachedResponse(b'{"a": 1}\n', 'application/json', '"1"', None, 1.)
+    assert backend.get('key') is None
+    backend.set('key', response)
+    assert DiskResponseCacheBackend(tmp_path).get('key') == response
+    backend.clear()
+    assert backend.get('key') is None
@@ -0,0 +1,45 @@
+from datetime import date
+
+import pytest
+
+from luxmed.examination import LuxMedExamination
+from luxmed.store import LuxMedExaminationStore
+
+
+@pytest.fixture
+def store():
+    with LuxMedExaminationStore() as store:
+        yield store
+
+
+@pytest.fixture(scope='module')
+def examination(authenticated_transport):
+    return LuxMedExamination(authenticated_transport)
+
+
+@pytest.mark.vcr('examination_results.yaml', 'examination_result_details.yaml')
+def test_store_sync(store, examination, today, year_ago):
+    assert store.synced_until('john') is None
+    assert store.sync(examination, 'john', since=year_ago, to_date=today) == 2
+    assert store.synced_until('john') == today
+    assert [result['MedicalExaminationId'] for result in store.results('john')] == ['10100', '10101']
+    assert store.details('john', '10101')['Examinations'][0]['Name'] == 'HCV Ab'
+
+
+@pytest.mark.vcr('examination_results.yaml', allow_playback_repeats=True)
+def test_store_sync_known_results(store, examination, today, year_ago):
+    store.sync(examination, 'john', since=year_ago, to_date=today, details=False)
+    store._connection.execute("UPDATE examination_sync SET synced_until = '2018-08-29'")
+    # overlapping window, nothing new and no details fetched
+    assert store.sync(examination, 'john', to_date=today, details=False) == 0
+    assert store.details('john', '10100') is None
+
+
+@pytest.mark.vcr('examination_results.yaml')
+def test_store_results_query(store, examination, today, year_ago):
+    store.sync(examination, 'john', since=year_ago, to_date=today, details=False)
+    assert store.results('jane') == []
+    assert len(store.results('john', from_date=date(2012, 12, 12), to_date=date(2012, 12, 12))) == 2
+    assert store.results('john', from_date=date(2012, 12, 13)) == []
+    assert [result['MedicalExaminationId'] for result in store.results('john', name='HCV Ab / przeciwciała')] \
+        == ['10101']
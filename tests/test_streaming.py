@@ -0,0 +1,36 @@
+import json
+from json import JSONDecodeError
+
+import pytest
+
+from luxmed.streaming import iter_array_items
+
+
+DOCUMENT = json.dumps({
+    'Total': 3,
+    'Groups': [
+        {'Items': [{'Id': 1, 'Name': 'Zażółć'}, {'Id': 2, 'Name': '"Items": ['}], 'Count': 2},
+        {'Items': [], 'Count': 0},
+        {'Items': [{'Id': 3, 'Nested': {'Items': None}}]}]}, ensure_ascii=False).encode()
+
+
+def byte_chunks(data: bytes, size: int):
+    for start in range(0, len(data), size):
+        yield data[start:start + size]
+
+
+@pytest.mark.parametrize('chunk_size', [1, 7, len(DOCUMENT)])
+def test_items_decoded(chunk_size):
+    assert [item['Id'] for item in iter_array_items(byte_chunks(DOCUMENT, chunk_size), 'Items')] == [1, 2, 3]
+
+
+def test_items_yielded_before_document_ends():
+    def chunks():
+        yield DOCUMENT[:DOCUMENT.index(b'}') + 1]
+        raise AssertionError('Item should have been yielded already.')
+    assert next(iter_array_items(chunks(), 'Items')) == {'Id': 1, 'Name': 'Zażółć'}
+
+
+def test_truncated_document():
+    with pytest.raises(JSONDecodeError):
+        list(iter_array_items([DOCUMENT[:DOCUMENT.index('Zażółć'.encode())]], 'Items'))
@@ -0,0 +1,64 @@
+import multiprocessing
+
+import pytest
+
+from luxmed.throttling import SharedTokenBucket
+from luxmed.throttling import TokenBucket
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.
+        self.slept = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.slept.append(seconds)
+        self.now += seconds
+
+
+def test_burst_then_refill():
+    clock = Clock()
+    bucket = TokenBucket(rate=2, capacity=2, timer=clock, sleeper=clock.sleep)
+    assert bucket.try_acquire()
+    assert bucket.try_acquire()
+    assert not bucket.try_acquire()
+    assert bucket.delay() == 0.5
+    clock.now += 0.5
+    assert bucket.try_acquire()
+
+
+def test_acquire_waits_in_order():
+    clock = Clock()
+    bucket = TokenBucket(rate=1, timer=clock, sleeper=clock.sleep)
+    assert bucket.acquire()
+    assert bucket.acquire()
+    assert not bucket.acquire(timeout=0.5)
+    assert clock.slept == [1.]
+
+
+def test_rate_below_one():
+    clock = Clock()
+    bucket = TokenBucket(rate=0.5, timer=clock, sleeper=clock.sleep)
+    assert bucket.capacity == 1
+    assert bucket.try_acquire()
+    assert bucket.delay() == 2
+    clock.now += 2
+    assert bucket.try_acquire()
+    with pytest.raises(ValueError):
+        TokenBucket(rate=0.5, capacity=0.5)
+
+
+def _take(bucket):
+    bucket.try_acquire(3)
+
+
+def test_shared_between_processes():
+    bucket = SharedTokenBucket(rate=0.001, capacity=5)
+    process = multiprocessing.Process(target=_take, args=(bucket,))
+    process.start()
+    process.join()
+    assert bucket.try_acquire(2)
+    assert not bucket.try_acquire()
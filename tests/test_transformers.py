@@ -0,0 +1,24 @@
+from datetime import date
+
+from inflection import camelize
+
+from luxmed.transformers import FILTER_NAMES
+from luxmed.transformers import filter_args
+from luxmed.visits import reservation_data
+
+
+def test_precomputed_filter_names():
+    for name, full_name in FILTER_NAMES.items():
+        assert full_name == 'filter.' + camelize(name)
+
+
+def test_filter_args():
+    assert list(filter_args(city_id=1, clinic_id=None, referral_type_id=3, from_date=date(2019, 8, 22))) == [
+        ('filter.CityId', 1), ('filter.ReferralTypeId', 3), ('filter.FromDate', date(2019, 8, 22))]
+
+
+def test_reservation_data_keys():
+    data = reservation_data(1, 2, 3, 4, '2019-08-22T09:00:00+02:00', payer_details=[])
+    assert list(data) == [
+        'ClinicId', 'DoctorId', 'RoomId', 'ServiceId', 'StartDateTime', 'IsAdditional', 'ReferralRequiredByService',
+        'PayerDetailsList']
@@ -1,7 +1,18 @@
+import pickle
+from concurrent.futures import ThreadPoolExecutor
+from threading import Barrier
+from time import time
+
 import pytest
 
 from luxmed.errors import LuxMedAuthenticationError
+from luxmed.metrics import MetricsRegistry
+from luxmed.tokens import FileTokenCache
+from luxmed.tokens import LuxMedToken
+from luxmed.tokens import MemoryTokenCache
 from luxmed.transport import LuxMedTransport
+from luxmed.urls import USER_URL
+from tests.conftest import FIELD_MASK
 
 
 def test_authentication(authenticated_transport):
@@ -16,3 +27,101 @@ def test_failed_authentication(app_uuid, client_uuid):
             password='badpassword',
             app_uuid=app_uuid,
             client_uuid=client_uuid).authenticate()
+
+
+@pytest.fixture
+def token():
+    return LuxMedToken(
+        access_token='0ld', token_type='bearer', expires_at=time() + 600,
+        refresh_token='9f7fe8cb-74f6-eeee-896c-615bfd7ee589')
+
+
+def test_token_from_response():
+    token = LuxMedToken.from_response({'access_token': 'abc', 'token_type': 'bearer', 'expires_in': 599}, now=1)
+    assert token.header == 'bearer abc'
+    assert token.expires_at == 600
+    assert token.expires_within(0)
+
+
+def test_cached_token_used(app_uuid, client_uuid, token):
+    cache = MemoryTokenCache()
+    cache.save('user', token)
+    transport = LuxMedTransport(
+        user_name='user', password='password', app_uuid=app_uuid, client_uuid=client_uuid, token_cache=cache)
+    assert transport._session.headers[transport.TOKEN_HEADER_NAME] == 'bearer 0ld'
+
+
+def test_pickled_keeps_token(app_uuid, client_uuid, token):
+    cache = MemoryTokenCache()
+    cache.save('user', token)
+    transport = pickle.loads(pickle.dumps(LuxMedTransport(
+        user_name='user', password='password', app_uuid=app_uuid, client_uuid=client_uuid, token_cache=cache)))
+    assert transport.token == token
+    assert transport._session.headers[transport.TOKEN_HEADER_NAME] == 'bearer 0ld'
+    assert transport._session.headers['x-api-client-identifier'] == 'Android'
+
+
+def test_file_token_cache(tmp_path, token):
+    cache = FileTokenCache(tmp_path / 'tokens.json')
+    assert cache.load('user') is None
+    cache.save('user', token)
+    assert FileTokenCache(tmp_path / 'tokens.json').load('user') == token
+    cache.delete('user')
+    assert cache.load('user') is None
+
+
+@pytest.mark.vcr('user_expired_token.yaml')
+def test_unauthorized_retried_with_refreshed_token(app_uuid, client_uuid, token):
+    cache = MemoryTokenCache()
+    cache.save('user', token)
+    transport = LuxMedTransport(
+        user_name='user', password='password', app_uuid=app_uuid, client_uuid=client_uuid, token_cache=cache)
+    assert transport.get(USER_URL)['UserName'] == 'user'
+    assert cache.load('user').access_token == FIELD_MASK['access_token']
+
+
+def test_rejected_refresh_token_falls_back_to_password(fake_server, token):
+    metrics = MetricsRegistry()
+    transport = LuxMedTransport(
+        user_name='user', password='password', base_url=fake_server.base_url, metrics=metrics)
+    transport.token = token._replace(expires_at=time(), refresh_token='revoked')
+    assert transport.get(USER_URL)['UserName'] == 'user'
+    assert metrics.auths() == {'password': 1}
+    assert transport.token.refresh_token != 'revoked'
+
+
+def _concurrent_requests(transport: LuxMedTransport, threads: int = 8) -> list:
+    barrier = Barrier(threads)
+
+    def request(_):
+        barrier.wait()
+        transport.get(USER_URL)
+        return transport._session
+
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        return list(executor.map(request, range(threads)))
+
+
+def test_thread_safe_single_authentication(fake_server):
+    metrics = MetricsRegistry()
+    transport = LuxMedTransport(
+        user_name='user', password='password', base_url=fake_server.base_url, metrics=metrics, thread_safe=True,
+        max_connections=8)
+    sessions = _concurrent_requests(transport)
+    assert metrics.auths() == {'password': 1}
+    assert len({id(session) for session in sessions}) == 8
+    assert len({id(session.get_adapter(fake_server.base_url)) for session in sessions}) == 1
+
+
+def test_thread_safe_single_refresh(fake_server, token):
+    cache = MemoryTokenCache()
+    cache.save('user', token._replace(expires_at=time() + 30))
+    metrics = MetricsRegistry()
+    transport = LuxMedTransport(
+        user_name='user', password='password', base_url=fake_server.base_url, metrics=metrics, thread_safe=True,
+        token_cache=cache, refresh_margin=60)
+    transport.token = cache.load('user')  # too close to the expiry to be picked up from the cache
+    sessions = _concurrent_requests(transport)
+    assert metrics.auths() == {'refresh_token': 1}
+    assert {session.headers[transport.TOKEN_HEADER_NAME] for session in sessions} == {transport.token.header}
+    assert cache.load('user') == transport.token
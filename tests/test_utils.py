@@ -0,0 +1,20 @@
+from datetime import date
+from time import sleep
+
+from luxmed.utils import date_windows
+from luxmed.utils import ordered_map
+
+
+def test_date_windows():
+    assert list(date_windows(date(2019, 8, 1), date(2019, 8, 5), days=2)) == [
+        (date(2019, 8, 1), date(2019, 8, 2)),
+        (date(2019, 8, 3), date(2019, 8, 4)),
+        (date(2019, 8, 5), date(2019, 8, 5))]
+
+
+def test_ordered_map():
+    def slow_for_first(item):
+        if item == 0:
+            sleep(0.05)
+        return item * 2
+    assert list(ordered_map(slow_for_first, range(10), max_workers=3)) == list(range(0, 20, 2))
@@ -1,6 +1,18 @@
+import json
+from datetime import date
+
 import pytest
 
+from luxmed.errors import LuxMedConnectionError
+from luxmed.errors import LuxMedError
+from luxmed.transport import LuxMedTransport
+from luxmed.urls import VISIT_RESERVE_TEMPORARY_URL
+from luxmed.urls import VISIT_TERMS_VALUATION_URL
+from luxmed.utils import date_windows
+from luxmed.visits import Evaluation
 from luxmed.visits import LuxMedVisits
+from luxmed.visits import VisitQuery
+from luxmed.visits import term_key
 
 
 @pytest.fixture(scope='module')
@@ -16,6 +28,19 @@ def test_find_warsaw_internist_visits(visits, today, next_week, payer_id):
     assert next(available)['ServiceId'] == 4502
 
 
+def test_find_deduplicates_without_sharding():
+    term = {'ScheduleId': 1, 'VisitDate': {'StartDateTime': '2019-08-22T09:00:00+02:00'}, 'ServiceId': 4502}
+
+    class Transport:
+        def get(self, url, **kwargs):
+            return {
+                'AgregateAvailableVisitTerms': [{'AvailableVisitsTermPresentation': [term]}],
+                'AgregateAvailableAdditionalVisitTerms': [{'AvailableVisitsTermPresentation': [term]}]}
+
+    available = LuxMedVisits(Transport()).find(city_id=1, service_id=4502, language_id=10, payer_id=123)
+    assert list(available) == [term]
+
+
 @pytest.mark.vcr('warsaw_internist_visits_none.yaml')
 def test_find_warsaw_internist_visits_none(visits, today, next_week, payer_id):
     available = visits.find(
@@ -40,3 +65,117 @@ def test_warsaw_internist_visit_reserve(visits, payer_details):
 @pytest.mark.vcr('visit_cancel.yaml')
 def test_visit_cancel(visits):
     visits.cancel(0)
+
+
+@pytest.fixture(scope='module')
+def fake_visits(fake_server):
+    return LuxMedVisits(LuxMedTransport(user_name='user', password='password', base_url=fake_server.base_url))
+
+
+def test_find_sharded_concurrently(fake_visits):
+    query = dict(city_id=1, service_id=4500, language_id=10, payer_id=10101,
+                 from_date=date(2024, 3, 1), to_date=date(2024, 3, 20))
+    sharded = [term_key(visit) for visit in fake_visits.find(shard_days=2, max_workers=4, **query)]
+    assert sharded == [term_key(visit) for visit in fake_visits.find(**query)]
+    assert sharded == sorted(sharded, key=lambda key: key[1])
+    assert len(set(sharded)) == len(sharded) == 20 * 10
+
+
+def test_find_streamed_connection_dropped(truncating_server):
+    visits = LuxMedVisits(LuxMedTransport(user_name='user', password='password', base_url=truncating_server.base_url))
+    with pytest.raises(LuxMedConnectionError):
+        list(visits.find(city_id=1, service_id=4500, language_id=10, payer_id=10101,
+                         from_date=date(2024, 3, 1), to_date=date(2024, 3, 7), stream=True))
+
+
+def test_find_many_concurrently(fake_visits):
+    queries = [VisitQuery(city_id=city_id, service_id=4500, language_id=10, payer_id=10101,
+                          from_date=date(2024, 3, 1), to_date=date(2024, 3, 2)) for city_id in range(1, 9)]
+    results = list(fake_visits.find_many(queries, max_workers=4))
+    assert len(results) == 8 * 2 * 10
+    for query in queries:
+        assert [term_key(visit) for query_, visit in results if query_ == query] == [
+            term_key(visit) for visit in fake_visits.find(**query._asdict())]
+
+
+def test_iter_history_windows(fake_visits):
+    history = list(fake_visits.iter_history(
+        from_date=date(2018, 1, 1), to_date=date(2023, 12, 31), window_days=180, max_workers=4))
+    assert [visit['Id'] for visit in history] == [
+        visit['Id'] for window in date_windows(date(2018, 1, 1), date(2023, 12, 31), 180)
+        for visit in fake_visits.history(*window)]
+    starts = [visit['VisitDate']['StartDateTime'] for visit in history]
+    assert len(starts) > 100 and starts == sorted(starts)
+
+
+@pytest.mark.vcr('warsaw_internist_visits.yaml', 'warsaw_unknown_service_visits.yaml')
+def test_find_many_warsaw_internist_visits(visits, today, next_week, payer_id):
+    query = VisitQuery(
+        city_id=1, service_id=4502, language_id=10, payer_id=payer_id, from_date=today, to_date=next_week)
+    failing = query._replace(service_id=1)
+    results = list(visits.find_many([query, failing._asdict()], max_workers=1))
+    assert {visit['ServiceId'] for query_, visit in results if query_ == query} == {4502}
+    assert [type(error) for query_, error in results if query_ == failing] == [LuxMedError]
+
+
+@pytest.mark.vcr('warsaw_internist_visit_reserve.yaml')
+def test_warsaw_internist_visit_reserve_prepared_without_evaluation(visits, payer_details):
+    service_id = 4502
+    payer = payer_details.copy()
+    payer['ServaId'] = service_id
+
+    prepared = visits.prepare_reservation(
+        clinic_id=1, doctor_id=10200, room_id=303, service_id=service_id,
+        start_date_time='2019-08-22T09:00:00+02:00', payer_data=payer)
+    result = visits.reserve_prepared(prepared, evaluation=Evaluation.SKIP)
+    assert 'ReservedVisitsLimitInfo' in result.details
+    assert set(result.timings) == {'temporary_reservation', 'reservation', 'total'}
+
+
+def test_reserve_prepared_concurrent_evaluation_failed(visits, payer_details, caplog):
+    class Transport:
+        def post(self, url, **kwargs):
+            if url == VISIT_TERMS_VALUATION_URL:
+                raise LuxMedError('Evaluation failed')
+            return {'Id': 5} if url == VISIT_RESERVE_TEMPORARY_URL else {'ReservedVisitsLimitInfo': {}}
+
+    prepared = visits.prepare_reservation(
+        clinic_id=1, doctor_id=10200, room_id=303, service_id=4502,
+        start_date_time='2019-08-22T09:00:00+02:00', payer_data=payer_details)
+    result = LuxMedVisits(Transport()).reserve_prepared(prepared, evaluation=Evaluation.CONCURRENT)
+    assert 'ReservedVisitsLimitInfo' in result.details
+    assert 'Evaluation failed' in caplog.text
+
+
+def test_prepared_reservation_data(visits, payer_details):
+    prepared = visits.prepare_reservation(
+        clinic_id=1, doctor_id=10200, room_id=303, service_id=4502,
+        start_date_time='2019-08-22T09:00:00+02:00', payer_data=payer_details)
+    assert json.loads(prepared.temporary)['PayerDetailsList'] == [payer_details]
+    assert json.loads(prepared.final_prefix + b'123}')['TemporaryReservationId'] == 123
+
+
+@pytest.mark.vcr('warsaw_internist_visits.yaml')
+def test_find_warsaw_internist_visits_streamed(visits, today, next_week, payer_id):
+    available = visits.find(
+        city_id=1, service_id=4502, language_id=10,
+        payer_id=payer_id, from_date=today, to_date=next_week, stream=True)
+    assert [visit['ServiceId'] for visit in available] == [4502] * 4
+
+
+@pytest.mark.vcr('warsaw_internist_visits.yaml')
+def test_find_warsaw_internist_visits_compact(visits, today, next_week, payer_id):
+    visit = next(visits.find(
+        city_id=1, service_id=4502, language_id=10,
+        payer_id=payer_id, from_date=today, to_date=next_week, compact=True))
+    assert visit['ServiceId'] == visit.service_id == 4502
+    assert visit.start.isoformat() == '2019-08-22T07:15:00+02:00'
+
+
+@pytest.mark.vcr('warsaw_internist_visits.yaml')
+def test_find_warsaw_internist_visits_columns(visits, today, next_week, payer_id):
+    pytest.importorskip('numpy')
+    columns = visits.find(
+        city_id=1, service_id=4502, language_id=10,
+        payer_id=payer_id, from_date=today, to_date=next_week).to_columns()
+    assert list(columns['service_id']) == [4502] * 4
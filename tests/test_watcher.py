@@ -0,0 +1,69 @@
+from queue import Queue
+from time import sleep
+
+from luxmed.errors import LuxMedError
+from luxmed.throttling import TokenBucket
+from luxmed.watcher import VisitWatcher
+
+
+def term(schedule_id, start='2019-08-22T07:15:00+02:00'):
+    return {'ScheduleId': schedule_id, 'VisitDate': {'StartDateTime': start}}
+
+
+class FakeVisits:
+    """Serves prepared search results, one per call."""
+
+    def __init__(self, *results):
+        self.results = list(results)
+        self.calls = 0
+
+    def find(self, **kwargs):
+        self.calls += 1
+        result = self.results.pop(0) if len(self.results) > 1 else self.results[0]
+        if isinstance(result, Exception):
+            raise result
+        return iter(result)
+
+
+QUERY = dict(city_id=1, service_id=4502, language_id=10, payer_id=10101)
+
+
+def test_only_new_terms_notified():
+    visits = FakeVisits([term(1)], [term(1), term(2)], [term(1), term(2)], [term(3)])
+    notified = Queue()
+    with VisitWatcher(visits) as watcher:
+        watcher.watch(QUERY, lambda query, new: notified.put([visit['ScheduleId'] for visit in new]), interval=0.01)
+        assert [notified.get(timeout=1) for _ in range(3)] == [[1], [2], [3]]
+    assert notified.empty()
+
+
+def test_initial_terms_not_notified():
+    visits = FakeVisits([term(1)], [term(1), term(2)])
+    notified = Queue()
+    with VisitWatcher(visits) as watcher:
+        watcher.watch(QUERY, lambda query, new: notified.put(new), interval=0.01, notify_initial=False)
+        assert notified.get(timeout=1) == [term(2)]
+
+
+def test_errors_reported():
+    errors = Queue()
+    with VisitWatcher(FakeVisits(LuxMedError('Failed')), on_error=lambda watch, error: errors.put(error)) as watcher:
+        watcher.watch(QUERY, lambda query, new: None, interval=0.01)
+        assert errors.get(timeout=1).message == 'Failed'
+
+
+def test_budget_respected():
+    visits = FakeVisits([term(1)])
+    with VisitWatcher(visits, budget=TokenBucket(rate=0.001, capacity=2)) as watcher:
+        for _ in range(3):
+            watcher.watch(QUERY, lambda query, new: None, interval=0.01)
+        sleep(0.1)
+    assert visits.calls == 2
+
+
+def test_unwatch():
+    visits = FakeVisits([term(1)])
+    with VisitWatcher(visits) as watcher:
+        watch = watcher.watch(QUERY, lambda query, new: None, interval=60)
+        watcher.unwatch(watch)
+    assert visits.calls <= 1